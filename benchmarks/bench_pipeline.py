@@ -0,0 +1,266 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# O gerador de corpus fica em tests/ e é importado como nos testes ('from corpus_sintetico import ...')
+for pasta in (BASE_DIR, BASE_DIR / "tests"):
+    if str(pasta) not in sys.path:
+        sys.path.insert(0, str(pasta))
+
+from corpus_sintetico import PerfilNotebook, gerar_corpus  # noqa: E402
+
+# Configuração do logger
+logger = logging.getLogger("benchmark")
+
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+TOLERANCIA_PADRAO = 0.20
+
+# Tempo máximo (melhor de N, em segundos) para 'import src.main', o ponto de entrada da CLI
+ORCAMENTO_IMPORTACAO = 0.25
+
+# Perfis usados por padrão no benchmark
+PERFIS = [
+    PerfilNotebook("pequeno", celulas=20, notebooks=20),
+    PerfilNotebook("medio", celulas=200, imagens=10, imagens_repetidas=5, notebooks=5),
+    PerfilNotebook("outputs_grandes", celulas=100, bytes_output=200_000, notebooks=2),
+    PerfilNotebook("imagens", celulas=60, imagens=40, imagens_repetidas=30, lado_imagem=1200, notebooks=2),
+    PerfilNotebook("markdown", celulas=300, proporcao_codigo=0.1, notebooks=2),
+]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cliente LLM falso para o benchmark
+# Mesma interface do AsyncOpenAI (chat.completions.create), com latência fixa simulando a rede.
+class ClienteLLMFalso:
+    def __init__(self, latencia: float = 0.05):
+        self.latencia = latencia
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **parametros):
+        await asyncio.sleep(self.latencia)
+        conteudo = f"Resumo de {len(messages[-1]['content'])} caracteres."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=conteudo))])
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que mede tempo e pico de memória de uma etapa
+# Executa 'repeticoes' vezes e guarda mediana e mínimo do tempo e o maior pico de memória observado.
+def medir(funcao: Callable[[], None], repeticoes: int) -> Dict:
+    tempos, picos = [], []
+    for _ in range(repeticoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+        picos.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "tempo_mediana": statistics.median(tempos),
+        "tempo_min": min(tempos),
+        "memoria_pico": max(picos),
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que mede o tempo de 'import src.main' em processos novos (sem módulos já carregados)
+# Guarda mediana e mínimo; o mínimo é o que vai contra o orçamento, por ser o menos sensível à carga da máquina.
+def medir_importacao(repeticoes: int, modulo: str = "src.main") -> Dict:
+    codigo = f"import time\ninicio = time.perf_counter()\nimport {modulo}\nprint(time.perf_counter() - inicio)\n"
+    tempos = []
+    for _ in range(max(1, repeticoes)):
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        tempos.append(float(saida.stdout))
+    return {
+        "modulo": modulo,
+        "tempo_mediana": statistics.median(tempos),
+        "tempo_min": min(tempos),
+        "orcamento": ORCAMENTO_IMPORTACAO,
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Etapas medidas
+# Cada etapa recebe a lista de notebooks e uma pasta de trabalho vazia.
+def etapa_converte_to_md(notebooks: List[Path], pasta: Path):
+    from src.conversao import converte_lote
+    converte_lote(notebooks, pasta, logger)
+
+
+def etapa_markdown_streaming(notebooks: List[Path], pasta: Path):
+    from src.conversao import converte_lote
+    from src.leitor_notebook import LimitesSaida
+    converte_lote(notebooks, pasta, logger, limites=LimitesSaida())
+
+
+# Só a exportação: como na CLI, as seções saem direto das células dos notebooks, sem conversão para Markdown
+def etapa_docx(notebooks: List[Path], pasta: Path):
+    from src.dit import exportar_dit
+    exportar_dit(pasta, ("docx",), logger, notebooks_dir=notebooks[0].parent, notebooks=notebooks)
+
+
+def etapa_resumo(notebooks: List[Path], pasta: Path, latencia: float = 0.05):
+    from src.leitor_notebook import iterar_celulas
+    from src.resumo_async import resumir_secoes
+
+    secoes = []
+    for notebook in notebooks:
+        secoes.extend("".join(c.get("source", [])) for c in iterar_celulas(notebook) if c.get("source"))
+    # O servidor falso não tem limite de taxa: os limites ficam altos para medir só o pipeline
+    resumir_secoes(
+        secoes,
+        cliente=ClienteLLMFalso(latencia),
+        requisicoes_por_minuto=1_000_000,
+        tokens_por_minuto=1_000_000_000,
+        logger=logger,
+    )
+
+
+ETAPAS = {
+    "converte_to_md": etapa_converte_to_md,
+    "markdown_streaming": etapa_markdown_streaming,
+    "docx": etapa_docx,
+    "resumo_llm_falso": etapa_resumo,
+}
+
+# Módulo exigido por cada etapa; etapas sem a dependência instalada são marcadas como indisponíveis
+DEPENDENCIAS = {"converte_to_md": "nbconvert", "docx": "docx"}
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que executa o benchmark para os perfis e etapas escolhidos
+def executar(perfis: List[PerfilNotebook], etapas: List[str], repeticoes: int, semente: int) -> Dict:
+    import importlib.util
+
+    importacao = medir_importacao(repeticoes)
+    nome = f"{'importacao':<16} {importacao['modulo']:<20}"
+    print(f"{nome} {importacao['tempo_min'] * 1000:9.1f} ms  (melhor de {repeticoes})")
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for perfil in perfis:
+            notebooks = gerar_corpus(perfil, tmp / "corpus" / perfil.nome, semente)
+            tamanho = sum(n.stat().st_size for n in notebooks)
+
+            for etapa in etapas:
+                registro = {"perfil": perfil.nome, "etapa": etapa, "notebooks": len(notebooks), "bytes_entrada": tamanho}
+                dependencia = DEPENDENCIAS.get(etapa)
+                if dependencia and importlib.util.find_spec(dependencia) is None:
+                    registro["indisponivel"] = f"módulo '{dependencia}' não instalado"
+                else:
+                    contador = iter(range(repeticoes))
+                    registro.update(medir(
+                        lambda: ETAPAS[etapa](notebooks, tmp / "saida" / etapa / perfil.nome / str(next(contador))),
+                        repeticoes,
+                    ))
+                resultados.append(registro)
+                print(formatar_registro(registro))
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": f"{platform.system()}-{platform.machine()}",
+        "repeticoes": repeticoes,
+        "semente": semente,
+        "importacao": importacao,
+        "resultados": resultados,
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para obter o commit atual (quando executado dentro do repositório git)
+def commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def formatar_registro(registro: Dict) -> str:
+    nome = f"{registro['perfil']:<16} {registro['etapa']:<20}"
+    if "indisponivel" in registro:
+        return f"{nome} [indisponível: {registro['indisponivel']}]"
+    return f"{nome} {registro['tempo_mediana'] * 1000:9.1f} ms  {registro['memoria_pico'] / (1024 ** 2):8.1f} MB"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para comparar uma execução com uma execução de referência
+# Aponta regressão quando o tempo (mediana) ou o pico de memória piora mais que 'tolerancia' (fração), e
+# quando o tempo de importação (mínimo) piora mais que 'tolerancia'.
+def comparar(atual: Dict, referencia: Dict, tolerancia: float = TOLERANCIA_PADRAO) -> List[str]:
+    anteriores = {(r["perfil"], r["etapa"]): r for r in referencia["resultados"] if "indisponivel" not in r}
+    regressoes = []
+    importacao, importacao_anterior = atual.get("importacao"), referencia.get("importacao")
+    if importacao and importacao_anterior and importacao_anterior["tempo_min"]:
+        if importacao["tempo_min"] > importacao_anterior["tempo_min"] * (1 + tolerancia):
+            variacao = importacao["tempo_min"] / importacao_anterior["tempo_min"] - 1
+            regressoes.append(f"importacao/{importacao['modulo']}: tempo_min +{variacao:.0%}")
+    for registro in atual["resultados"]:
+        anterior = anteriores.get((registro["perfil"], registro["etapa"]))
+        if anterior is None or "indisponivel" in registro:
+            continue
+        for metrica in ("tempo_mediana", "memoria_pico"):
+            if anterior[metrica] and registro[metrica] > anterior[metrica] * (1 + tolerancia):
+                variacao = registro[metrica] / anterior[metrica] - 1
+                regressoes.append(f"{registro['perfil']}/{registro['etapa']}: {metrica} +{variacao:.0%}")
+    return regressoes
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Execução pela linha de comando
+#   python -m benchmarks.bench_pipeline [--perfis pequeno medio] [--etapas docx] [--comparar arquivo.json]
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de conversão do DITfy")
+    parser.add_argument("--perfis", nargs="+", choices=[p.nome for p in PERFIS], help="perfis do corpus sintético")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), help="etapas a medir")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", type=Path, help="arquivo JSON do resultado (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", type=Path, help="resultado anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    perfis = [p for p in PERFIS if not args.perfis or p.nome in args.perfis]
+    resultado = executar(perfis, args.etapas or list(ETAPAS), args.repeticoes, args.semente)
+
+    saida = args.saida or PASTA_RESULTADOS / f"bench_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[✓] Resultado gravado em {saida}")
+
+    codigo = 0
+    importacao = resultado["importacao"]
+    if importacao["tempo_min"] > importacao["orcamento"]:
+        print(f"[✗] 'import {importacao['modulo']}' levou {importacao['tempo_min']:.3f}s "
+              f"(orçamento de {importacao['orcamento']:.3f}s)")
+        codigo = 1
+
+    if args.comparar:
+        regressoes = comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")), args.tolerancia)
+        for regressao in regressoes:
+            print(f"[✗] Regressão: {regressao}")
+        if regressoes:
+            return 1
+        print("[✓] Nenhuma regressão em relação à referência.")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,6 @@ import logging
 from pathlib import Path
 from datetime import datetime
 import platform
-import psutil  # pip install psutil (para infos de hardware)
-import shutil
 
 # Configuração do logger
 # O logger é configurado para registrar mensagens de log no console e em um arquivo de log  
@@ -15,40 +13,12 @@ def configurar_logger(base_dir: Path) -> logging.Logger:
     """
     Configura o logger para gravar logs no console e em um arquivo na pasta 'log/'.
     O nome do arquivo segue o padrão: log_installer_YYYY_MM_DD_HH_MM_SS.log
+    A gravação é feita por uma thread em segundo plano (QueueHandler/QueueListener),
+    para que o log não bloqueie as etapas da instalação.
     """
-    log_dir = base_dir / "log"
-    log_dir.mkdir(parents=True, exist_ok=True)
+    from src.instrumentacao import configurar_logger_assincrono
 
-    log_filename = f"log_installer_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.log"
-    log_path = log_dir / log_filename
-
-    # Cria um logger novo com nome do módulo principal
-    logger = logging.getLogger("installer_logger")
-    logger.setLevel(logging.DEBUG)
-
-    # Remove handlers anteriores (para evitar duplicidade em múltiplas execuções)
-    if logger.hasHandlers():
-        logger.handlers.clear()
-
-    # Formato do log
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-    # Handler para arquivo
-    file_handler = logging.FileHandler(log_path, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-
-    # Handler para console
-    stream_handler = logging.StreamHandler(sys.stdout)
-    stream_handler.setLevel(logging.INFO)
-    stream_handler.setFormatter(formatter)
-
-    # Adiciona handlers ao logger
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
-
-    logger.info(f"[✓] Arquivo de log criado: {log_path}")
-    return logger
+    return configurar_logger_assincrono(base_dir, "installer_logger", "log_installer_")
 
 
 # Configuração do arquivo de instalação
@@ -57,9 +27,12 @@ def criar_arquivo_instalacao(caminho_arquivo: Path):
     """
     Cria um arquivo .txt com informações detalhadas da instalação caso não exista.
     Escreve um cabeçalho com título e muitas informações do sistema e ambiente.
+    O hardware vem da mesma sondagem usada pelo planejador de recursos (src/recursos.py).
     """
+    from src.recursos import GB, planejar_recursos, sondar_hardware
 
     if not caminho_arquivo.exists():
+        hardware = sondar_hardware(caminho_arquivo.parent)
         info = f"""\
 ===========================================
           SISTEMA: Create Doc DIT System
@@ -96,9 +69,10 @@ Informações do Ambiente:
 - Nome do Host: {platform.node()}
 - Arquitetura: {platform.machine()}
 - Processador: {platform.processor() or "N/A"}
-- Número de CPUs: {psutil.cpu_count(logical=True)}
-- Memória RAM Total: {round(psutil.virtual_memory().total / (1024 ** 3), 2)} GB
-- Espaço Disco Disponível (na pasta atual): {round(shutil.disk_usage(caminho_arquivo.parent).free / (1024 ** 3), 2)} GB
+- Número de CPUs: {hardware.cpus}
+- Memória RAM Total: {round(hardware.memoria_total / GB, 2)} GB
+- Espaço Disco Disponível (na pasta atual): {round(hardware.disco_livre / GB, 2)} GB
+- Plano de Recursos: {planejar_recursos(hardware).descrever()}
 - Python Version: {platform.python_version()}
 - Python Implementação: {platform.python_implementation()}
 - Caminho do Python: {sys.executable}
@@ -179,80 +153,208 @@ def atualizar_pip():
         sys.exit(1)
 
 
+# Lista de pacotes necessários e suas versões
+PACOTES = [
+    'ipykernel',
+    'langchain==0.1.16',
+    'langchain-community==0.0.33',
+    'langchain-openai==0.1.3',
+    'openai==1.55.3',
+    'huggingface_hub==0.22.2',
+    'transformers==4.39.3',
+    'jinja2==3.1.3',
+    'tiktoken==0.6.0',
+    'pypdf==4.2.0',
+    'yt_dlp==2024.4.9',
+    'pydub==0.25.1',
+    'beautifulsoup4==4.12.3',
+    'python-dotenv',
+    'sentence-transformers==2.7.0',
+    'langchain-chroma',
+    'faiss-cpu',
+    'lark',
+    'python-docx',
+    'gradio==5.39.0',
+    'psutil',
+    "nbconvert"
+]
+
+# Pasta com os wheels para instalação offline e arquivo com a impressão digital do ambiente.
+# O fingerprint fica ao lado do 'informacoes_instalacao.txt'.
+PASTA_WHEELHOUSE = "wheelhouse"
+ARQUIVO_FINGERPRINT = "fingerprint_ambiente.json"
+
+
+# Função para consultar a versão instalada de um pacote
+# Lê os metadados do próprio ambiente (importlib.metadata), sem abrir um processo 'pip show' por pacote.
+# Retorna None se o pacote não estiver instalado.
+def versao_instalada(nome: str):
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version(nome)
+    except PackageNotFoundError:
+        return None
+
+
+# Função para calcular os pacotes que precisam ser instalados
+# Um pacote entra na lista se não estiver instalado ou se estiver com versão diferente da fixada com '=='.
+def pacotes_pendentes(pacotes: list) -> list:
+    pendentes = []
+    for lib in pacotes:
+        lib = lib.strip()
+        if not lib or lib.startswith("#"):
+            print(f"[→] Pulando: {lib}")
+            continue
+
+        lib_name, _, versao_fixada = lib.partition("==")
+        versao = versao_instalada(lib_name.strip())
+        if versao is None:
+            print(f"[+] Não instalado: {lib}")
+            pendentes.append(lib)
+        elif versao_fixada and versao != versao_fixada.strip():
+            print(f"[≠] Versão diferente: {lib_name} {versao} (esperado {versao_fixada})")
+            pendentes.append(lib)
+        else:
+            print(f"[✓] Já instalado: {lib}")
+    return pendentes
+
+
+# Função para montar a wheelhouse local
+# Baixa/compila os wheels de todos os PACOTES (e das dependências deles) na pasta 'wheelhouse/'.
+# Deve ser executada uma vez em uma máquina com internet; a pasta pode então ser copiada para as demais.
+def construir_wheelhouse(base_dir: Path):
+    import subprocess
+    import sys
+
+    wheelhouse = base_dir / PASTA_WHEELHOUSE
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    print(f"[⚙️] Gerando wheelhouse em {wheelhouse}...")
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "pip", "wheel", "--wheel-dir", str(wheelhouse), *PACOTES],
+            check=True
+        )
+        print("[✓] Wheelhouse gerada com sucesso.")
+    except subprocess.CalledProcessError as e:
+        print(f"[✗] Erro ao gerar a wheelhouse: {e}")
+        sys.exit(1)
+
+
+# Função para calcular a impressão digital do ambiente
+# Combina o interpretador em uso, a lista de PACOTES e todas as distribuições instaladas (nome==versão).
+# Tudo é lido no próprio processo, então o cálculo leva milissegundos.
+def calcular_fingerprint() -> str:
+    import hashlib
+    import json
+    from importlib.metadata import distributions
+
+    instalados = sorted(
+        f"{dist.metadata['Name']}=={dist.version}".lower()
+        for dist in distributions()
+        if dist.metadata["Name"]
+    )
+    dados = {
+        "python": platform.python_version(),
+        "prefixo": sys.prefix,
+        "plataforma": f"{platform.system()}-{platform.machine()}",
+        "pacotes": PACOTES,
+        "instalados": instalados,
+    }
+    return hashlib.sha256(json.dumps(dados, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Função para gravar a impressão digital do ambiente
+def gravar_fingerprint(base_dir: Path):
+    import json
+
+    caminho = base_dir / ARQUIVO_FINGERPRINT
+    dados = {
+        "fingerprint": calcular_fingerprint(),
+        "data": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    caminho.write_text(json.dumps(dados, indent=2), encoding="utf-8")
+    print(f"[✓] Fingerprint do ambiente gravado: {caminho}")
+
+
+# Função para verificar se o ambiente atual confere com o fingerprint gravado
+def fingerprint_confere(base_dir: Path) -> bool:
+    import json
+
+    caminho = base_dir / ARQUIVO_FINGERPRINT
+    if not caminho.exists():
+        return False
+    try:
+        gravado = json.loads(caminho.read_text(encoding="utf-8")).get("fingerprint")
+    except ValueError:
+        return False
+    return gravado == calcular_fingerprint()
+
+
 # Função para instalar pacotes necessários
-# Ela define uma lista de pacotes e suas versões, verifica se cada pacote já está instalado 
-def installer_packages():
+# Verifica as versões instaladas no próprio processo, calcula só o que falta ou está com versão diferente
+# e instala tudo em uma única chamada ao pip (um único resolve de dependências, com cache habilitado).
+# Se essa chamada falhar, tenta os pacotes pendentes um a um para não interromper a instalação.
+# Quando existe uma wheelhouse, instala só a partir dela (--no-index), sem acessar a internet.
+# Ao final, mostra o tempo gasto em cada fase. Retorna True só se todos os pacotes ficaram instalados.
+def installer_packages(wheelhouse: Path = None) -> bool:
     import subprocess
     import sys
-    
-    atualizar_pip()
-
-    pacotes = [
-        'ipykernel',
-        'langchain==0.1.16',
-        'langchain-community==0.0.33',
-        'langchain-openai==0.1.3',
-        'openai==1.55.3',
-        'huggingface_hub==0.22.2',
-        'transformers==4.39.3',
-        'jinja2==3.1.3',
-        'tiktoken==0.6.0',
-        'pypdf==4.2.0',
-        'yt_dlp==2024.4.9',
-        'pydub==0.25.1',
-        'beautifulsoup4==4.12.3',
-        'python-dotenv',
-        'sentence-transformers==2.7.0',
-        'langchain-chroma',
-        'faiss-cpu',
-        'lark',
-        'python-docx',
-        'gradio==5.39.0',
-        'psutil',
-        "nbconvert"
-    ]
-        
-        
+    import time
+
     # Verifica se está em venv
     if not esta_em_venv():
         print("[⚠️ ] O script não está rodando dentro de um ambiente virtual. Criando um...")
         garantir_venv()
         print("[✓] Ambiente virtual criado com sucesso.")
         # Ao criar o venv, o script reinicia, então aqui provavelmente não chega a continuar
-        return
+        return False
     else:
         print("[✓] Ambiente virtual já está ativo.")
 
-    print("[⚙️] Instalando pacotes necessários...")
-    for lib in pacotes:
-        if lib.strip() and not lib.strip().startswith("#"):
-            lib_name = lib.split("==")[0].strip()
-            try:
-                # Verifica se pacote já instalado
-                pip_show = subprocess.run(
-                    [sys.executable, "-m", "pip", "show", lib_name],
-                    check=True, capture_output=True, text=True
-                )
-                if lib_name.lower() in pip_show.stdout.lower():
-                    print(f"[✓] Já instalado: {lib}")
-                    continue
-            except subprocess.CalledProcessError:
-                # Não encontrado, vai instalar
-                pass
-
-            # Tenta instalar o pacote com flag --no-cache-dir para evitar problemas com arquivos temporários
-            print(f"[⚙️] Instalando: {lib}")
-            try:
-                subprocess.run(
-                    [sys.executable, "-m", "pip", "install", lib, "--no-cache-dir"],
-                    check=True
-                )
-                print(f"[✓] Pacote instalado com sucesso: {lib}")
-            except subprocess.CalledProcessError as e:
-                print(f"[✗] Erro ao instalar {lib}: {e}. Continuando com próximo pacote...")
-        else:
-            print(f"[→] Pulando: {lib}")
+    tempos = {}
+    falhas = []
+
+    inicio = time.perf_counter()
+    print("[⚙️] Verificando pacotes instalados...")
+    pendentes = pacotes_pendentes(PACOTES)
+    tempos["verificação"] = time.perf_counter() - inicio
+
+    opcoes_offline = []
+    if wheelhouse is not None and wheelhouse.exists():
+        print(f"[✓] Usando wheelhouse local: {wheelhouse}")
+        opcoes_offline = ["--no-index", "--find-links", str(wheelhouse)]
+
+    if pendentes:
+        if not opcoes_offline:
+            inicio = time.perf_counter()
+            atualizar_pip()
+            tempos["atualização do pip"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        print(f"[⚙️] Instalando {len(pendentes)} pacote(s): {' '.join(pendentes)}")
+        try:
+            subprocess.run([sys.executable, "-m", "pip", "install", *opcoes_offline, *pendentes], check=True)
+            print("[✓] Pacotes instalados com sucesso.")
+        except subprocess.CalledProcessError as e:
+            print(f"[✗] Erro na instalação em lote: {e}. Tentando pacote a pacote...")
+            for lib in pendentes:
+                try:
+                    subprocess.run([sys.executable, "-m", "pip", "install", *opcoes_offline, lib], check=True)
+                    print(f"[✓] Pacote instalado com sucesso: {lib}")
+                except subprocess.CalledProcessError as e:
+                    falhas.append(lib)
+                    print(f"[✗] Erro ao instalar {lib}: {e}. Continuando com próximo pacote...")
+        tempos["instalação"] = time.perf_counter() - inicio
+    else:
+        print("[✓] Todos os pacotes já estão nas versões esperadas.")
+
+    for fase, duracao in tempos.items():
+        print(f"[⏱] {fase}: {duracao:.2f}s")
+    if falhas:
+        print(f"[✗] Instalação de pacotes concluída com {len(falhas)} falha(s): {' '.join(falhas)}")
+        return False
     print("[✓] Instalação de pacotes concluída.")
+    return True
 
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -307,30 +409,16 @@ def criar_funcoes_padrao(functions_dir: Path):
 
     log_code = '''\
 import logging
-import sys
 from pathlib import Path
-from datetime import datetime
+
+from src.instrumentacao import configurar_logger_assincrono
 
 logger = logging.getLogger(__name__)
 
+# Configura o logger raiz (como o antigo basicConfig), com a gravação feita em segundo plano
+# (QueueHandler/QueueListener); ver src/instrumentacao.py
 def configurar_logger(base_dir: Path):
-    log_dir = base_dir / "log"
-    log_dir.mkdir(parents=True, exist_ok=True)
-
-    log_filename = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".log"
-    log_path = log_dir / log_filename
-
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_path),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-
-    logger.info(f"Arquivo de log criado: {log_path}")
-    return logger
+    return configurar_logger_assincrono(base_dir, None, "")
 '''
     (functions_dir / "log.py").write_text(log_code, encoding="utf-8")
     logger.info("[+] Criado: log.py")
@@ -352,28 +440,20 @@ def criar_pastas(base_dir, pastas, logger):
     (functions_dir / "estrutura.py").write_text(estrutura_code, encoding="utf-8")
     logger.info("[+] Criado: estrutura.py")
 
+    # A conversão roda no mesmo processo (src/conversao.py), reaproveitando o exportador do nbconvert
+    # entre arquivos em vez de abrir um 'python -m nbconvert' por notebook.
     conversao_code = '''\
-import subprocess
-import sys
-
-def converte_to_md(arquivo_path, base_dir, logger):
-    if not arquivo_path.exists():
-        logger.error(f"[✗] Arquivo '{arquivo_path}' não encontrado.")
-        return False
-
-    try:
-        markdown_dir = base_dir / "markdown"
-        subprocess.check_call([
-            sys.executable, "-m", "nbconvert",
-            "--to", "markdown",
-            "--output-dir", str(markdown_dir),
-            str(arquivo_path)
-        ])
-        logger.info(f"[✓] Convertido para Markdown com sucesso: {arquivo_path.name}\\n")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.exception(f"[✗] Erro durante a conversão de {arquivo_path.name}: {e}\\n")
-        return False
+from src.conversao import (
+    ResultadoConversao,
+    ResumoConversao,
+    converte_lote,
+    converte_paralelo,
+    converte_pasta,
+    converte_to_md,
+    listar_notebooks,
+    resumir_conversao,
+)
+from src.cache_conversao import converte_incremental
 '''
     (functions_dir / "conversao.py").write_text(conversao_code, encoding="utf-8")
     logger.info("[+] Criado: conversao.py")
@@ -471,6 +551,7 @@ def garantir_venv():
 # ---------------------------------------------------------------------------------------------------------------------
 # Função principal que executa as etapas de configuração do ambiente
 # Ela garante que o ambiente virtual está ativo, instala os pacotes necessários, cria o arquivo de ambiente (.env) e cria as pastas padrão.
+# Se o fingerprint gravado confere com o ambiente atual, pula venv, pip e a verificação de pacotes.
 # Ao final, imprime uma mensagem de sucesso e orienta o usuário a executar o script principal   
 def main():
     # Define o diretório base do script
@@ -482,11 +563,26 @@ def main():
     logger.info("[⚙️] Iniciando configuração do ambiente...")
     print("[⚙️] Configurando o ambiente...")
 
-    # Executa as etapas de configuração
-    garantir_venv()
-    installer_packages()
-    cria_env(base_dir)
-    criar_pastas(base_dir)
+    # Executa as etapas de configuração, medindo o tempo de cada uma
+    from src.instrumentacao import etapa, gravar_resumo_etapas
+
+    if fingerprint_confere(base_dir):
+        logger.info("[=] Fingerprint do ambiente confere. Pulando venv, pip e verificação de pacotes.")
+    else:
+        with etapa("instalacao.venv"):
+            garantir_venv()
+        with etapa("instalacao.pacotes"):
+            instalados = installer_packages(base_dir / PASTA_WHEELHOUSE)
+        # Com algum pacote faltando, o fingerprint não é gravado: a próxima execução tenta de novo
+        if instalados:
+            gravar_fingerprint(base_dir)
+        else:
+            logger.warning("[⚠️] Nem todos os pacotes foram instalados; fingerprint do ambiente não gravado.")
+    with etapa("instalacao.env"):
+        cria_env(base_dir)
+    with etapa("instalacao.pastas"):
+        criar_pastas(base_dir)
+    gravar_resumo_etapas(base_dir, "installer")
 
     msg_final = "[✓] Ambiente configurado com sucesso. Execute 'python main.py' para iniciar."
     print(msg_final)
@@ -499,15 +595,23 @@ if __name__ == "__main__":
     base_dir = Path(__file__).resolve().parent
     caminho_arquivo = base_dir / "informacoes_instalacao.txt"
 
-    if not caminho_arquivo.exists():
-        print("Arquivo não existe. Iniciando a instalação...")
+    # 'python installer.py --construir-wheelhouse' prepara a instalação offline e encerra
+    if "--construir-wheelhouse" in sys.argv:
+        construir_wheelhouse(base_dir)
+    # O fingerprint vem antes do arquivo de instalação: se os requisitos, o Python ou a plataforma mudaram
+    # (ou uma instalação anterior ficou incompleta), o ambiente é atualizado mesmo com o arquivo existindo
+    elif not caminho_arquivo.exists() or not fingerprint_confere(base_dir):
+        if caminho_arquivo.exists():
+            print("Arquivo existe, mas o ambiente mudou desde a instalação. Atualizando...")
+        else:
+            print("Arquivo não existe. Iniciando a instalação...")
         print("Executando main()...")
         main()
         criar_arquivo_instalacao(caminho_arquivo)
         logger.info("[*] Arquivo Dit não criado.")  # Talvez ajustar essa mensagem?
         logger.info("[*] Finalizando o script.")
     else:
-        print("Arquivo existe.")
+        print("Arquivo existe e o ambiente confere com a instalação.")
         print("Se você deseja criar uma nova instalação, exclua o arquivo 'informacoes_instalacao.txt' e execute novamente.")
 
 
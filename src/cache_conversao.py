@@ -0,0 +1,327 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socket
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.conversao import (
+    PASTA_MARKDOWN,
+    PASTA_NOTEBOOKS,
+    ResultadoConversao,
+    converte_lote,
+    converte_paralelo,
+    listar_notebooks,
+    registrar_resumo,
+    resumir_conversao,
+)
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Local do manifesto dentro do projeto
+PASTA_CACHE = ".cache"
+ARQUIVO_MANIFESTO = "manifesto_conversao.json"
+# Versão 2: o Markdown espelha as subpastas dos notebooks ('markdown/<subpasta>/<nome>.md')
+VERSAO_MANIFESTO = 2
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para calcular o hash do conteúdo de um arquivo
+# Lê o arquivo em blocos para não carregar notebooks grandes inteiros na memória.
+def hash_arquivo(caminho: Path, tamanho_bloco: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que gera a assinatura das configurações de conversão
+# Qualquer mudança (formato, versão do nbconvert ou parâmetros extras) invalida todo o cache.
+def assinatura_configuracao(configuracao: Optional[Dict] = None) -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        versao_nbconvert = version("nbconvert")
+    except PackageNotFoundError:
+        versao_nbconvert = "desconhecida"
+
+    dados = {"formato": "markdown", "nbconvert": versao_nbconvert, **(configuracao or {})}
+    return hashlib.sha256(json.dumps(dados, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que verifica se um processo desta máquina ainda está em execução
+# Usa o psutil quando instalado; sem ele, OpenProcess no Windows (os.kill lá encerraria o processo) e o
+# sinal 0 nos demais sistemas.
+def processo_vivo(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        import psutil
+
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            codigo = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(codigo))
+            return codigo.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que decide se uma trava foi abandonada
+# A trava guarda '<pid> <máquina>'. Se o dono é desta máquina, a trava só é abandonada quando o processo
+# não existe mais, por mais longa que seja a conversão. Se o dono é outra máquina (pasta de rede) ou o
+# conteúdo não pode ser lido, vale a idade do arquivo ('expira_em' segundos).
+def trava_abandonada(caminho: Path, expira_em: float) -> bool:
+    try:
+        pid, _, maquina = caminho.read_text(encoding="utf-8").strip().partition(" ")
+        if maquina == socket.gethostname():
+            return not processo_vivo(int(pid))
+    except ValueError:
+        pass
+    return time.time() - caminho.stat().st_mtime > expira_em
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Trava entre processos
+# Cria um arquivo '.lock' de forma atômica (O_EXCL). Funciona no Windows e no Linux sem dependências extras.
+# Uma trava cujo processo dono morreu é removida (ver trava_abandonada).
+@contextmanager
+def trava_arquivo(caminho: Path, timeout: float = 600.0, expira_em: float = 3600.0, intervalo: float = 0.2):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    inicio = time.monotonic()
+
+    while True:
+        try:
+            fd = os.open(str(caminho), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, f"{os.getpid()} {socket.gethostname()}".encode("utf-8"))
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if trava_abandonada(caminho, expira_em):
+                    logger.warning(f"[⚠️] Removendo trava abandonada: {caminho}")
+                    caminho.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() - inicio > timeout:
+                raise TimeoutError(f"Não foi possível obter a trava '{caminho}' em {timeout:.0f}s")
+            time.sleep(intervalo)
+
+    try:
+        yield
+    finally:
+        try:
+            caminho.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Manifesto do cache de conversão
+# Guarda, para cada notebook (caminho relativo à pasta 'notebooks/'), a chave de conteúdo+configuração
+# e os arquivos gerados na pasta 'markdown/'. É gravado de forma atômica (arquivo temporário + os.replace).
+class ManifestoConversao:
+    def __init__(self, caminho: Path, assinatura: str):
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.entradas: Dict[str, Dict] = {}
+        # Saídas registradas por um manifesto de versão anterior, a apagar antes de converter de novo
+        self.obsoletas: List[str] = []
+
+    @classmethod
+    def carregar(cls, caminho: Path, assinatura: str) -> "ManifestoConversao":
+        manifesto = cls(caminho, assinatura)
+        if caminho.exists():
+            try:
+                dados = json.loads(caminho.read_text(encoding="utf-8"))
+                if dados.get("versao") == VERSAO_MANIFESTO:
+                    manifesto.entradas = dados.get("entradas", {})
+                else:
+                    manifesto.obsoletas = [s for e in dados.get("entradas", {}).values() for s in e.get("saidas", [])]
+            except (OSError, ValueError):
+                logger.warning(f"[⚠️] Manifesto corrompido, ignorando: {caminho}")
+        return manifesto
+
+    def salvar(self):
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_name(f"{self.caminho.name}.{os.getpid()}.tmp")
+        dados = {"versao": VERSAO_MANIFESTO, "entradas": self.entradas}
+        temporario.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporario, self.caminho)
+
+    def chave(self, hash_conteudo: str) -> str:
+        return hashlib.sha256(f"{self.assinatura}:{hash_conteudo}".encode("utf-8")).hexdigest()
+
+    def atualizado(self, nome: str, chave: str, markdown_dir: Path) -> bool:
+        entrada = self.entradas.get(nome)
+        if not entrada or entrada.get("chave") != chave:
+            return False
+        return all((markdown_dir / saida).exists() for saida in entrada.get("saidas", []))
+
+    def registrar(self, nome: str, chave: str, saidas: List[str]):
+        self.entradas[nome] = {"chave": chave, "saidas": saidas}
+
+    def remover(self, nome: str) -> List[str]:
+        return self.entradas.pop(nome, {}).get("saidas", [])
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que dá o nome de um notebook no manifesto
+# Caminho relativo à pasta dos notebooks; um notebook fora dela (ex.: informado pela CLI) usa o caminho
+# absoluto. Assim o nome não muda entre execuções com conjuntos diferentes de notebooks.
+def nome_notebook(arquivo: Path, notebooks_dir: Path) -> str:
+    try:
+        return Path(arquivo).resolve().relative_to(notebooks_dir.resolve()).as_posix()
+    except ValueError:
+        return Path(arquivo).resolve().as_posix()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para listar as saídas geradas por uma conversão
+# O nbconvert gera '<nome>.md' e, quando há imagens, a pasta '<nome>_files'.
+def saidas_geradas(resultado: ResultadoConversao, markdown_dir: Path) -> List[str]:
+    saidas = [resultado.saida.relative_to(markdown_dir).as_posix()]
+    pasta_arquivos = resultado.saida.with_name(f"{resultado.saida.stem}_files")
+    if pasta_arquivos.exists():
+        saidas.append(pasta_arquivos.relative_to(markdown_dir).as_posix())
+    return saidas
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para remover saídas antigas da pasta 'markdown/'
+def remover_saidas(saidas: List[str], markdown_dir: Path, logger: logging.Logger = logger):
+    for saida in saidas:
+        caminho = markdown_dir / saida
+        if caminho.is_dir():
+            shutil.rmtree(caminho, ignore_errors=True)
+        elif caminho.exists():
+            caminho.unlink()
+        else:
+            continue
+        logger.info(f"[-] Removida saída obsoleta: {caminho}")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter apenas os notebooks que mudaram
+# Compara o hash de cada notebook com o manifesto, converte só os alterados ou novos e apaga as saídas
+# de notebooks removidos. A execução inteira roda sob uma trava, então duas execuções simultâneas
+# sobre o mesmo projeto são serializadas e o manifesto nunca fica inconsistente.
+# Com 'apenas', só esses notebooks são lidos e comparados (os demais nem têm o hash calculado) e só
+# eles aparecem no retorno; é o caso do modo observador, que já sabe quais arquivos mudaram, e da CLI.
+# Nesse caso só as entradas de 'apenas' cujo arquivo não existe mais são removidas do manifesto; as
+# demais entradas (de outros notebooks) ficam como estão.
+# 'plano' (src/recursos.py) pode mandar um notebook para o leitor streaming por falta de memória; essa escolha
+# não entra na assinatura, então o notebook não é reconvertido só porque a próxima execução tem mais memória.
+# 'ao_concluir' recebe o resultado de cada notebook convertido assim que ele termina; os que vieram do
+# cache só aparecem no retorno.
+def converte_incremental(
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    notebooks_dir: Optional[Path] = None,
+    markdown_dir: Optional[Path] = None,
+    workers: int = 1,
+    configuracao: Optional[Dict] = None,
+    limites=None,
+    apenas: Optional[Iterable[Path]] = None,
+    plano=None,
+    ao_concluir: Optional[Callable[[ResultadoConversao], None]] = None,
+) -> List[ResultadoConversao]:
+    notebooks_dir = notebooks_dir or base_dir / PASTA_NOTEBOOKS
+    markdown_dir = markdown_dir or base_dir / PASTA_MARKDOWN
+    caminho_manifesto = base_dir / PASTA_CACHE / ARQUIVO_MANIFESTO
+
+    # Os limites do leitor streaming mudam o Markdown gerado, então também entram na assinatura
+    configuracao = dict(configuracao or {})
+    if limites is not None:
+        configuracao["limites"] = asdict(limites)
+
+    inicio = time.perf_counter()
+    with trava_arquivo(caminho_manifesto.with_suffix(".lock")):
+        manifesto = ManifestoConversao.carregar(caminho_manifesto, assinatura_configuracao(configuracao))
+
+        if apenas is None:
+            arquivos = listar_notebooks(notebooks_dir)
+            nomes = {arquivo: nome_notebook(arquivo, notebooks_dir) for arquivo in arquivos}
+            removidos = set(manifesto.entradas) - set(nomes.values())
+        else:
+            alvos = {nome_notebook(a, notebooks_dir): Path(a) for a in apenas}
+            arquivos = sorted(a for a in alvos.values() if a.is_file())
+            nomes = {arquivo: nome_notebook(arquivo, notebooks_dir) for arquivo in arquivos}
+            removidos = {nome for nome, a in alvos.items() if not a.is_file()} & set(manifesto.entradas)
+        chaves = {arquivo: manifesto.chave(hash_arquivo(arquivo)) for arquivo in arquivos}
+
+        # Saídas no formato de um manifesto antigo e de notebooks que não existem mais
+        remover_saidas(manifesto.obsoletas, markdown_dir, logger)
+        for nome in removidos:
+            remover_saidas(manifesto.remover(nome), markdown_dir, logger)
+
+        sujos = [a for a in arquivos if not manifesto.atualizado(nomes[a], chaves[a], markdown_dir)]
+        logger.info(f"[⚙️] {len(sujos)} de {len(arquivos)} notebook(s) alterado(s); {len(arquivos) - len(sujos)} em cache")
+
+        if workers > 1 and len(sujos) > 1:
+            convertidos = converte_paralelo(
+                sujos, base_dir, logger, markdown_dir=markdown_dir, workers=workers, limites=limites,
+                plano=plano, ao_concluir=ao_concluir, notebooks_dir=notebooks_dir,
+            )
+        else:
+            convertidos = converte_lote(
+                sujos, base_dir, logger, markdown_dir=markdown_dir, limites=limites, plano=plano,
+                ao_concluir=ao_concluir, notebooks_dir=notebooks_dir,
+            )
+
+        por_arquivo = {}
+        for resultado in convertidos:
+            nome = nomes[resultado.arquivo]
+            if resultado.sucesso:
+                novas = saidas_geradas(resultado, markdown_dir)
+                antigas = manifesto.entradas.get(nome, {}).get("saidas", [])
+                remover_saidas([s for s in antigas if s not in novas], markdown_dir, logger)
+                manifesto.registrar(nome, chaves[resultado.arquivo], novas)
+            else:
+                # Invalida a chave mas mantém as saídas antigas registradas, para que sejam limpas depois
+                antigas = manifesto.entradas.get(nome, {}).get("saidas", [])
+                manifesto.registrar(nome, "", antigas)
+            por_arquivo[resultado.arquivo] = resultado
+
+        manifesto.salvar()
+
+    resultados = []
+    for arquivo in arquivos:
+        if arquivo in por_arquivo:
+            resultados.append(por_arquivo[arquivo])
+        else:
+            saida = markdown_dir / manifesto.entradas[nomes[arquivo]]["saidas"][0]
+            resultados.append(ResultadoConversao(arquivo=arquivo, sucesso=True, saida=saida, em_cache=True))
+
+    registrar_resumo(resumir_conversao(resultados, time.perf_counter() - inicio), logger)
+    return resultados
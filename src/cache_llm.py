@@ -0,0 +1,181 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Local e tamanho padrão do cache
+PASTA_CACHE = ".cache"
+ARQUIVO_CACHE_LLM = "respostas_llm.sqlite3"
+TAMANHO_MAXIMO_PADRAO = 200 * 1024 * 1024
+
+_ESPACOS_FINAIS = re.compile(r"[ \t]+$", re.MULTILINE)
+_LINHAS_VAZIAS = re.compile(r"\n{3,}")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Estatísticas de uso do cache
+@dataclass
+class EstatisticasCache:
+    acertos: int = 0
+    falhas: int = 0
+    gravacoes: int = 0
+    removidas: int = 0
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para normalizar o texto de uma célula/seção antes de gerar a chave
+# Diferenças que não mudam o conteúdo (quebra de linha do Windows, espaços no fim da linha, linhas em
+# branco repetidas) não devem gerar uma nova chamada ao modelo.
+def normalizar_texto(texto: str) -> str:
+    texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    texto = _ESPACOS_FINAIS.sub("", texto)
+    texto = _LINHAS_VAZIAS.sub("\n\n", texto)
+    return texto.strip()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que gera a chave do cache
+# Combina texto normalizado, modelo, template do prompt e parâmetros da chamada.
+def chave_cache(texto: str, modelo: str, template: str, parametros: Optional[Dict] = None) -> str:
+    dados = {
+        "texto": normalizar_texto(texto),
+        "modelo": modelo,
+        "template": template,
+        "parametros": parametros or {},
+    }
+    return hashlib.sha256(json.dumps(dados, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cache persistente de respostas do modelo
+# As respostas ficam em um arquivo SQLite dentro do projeto ('.cache/respostas_llm.sqlite3'), que aceita
+# acesso de vários processos. Quando o tamanho total passa de 'tamanho_maximo' bytes, as entradas acessadas
+# há mais tempo são removidas primeiro (LRU). O tamanho total é somado ao abrir e depois mantido a cada
+# gravação e remoção. Cada gravação roda em uma transação de escrita (BEGIN IMMEDIATE) e só soma a tabela de
+# novo quando outro processo alterou o arquivo (PRAGMA data_version), então o limite vale entre processos
+# sem percorrer a tabela a cada gravação.
+class CacheLLM:
+    def __init__(self, caminho: Path, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO):
+        self.caminho = Path(caminho)
+        self.tamanho_maximo = tamanho_maximo
+        self.estatisticas = EstatisticasCache()
+        self._trava = threading.Lock()
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(str(self.caminho), timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY,"
+            " resposta TEXT NOT NULL,"
+            " tamanho INTEGER NOT NULL,"
+            " acessado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_acessado_em ON respostas (acessado_em)")
+        self._conexao.commit()
+        self._versao = None
+        self._sincronizar_total()
+
+    @classmethod
+    def do_projeto(cls, base_dir: Path, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO) -> "CacheLLM":
+        return cls(base_dir / PASTA_CACHE / ARQUIVO_CACHE_LLM, tamanho_maximo)
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._trava:
+            linha = self._conexao.execute("SELECT resposta FROM respostas WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                self.estatisticas.falhas += 1
+                return None
+            self._conexao.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+            self._conexao.commit()
+            self.estatisticas.acertos += 1
+            return linha[0]
+
+    def gravar(self, chave: str, resposta: str):
+        tamanho = len(resposta.encode("utf-8"))
+        with self._trava:
+            # A trava de escrita vale até o commit: nenhum outro processo grava entre a leitura do total e a remoção
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._sincronizar_total()
+                anterior = self._conexao.execute("SELECT tamanho FROM respostas WHERE chave = ?", (chave,)).fetchone()
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO respostas (chave, resposta, tamanho, acessado_em) VALUES (?, ?, ?, ?)",
+                    (chave, resposta, tamanho, time.time()),
+                )
+                self._total += tamanho - (anterior[0] if anterior else 0)
+                self._remover_excedente()
+                self._conexao.commit()
+            except BaseException:
+                self._conexao.rollback()
+                self._versao = None
+                raise
+            self.estatisticas.gravacoes += 1
+
+    # Soma a tabela de novo só se outro processo gravou no arquivo desde a última leitura; as gravações
+    # desta conexão não mudam o 'data_version'.
+    def _sincronizar_total(self):
+        versao = self._conexao.execute("PRAGMA data_version").fetchone()[0]
+        if versao != self._versao:
+            self._total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+            self._versao = versao
+
+    # Remove as entradas menos usadas, em lotes pelo índice de 'acessado_em', até caber em 'tamanho_maximo'
+    def _remover_excedente(self, lote: int = 64):
+        while self._total > self.tamanho_maximo:
+            linhas = self._conexao.execute(
+                "SELECT chave, tamanho FROM respostas ORDER BY acessado_em LIMIT ?", (lote,)
+            ).fetchall()
+            if not linhas:
+                self._total = 0
+                return
+            for chave, tamanho in linhas:
+                self._conexao.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                self.estatisticas.removidas += 1
+                self._total -= tamanho
+                if self._total <= self.tamanho_maximo:
+                    return
+
+    def tamanho_total(self) -> int:
+        return self._total
+
+    def obter_ou_gerar(
+        self,
+        texto: str,
+        modelo: str,
+        template: str,
+        parametros: Optional[Dict],
+        gerar: Callable[[], str],
+    ) -> str:
+        chave = chave_cache(texto, modelo, template, parametros)
+        resposta = self.obter(chave)
+        if resposta is None:
+            resposta = gerar()
+            self.gravar(chave, resposta)
+        return resposta
+
+    def registrar_estatisticas(self, logger: logging.Logger = logger):
+        e = self.estatisticas
+        logger.info(
+            f"[*] Cache LLM: {e.acertos} acerto(s), {e.falhas} falha(s) "
+            f"({e.taxa_acerto:.0%} de acerto), {e.gravacoes} gravação(ões), {e.removidas} removida(s)"
+        )
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
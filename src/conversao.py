@@ -0,0 +1,394 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from src.instrumentacao import etapa, registrar_etapa
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Pastas padrão usadas na conversão (mesmos nomes de PASTAS no installer.py)
+PASTA_NOTEBOOKS = "notebooks"
+PASTA_MARKDOWN = "markdown"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Resultado da conversão de um notebook
+# Guarda o caminho de origem, o arquivo gerado, o tempo gasto, a mensagem de erro (se houver), se o
+# resultado veio do cache incremental, o pico de memória (RSS do processo, ou o pico do tracemalloc quando
+# o leitor streaming mede a memória) e os bytes economizados no processamento das imagens.
+@dataclass
+class ResultadoConversao:
+    arquivo: Path
+    sucesso: bool
+    saida: Optional[Path] = None
+    duracao: float = 0.0
+    erro: Optional[str] = None
+    em_cache: bool = False
+    memoria_pico: Optional[int] = None
+    bytes_economizados: int = 0
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Resumo de um lote de conversões
+# Totaliza sucessos e falhas e calcula a vazão (notebooks por segundo) do lote.
+@dataclass
+class ResumoConversao:
+    total: int
+    sucessos: int
+    falhas: int
+    duracao: float
+    vazao: float
+    erros: List[ResultadoConversao] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Exportador compartilhado
+# O MarkdownExporter do nbconvert é criado uma única vez por processo. Assim o custo de importar
+# nbconvert/Jinja e de compilar os templates é pago só na primeira conversão.
+_exportador = None
+
+
+def obter_exportador():
+    """
+    Retorna o MarkdownExporter do processo atual, criando-o na primeira chamada.
+    """
+    global _exportador
+    if _exportador is None:
+        from nbconvert import MarkdownExporter
+        _exportador = MarkdownExporter()
+    return _exportador
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para listar os notebooks de uma pasta
+# Retorna os arquivos .ipynb em ordem alfabética, ignorando as pastas de checkpoint do Jupyter.
+def listar_notebooks(pasta: Path) -> List[Path]:
+    if not pasta.exists():
+        return []
+    return sorted(
+        p for p in pasta.rglob("*.ipynb")
+        if ".ipynb_checkpoints" not in p.parts
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que dá a pasta de saída do Markdown de um notebook
+# Espelha em 'markdown_dir' o caminho do notebook relativo a 'notebooks_dir' ('vendas/2024/carga.ipynb' ->
+# 'markdown/vendas/2024/carga.md'), então notebooks com o mesmo nome em subpastas diferentes não se
+# sobrescrevem. Um notebook fora de 'notebooks_dir' espelha o caminho absoluto (sem a raiz do disco).
+def pasta_markdown(arquivo: Path, markdown_dir: Path, notebooks_dir: Optional[Path] = None) -> Path:
+    if notebooks_dir is None:
+        return markdown_dir
+    arquivo = Path(arquivo).resolve()
+    try:
+        relativo = arquivo.relative_to(Path(notebooks_dir).resolve())
+    except ValueError:
+        relativo = Path(arquivo.drive.rstrip(":"), *arquivo.parts[1:])
+    return markdown_dir / relativo.parent
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que dá o Markdown de um notebook relativo a 'markdown/' ('vendas/2024/carga.md')
+# É a chave do notebook no documento (seções, fragmentos e resumos), com ou sem o Markdown gravado.
+def documento_markdown(arquivo: Path, notebooks_dir: Optional[Path] = None) -> str:
+    return (pasta_markdown(arquivo, Path(), notebooks_dir) / f"{Path(arquivo).stem}.md").as_posix()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que converte um único notebook usando o exportador já carregado
+# Gera o mesmo resultado do 'python -m nbconvert --to markdown --output-dir': o arquivo .md
+# e a pasta '<nome>_files' com as imagens extraídas (reduzidas e deduplicadas pelo ProcessadorImagens,
+# com nomes 'img_<hash>.<ext>'). Quando 'limites' é informado, usa o leitor
+# streaming (src/leitor_notebook.py), que não carrega o notebook inteiro na memória.
+def converter_notebook(arquivo_path: Path, markdown_dir: Path, limites=None) -> ResultadoConversao:
+    if limites is not None:
+        from src.leitor_notebook import converter_notebook_streaming
+        return converter_notebook_streaming(arquivo_path, markdown_dir, limites)
+
+    inicio = time.perf_counter()
+    arquivo_path = Path(arquivo_path)
+
+    if not arquivo_path.exists():
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=False,
+            duracao=time.perf_counter() - inicio,
+            erro=f"Arquivo '{arquivo_path}' não encontrado.",
+        )
+
+    try:
+        from nbconvert.writers import FilesWriter
+
+        from src.imagens import ProcessadorImagens, processar_outputs
+        from src.leitor_notebook import LimitesSaida
+        from src.recursos import pico_rss
+
+        nome = arquivo_path.stem
+        recursos = {
+            "unique_key": nome,
+            "output_files_dir": f"{nome}_files",
+        }
+        corpo, recursos = obter_exportador().from_filename(str(arquivo_path), resources=recursos)
+
+        # Mesmo tratamento de imagens do leitor streaming: redução, recompressão e deduplicação
+        padrao = LimitesSaida()
+        imagens = ProcessadorImagens(dpi_alvo=padrao.dpi_imagem, orcamento_bytes=padrao.orcamento_bytes_imagem)
+        corpo, recursos["outputs"] = processar_outputs(corpo, recursos.get("outputs", {}), imagens)
+        imagens.registrar_economia(arquivo_path.name, logger)
+
+        markdown_dir.mkdir(parents=True, exist_ok=True)
+        escritor = FilesWriter(build_directory=str(markdown_dir))
+        saida = escritor.write(corpo, recursos, notebook_name=nome)
+
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=True,
+            saida=Path(saida),
+            duracao=time.perf_counter() - inicio,
+            memoria_pico=pico_rss(),
+            bytes_economizados=imagens.bytes_economizados,
+        )
+    except Exception as e:
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=False,
+            duracao=time.perf_counter() - inicio,
+            erro=str(e),
+        )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para registrar no log o resultado de uma conversão
+# Também registra o tempo do notebook no resumo de etapas (src/instrumentacao.py); a duração vem do
+# próprio resultado, então funciona igual para conversões feitas em workers de outro processo.
+def registrar_resultado(resultado: ResultadoConversao, logger: logging.Logger = logger):
+    registrar_etapa("conversao.notebook", resultado.duracao, resultado.sucesso, arquivo=resultado.arquivo.name)
+    if resultado.sucesso:
+        memoria = ""
+        if resultado.memoria_pico is not None:
+            memoria = f", pico de memória {resultado.memoria_pico / (1024 ** 2):.1f} MB"
+        logger.info(f"[✓] Convertido para Markdown com sucesso: {resultado.arquivo.name} ({resultado.duracao:.2f}s{memoria})")
+    else:
+        logger.error(f"[✗] Erro durante a conversão de {resultado.arquivo.name}: {resultado.erro}")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter vários notebooks em lote
+# Reaproveita o mesmo exportador (e seus templates compilados) para toda a lista e registra no log
+# o resultado e o tempo de cada arquivo. Com um 'plano' de recursos (src/recursos.py), notebooks que
+# não cabem no teto de memória, ou convertidos com a memória já no limite, usam o leitor streaming.
+# 'ao_concluir' recebe cada resultado assim que o notebook termina (ex.: para a saída em JSON da CLI).
+# Com 'notebooks_dir', as subpastas dos notebooks são espelhadas em 'markdown_dir' (ver pasta_markdown).
+def converte_lote(
+    arquivos: Iterable[Path],
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    markdown_dir: Optional[Path] = None,
+    limites=None,
+    plano=None,
+    ao_concluir: Optional[Callable[[ResultadoConversao], None]] = None,
+    notebooks_dir: Optional[Path] = None,
+) -> List[ResultadoConversao]:
+    markdown_dir = markdown_dir or base_dir / PASTA_MARKDOWN
+    resultados = []
+
+    for arquivo_path in arquivos:
+        limites_arquivo = limites
+        if plano is not None:
+            from src.recursos import medir_rss
+
+            rss = medir_rss()
+            no_limite = rss is not None and rss >= plano.limite_rss
+            limites_arquivo = plano.limites_para(arquivo_path, limites, forcar=no_limite)
+        destino = pasta_markdown(arquivo_path, markdown_dir, notebooks_dir)
+        resultado = converter_notebook(Path(arquivo_path), destino, limites_arquivo)
+        registrar_resultado(resultado, logger)
+        if ao_concluir is not None:
+            ao_concluir(resultado)
+        resultados.append(resultado)
+
+    return resultados
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter vários notebooks em paralelo
+# Usa um pool de processos com número limitado de workers; cada worker mantém o seu próprio exportador.
+# Os resultados voltam na mesma ordem da lista de entrada e a falha de um notebook vira apenas um resultado
+# com erro, sem interromper o restante do lote. Se um worker cair (ex.: morto por falta de memória), o pool
+# é recriado e os notebooks que estavam em andamento são convertidos de novo, um por vez: só o notebook
+# que derruba o worker sozinho é marcado como falha.
+# Os notebooks são enviados ao pool aos poucos (no máximo um por worker). Com um 'plano' de recursos, um
+# monitor acompanha o RSS do processo e dos workers: perto do limite só um notebook é convertido por
+# vez e, no limite, os próximos usam o leitor streaming, em vez de a máquina ficar sem memória.
+def converte_paralelo(
+    arquivos: Iterable[Path],
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    markdown_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    limites=None,
+    plano=None,
+    ao_concluir: Optional[Callable[[ResultadoConversao], None]] = None,
+    notebooks_dir: Optional[Path] = None,
+) -> List[ResultadoConversao]:
+    markdown_dir = markdown_dir or base_dir / PASTA_MARKDOWN
+    arquivos = [Path(a) for a in arquivos]
+    workers = workers or (plano.workers_conversao if plano is not None else None)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(arquivos) or 1))
+    resultados: List[Optional[ResultadoConversao]] = [None] * len(arquivos)
+
+    monitor = None
+    if plano is not None:
+        from src.recursos import MonitorMemoria
+
+        monitor = MonitorMemoria(plano.limite_rss, logger=logger).iniciar()
+
+    logger.info(f"[⚙️] Convertendo {len(arquivos)} notebook(s) com {workers} worker(s)")
+    pendentes = deque(enumerate(arquivos))
+    # Notebooks que estavam em andamento quando um worker caiu: voltam para a fila e são convertidos um
+    # por vez, até descobrir qual deles derruba o worker
+    suspeitos = set()
+
+    def concluir(indice: int, resultado: ResultadoConversao):
+        suspeitos.discard(indice)
+        registrar_resultado(resultado, logger)
+        if ao_concluir is not None:
+            ao_concluir(resultado)
+        resultados[indice] = resultado
+
+    try:
+        while pendentes:
+            em_andamento = {}
+            quebrado = False
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                while (pendentes or em_andamento) and not quebrado:
+                    simultaneos = workers
+                    if suspeitos or (monitor is not None and monitor.sob_pressao):
+                        simultaneos = 1
+                    while pendentes and len(em_andamento) < simultaneos:
+                        indice, arquivo_path = pendentes.popleft()
+                        limites_arquivo = limites
+                        if plano is not None:
+                            limites_arquivo = plano.limites_para(arquivo_path, limites, forcar=monitor.excedido)
+                        destino = pasta_markdown(arquivo_path, markdown_dir, notebooks_dir)
+                        try:
+                            futuro = executor.submit(converter_notebook, arquivo_path, destino, limites_arquivo)
+                        except BrokenProcessPool:
+                            pendentes.appendleft((indice, arquivo_path))
+                            quebrado = True
+                            break
+                        em_andamento[futuro] = indice
+                    if quebrado:
+                        break
+
+                    sozinho = len(em_andamento) == 1
+                    concluidos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        indice = em_andamento.pop(futuro)
+                        try:
+                            resultado = futuro.result()
+                        except BrokenProcessPool as e:
+                            quebrado = True
+                            if not sozinho:
+                                suspeitos.add(indice)
+                                pendentes.appendleft((indice, arquivos[indice]))
+                                continue
+                            resultado = ResultadoConversao(
+                                arquivo=arquivos[indice], sucesso=False, erro=f"O worker caiu ao converter: {e}"
+                            )
+                        except Exception as e:
+                            resultado = ResultadoConversao(
+                                arquivo=arquivos[indice], sucesso=False, erro=f"Falha no worker: {e}"
+                            )
+                        concluir(indice, resultado)
+
+            # Pool quebrado: os notebooks que ainda estavam nele voltam para a fila (um por vez) em um pool novo
+            for futuro, indice in em_andamento.items():
+                if futuro.done() and not futuro.cancelled() and futuro.exception() is None:
+                    concluir(indice, futuro.result())
+                else:
+                    suspeitos.add(indice)
+                    pendentes.appendleft((indice, arquivos[indice]))
+            if quebrado and pendentes:
+                logger.warning(f"[⚠️] Um worker caiu; reiniciando o pool para {len(pendentes)} notebook(s)")
+    finally:
+        if monitor is not None:
+            monitor.parar()
+            logger.info(f"[*] Pico de memória da conversão: {monitor.pico / (1024 ** 2):.0f} MB")
+
+    return resultados
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para resumir um lote de conversões
+def resumir_conversao(resultados: List[ResultadoConversao], duracao: float) -> ResumoConversao:
+    erros = [r for r in resultados if not r.sucesso]
+    return ResumoConversao(
+        total=len(resultados),
+        sucessos=len(resultados) - len(erros),
+        falhas=len(erros),
+        duracao=duracao,
+        vazao=len(resultados) / duracao if duracao > 0 else 0.0,
+        erros=erros,
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para registrar o resumo do lote no log
+def registrar_resumo(resumo: ResumoConversao, logger: logging.Logger = logger):
+    logger.info(
+        f"[*] Conversão concluída: {resumo.sucessos}/{resumo.total} com sucesso, "
+        f"{resumo.falhas} falha(s) em {resumo.duracao:.2f}s ({resumo.vazao:.2f} notebooks/s)"
+    )
+    for erro in resumo.erros:
+        logger.info(f"    [✗] {erro.arquivo}: {erro.erro}")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter todos os notebooks da pasta 'notebooks/' para a pasta 'markdown/'
+# Com workers > 1 a conversão é feita em paralelo e com 'limites' usa o leitor streaming; ao final
+# registra o resumo de vazão e falhas. 'plano' aplica os limites de memória de src/recursos.py.
+def converte_pasta(
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    notebooks_dir: Optional[Path] = None,
+    markdown_dir: Optional[Path] = None,
+    workers: int = 1,
+    limites=None,
+    plano=None,
+) -> List[ResultadoConversao]:
+    notebooks_dir = notebooks_dir or base_dir / PASTA_NOTEBOOKS
+    arquivos = listar_notebooks(notebooks_dir)
+    logger.info(f"[⚙️] Convertendo {len(arquivos)} notebook(s) de {notebooks_dir}")
+
+    inicio = time.perf_counter()
+    with etapa("conversao.pasta", notebooks=len(arquivos), workers=workers):
+        if workers > 1:
+            resultados = converte_paralelo(
+                arquivos, base_dir, logger, markdown_dir=markdown_dir, workers=workers, limites=limites, plano=plano,
+                notebooks_dir=notebooks_dir,
+            )
+        else:
+            resultados = converte_lote(
+                arquivos, base_dir, logger, markdown_dir=markdown_dir, limites=limites, plano=plano,
+                notebooks_dir=notebooks_dir,
+            )
+
+    registrar_resumo(resumir_conversao(resultados, time.perf_counter() - inicio), logger)
+    return resultados
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter um único notebook para Markdown
+# Mantida por compatibilidade: retorna True/False como a versão original baseada em subprocess.
+def converte_to_md(arquivo_path: Path, base_dir: Path, logger: logging.Logger = logger) -> bool:
+    resultados = converte_lote([arquivo_path], base_dir, logger)
+    return resultados[0].sucesso
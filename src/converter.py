@@ -0,0 +1,179 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import io
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.imagens import LARGURA_IMAGEM_CM
+from src.instrumentacao import etapa
+from src.modelo_documento import (
+    Bloco,
+    Codigo,
+    Imagem,
+    Lista,
+    Paragrafo,
+    Titulo,
+    Trecho,
+    blocos_notebook,
+    parsear_inline,
+    parsear_markdown,
+)
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Fonte usada nos blocos de código e nos outputs
+FONTE_CODIGO = "Consolas"
+TAMANHO_FONTE_CODIGO = 9
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para escrever trechos já separados (src/modelo_documento.py) em um parágrafo
+def adicionar_trechos(paragrafo, trechos: List[Trecho]):
+    for texto, estilo in trechos:
+        run = paragrafo.add_run(texto)
+        if estilo == "b":
+            run.bold = True
+        elif estilo == "i":
+            run.italic = True
+        elif estilo == "c":
+            run.font.name = FONTE_CODIGO
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para escrever um texto com marcações inline (**negrito**, *itálico*, `código`) em um parágrafo
+def adicionar_inline(paragrafo, texto: str):
+    adicionar_trechos(paragrafo, parsear_inline(texto))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para adicionar um bloco de código (fonte monoespaçada) ao documento
+def adicionar_codigo(documento, texto: str):
+    from docx.shared import Pt
+
+    paragrafo = documento.add_paragraph()
+    run = paragrafo.add_run(texto.rstrip("\n"))
+    run.font.name = FONTE_CODIGO
+    run.font.size = Pt(TAMANHO_FONTE_CODIGO)
+    return paragrafo
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para adicionar os blocos do modelo de documento (src/modelo_documento.py)
+# 'ler_imagem' recebe o 'ref' de um bloco Imagem e devolve os bytes; o padrão lê o caminho do arquivo
+# (blocos vindos direto do parse do Markdown).
+def adicionar_blocos(documento, blocos: List[Bloco], ler_imagem: Optional[Callable[[str], bytes]] = None):
+    from docx.shared import Cm
+
+    for bloco in blocos:
+        if isinstance(bloco, Titulo):
+            documento.add_heading(bloco.texto, level=bloco.nivel)
+        elif isinstance(bloco, Paragrafo):
+            adicionar_trechos(documento.add_paragraph(), bloco.trechos)
+        elif isinstance(bloco, Lista):
+            estilo = "List Number" if bloco.numerada else "List Bullet"
+            for item in bloco.itens:
+                adicionar_trechos(documento.add_paragraph(style=estilo), item)
+        elif isinstance(bloco, Codigo):
+            adicionar_codigo(documento, bloco.texto)
+        elif isinstance(bloco, Imagem):
+            if ler_imagem is not None:
+                documento.add_picture(io.BytesIO(ler_imagem(bloco.ref)), width=Cm(LARGURA_IMAGEM_CM))
+                continue
+            caminho = Path(bloco.ref)
+            if caminho.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif") and caminho.exists():
+                documento.add_picture(str(caminho), width=Cm(LARGURA_IMAGEM_CM))
+            else:
+                documento.add_paragraph(f"[Imagem não encontrada: {caminho.name}]")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para adicionar texto Markdown ao documento
+# O parse fica em src/modelo_documento.py (o mesmo usado pelos renderizadores HTML e PDF).
+# 'nivel_base' desloca os títulos (ex.: um '#' dentro da seção de um notebook vira título de nível 2).
+# Com 'pasta_imagens', linhas '![...](caminho)' relativas a essa pasta viram imagens (Markdown do nbconvert).
+def adicionar_markdown(documento, texto: str, nivel_base: int = 0, pasta_imagens: Optional[Path] = None):
+    adicionar_blocos(documento, parsear_markdown(texto, nivel_base, pasta_imagens))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para adicionar um notebook inteiro como uma seção do documento
+# As células viram blocos do modelo direto do .ipynb (blocos_notebook), sem arquivo Markdown intermediário,
+# e as imagens ficam só na memória até entrarem no documento. Um mesmo ProcessadorImagens pode ser
+# compartilhado entre notebooks de um documento para deduplicar imagens entre eles.
+def adicionar_notebook(
+    documento,
+    arquivo_path: Path,
+    limites=None,
+    titulo: Optional[str] = None,
+    resumo: Optional[str] = None,
+    imagens=None,
+):
+    from src.imagens import ProcessadorImagens
+    from src.leitor_notebook import LimitesSaida
+
+    limites = limites or LimitesSaida()
+    arquivo_path = Path(arquivo_path)
+    imagens = imagens or ProcessadorImagens(dpi_alvo=limites.dpi_imagem, orcamento_bytes=limites.orcamento_bytes_imagem)
+    conteudos: Dict[str, bytes] = {}
+
+    def guardar(conteudo: bytes, mime: str) -> str:
+        ref = f"imagem_{len(conteudos)}"
+        conteudos[ref] = conteudo
+        return ref
+
+    blocos: List[Bloco] = [Titulo(1, titulo or arquivo_path.stem)]
+    if resumo:
+        blocos.extend(parsear_markdown(resumo, nivel_base=1))
+    blocos.extend(blocos_notebook(arquivo_path, guardar, limites, imagens))
+    adicionar_blocos(documento, blocos, conteudos.__getitem__)
+    return imagens
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter um notebook direto para .docx
+def notebook_to_docx(
+    arquivo_path: Path,
+    output_path: Path,
+    limites=None,
+    resumo: Optional[str] = None,
+    logger: logging.Logger = logger,
+) -> bool:
+    from docx import Document
+
+    arquivo_path = Path(arquivo_path)
+    if not arquivo_path.exists():
+        logger.error(f"[✗] Arquivo '{arquivo_path}' não encontrado.")
+        return False
+
+    try:
+        with etapa("docx.renderizacao", arquivo=arquivo_path.name):
+            documento = Document()
+            imagens = adicionar_notebook(documento, arquivo_path, limites, resumo=resumo)
+        with etapa("docx.gravacao", arquivo=Path(output_path).name):
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            documento.save(str(output_path))
+        logger.info(f"[✓] Documento gerado: {output_path}")
+        imagens.registrar_economia(Path(output_path).name, logger)
+        return True
+    except Exception as e:
+        logger.exception(f"[✗] Erro ao gerar o documento de {arquivo_path.name}: {e}")
+        return False
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter um texto Markdown para .docx
+# Mantida por compatibilidade com o fluxo antigo (Markdown -> Word).
+def markdown_to_docx(markdown_text: str, output_path, logger: logging.Logger = logger) -> bool:
+    from docx import Document
+
+    try:
+        documento = Document()
+        adicionar_markdown(documento, markdown_text)
+        with etapa("docx.gravacao", arquivo=Path(output_path).name):
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            documento.save(str(output_path))
+        return True
+    except Exception as e:
+        logger.exception(f"[✗] Erro ao gerar o documento {output_path}: {e}")
+        return False
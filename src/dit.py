@@ -0,0 +1,400 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.conversao import PASTA_MARKDOWN, documento_markdown, listar_notebooks
+from src.converter import adicionar_blocos
+from src.instrumentacao import etapa
+from src.modelo_documento import (
+    ArmazemImagens,
+    Bloco,
+    ModeloDocumento,
+    Secao,
+    construir_modelo,
+    listar_markdown,
+    titulos_secao,
+)
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Documento final (pasta 'doc/' de PASTAS no installer.py)
+PASTA_DOC = "doc"
+NOME_DIT = "DIT"
+ARQUIVO_DIT = f"{NOME_DIT}.docx"
+FORMATOS = ("docx", "html", "pdf")
+TITULO_DIT = "Documento de Implementação Técnica"
+INTRODUCAO_PADRAO = (
+    "Este documento descreve a implementação técnica dos notebooks do projeto. "
+    "Cada seção corresponde a um notebook, com o resumo e o conteúdo das suas células."
+)
+
+# Cache dos fragmentos (uma seção renderizada por notebook)
+PASTA_FRAGMENTOS = Path(".cache") / "fragmentos_dit"
+ARQUIVO_INDICE_FRAGMENTOS = "indice.json"
+# Aumentar quando a renderização de uma seção mudar, para invalidar os fragmentos em cache
+VERSAO_FRAGMENTO = 2
+NIVEIS_SUMARIO = 2
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Fragmento de seção em cache
+# 'chave' é a chave da seção no modelo do documento (src/modelo_documento.py).
+@dataclass
+class Fragmento:
+    documento: str
+    chave: str
+    arquivo: str
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que renderiza a seção de um notebook em um fragmento
+# O fragmento é um zip com só o que a seção acrescenta ao documento: o XML do corpo ('corpo.xml') e as
+# imagens ('imagens/<rId>'). Estilos, tema e numeração são os do modelo padrão, iguais no documento final,
+# então não precisam ser guardados nem lidos de novo na montagem.
+def renderizar_fragmento(secao: Secao, armazem: ArmazemImagens, destino: Path):
+    from docx import Document
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from docx.oxml.ns import qn
+    from lxml import etree
+
+    fragmento = Document()
+    adicionar_blocos(fragmento, secao.blocos, armazem.ler)
+
+    corpo = fragmento.element.body
+    for sect_pr in corpo.findall(qn("w:sectPr")):
+        corpo.remove(sect_pr)
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    with zipfile.ZipFile(temporario, "w", zipfile.ZIP_DEFLATED) as arquivo:
+        arquivo.writestr("corpo.xml", etree.tostring(corpo))
+        for rid, relacao in fragmento.part.rels.items():
+            if relacao.reltype == RT.IMAGE:
+                arquivo.writestr(f"imagens/{rid}", relacao.target_part.blob, zipfile.ZIP_STORED)
+    os.replace(temporario, destino)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Montagem do documento final a partir dos fragmentos
+# Os elementos do corpo são inseridos como estão; cada imagem vira uma parte do documento final e as
+# referências 'r:embed' são trocadas pelo novo rId. Imagens iguais (mesmo hash), inclusive em notebooks
+# diferentes, usam uma única parte. As partes são criadas direto, sem o get_or_add_image do python-docx,
+# que recalcula o hash de todas as imagens do documento a cada chamada.
+class MontadorDIT:
+    def __init__(self, documento):
+        self.documento = documento
+        self._imagens: Dict[str, str] = {}
+
+    def _relacionar_imagem(self, blob: bytes) -> str:
+        from docx.image.image import Image
+        from docx.opc.constants import RELATIONSHIP_TYPE as RT
+        from docx.opc.packuri import PackURI
+        from docx.parts.image import ImagePart
+
+        h = hashlib.sha256(blob).hexdigest()
+        if h not in self._imagens:
+            imagem = Image.from_blob(blob)
+            nome = PackURI(f"/word/media/dit_{len(self._imagens) + 1}.{imagem.ext}")
+            self._imagens[h] = self.documento.part.relate_to(ImagePart.from_image(imagem, nome), RT.IMAGE)
+        return self._imagens[h]
+
+    def anexar(self, caminho: Path):
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import qn
+
+        with zipfile.ZipFile(caminho) as arquivo:
+            corpo = parse_xml(arquivo.read("corpo.xml"))
+            imagens = {n.rsplit("/", 1)[1]: n for n in arquivo.namelist() if n.startswith("imagens/")}
+            novos_rids = {}
+            for blip in corpo.iter(qn("a:blip")):
+                rid = blip.get(qn("r:embed"))
+                if rid in imagens:
+                    if rid not in novos_rids:
+                        novos_rids[rid] = self._relacionar_imagem(arquivo.read(imagens[rid]))
+                    blip.set(qn("r:embed"), novos_rids[rid])
+
+        destino = self.documento.element.body
+        final = destino.sectPr
+        for elemento in list(corpo):
+            if final is not None:
+                final.addprevious(elemento)
+            else:
+                destino.append(elemento)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Funções das partes fixas do documento: capa, sumário e introdução
+def adicionar_capa(documento, titulo: str, subtitulo: Optional[str], data: str):
+    from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
+
+    documento.add_heading(titulo, level=0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if subtitulo:
+        documento.add_paragraph(subtitulo).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    data = documento.add_paragraph(data)
+    data.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    data.add_run().add_break(WD_BREAK.PAGE)
+
+
+# O sumário é um campo TOC do Word. O conteúdo inicial do campo é a lista de títulos do modelo (sem abrir
+# nenhum fragmento), e o documento pede ao Word para atualizar os campos ao abrir, o que preenche os
+# números de página.
+def adicionar_sumario(documento, titulos: List[Tuple[int, str]]):
+    from docx.enum.text import WD_BREAK
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Cm
+
+    def campo(paragrafo, tipo: str):
+        marcador = OxmlElement("w:fldChar")
+        marcador.set(qn("w:fldCharType"), tipo)
+        if tipo == "begin":
+            marcador.set(qn("w:dirty"), "true")
+        paragrafo.add_run()._r.append(marcador)
+
+    documento.add_heading("Sumário", level=1)
+    entradas = titulos or [(1, "Atualize o sumário para ver as seções (F9 no Word).")]
+    paragrafos = []
+    for i, (nivel, texto) in enumerate(entradas):
+        paragrafo = documento.add_paragraph()
+        paragrafo.paragraph_format.left_indent = Cm(0.6 * (nivel - 1))
+        if i == 0:
+            campo(paragrafo, "begin")
+            instrucao = OxmlElement("w:instrText")
+            instrucao.set(qn("xml:space"), "preserve")
+            instrucao.text = f' TOC \\o "1-{NIVEIS_SUMARIO}" \\h \\z \\u '
+            paragrafo.add_run()._r.append(instrucao)
+            campo(paragrafo, "separate")
+        paragrafo.add_run(texto)
+        paragrafos.append(paragrafo)
+    campo(paragrafos[-1], "end")
+    paragrafos[-1].add_run().add_break(WD_BREAK.PAGE)
+
+    configuracoes = documento.settings.element
+    if configuracoes.find(qn("w:updateFields")) is None:
+        atualizar = OxmlElement("w:updateFields")
+        atualizar.set(qn("w:val"), "true")
+        configuracoes.append(atualizar)
+
+
+def adicionar_introducao(documento, introducao: List[Bloco]):
+    documento.add_heading("Introdução", level=1)
+    adicionar_blocos(documento, introducao)
+
+
+# Os ids de desenho ('wp:docPr') precisam ser únicos no documento; cada fragmento começa do 1
+def _renumerar_desenhos(documento):
+    from docx.oxml.ns import qn
+
+    for i, doc_pr in enumerate(documento.element.body.iter(qn("wp:docPr")), start=1):
+        doc_pr.set("id", str(i))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Cache de fragmentos
+# Índice JSON (documento -> chave, arquivo e títulos) em '.cache/fragmentos_dit/', gravado de forma atômica.
+class CacheFragmentos:
+    def __init__(self, pasta: Path):
+        self.pasta = pasta
+        self.caminho = pasta / ARQUIVO_INDICE_FRAGMENTOS
+        self.fragmentos: Dict[str, Fragmento] = {}
+        if self.caminho.exists():
+            try:
+                dados = json.loads(self.caminho.read_text(encoding="utf-8"))
+                if dados.get("versao") == VERSAO_FRAGMENTO:
+                    self.fragmentos = {
+                        d: Fragmento(d, f["chave"], f["arquivo"])
+                        for d, f in dados.get("fragmentos", {}).items()
+                    }
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"[⚠️] Índice de fragmentos corrompido, ignorando: {self.caminho}")
+
+    def valido(self, documento: str, chave: str) -> Optional[Fragmento]:
+        fragmento = self.fragmentos.get(documento)
+        if fragmento and fragmento.chave == chave and (self.pasta / fragmento.arquivo).exists():
+            return fragmento
+        return None
+
+    def salvar(self, existentes: Iterable[str]):
+        # Descarta só os fragmentos de notebooks cujo Markdown não existe mais; os que ficaram fora de
+        # uma execução parcial continuam valendo para as próximas
+        for documento in set(self.fragmentos) - set(existentes):
+            (self.pasta / self.fragmentos.pop(documento).arquivo).unlink(missing_ok=True)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        temporario = self.caminho.with_name(f"{self.caminho.name}.{os.getpid()}.tmp")
+        dados = {"versao": VERSAO_FRAGMENTO, "fragmentos": {d: asdict(f) for d, f in self.fragmentos.items()}}
+        temporario.write_text(json.dumps(dados, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporario, self.caminho)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que remove o conteúdo de um .docx de referência, mantendo só as configurações da seção (sectPr)
+def _limpar_corpo(documento):
+    from docx.oxml.ns import qn
+
+    corpo = documento.element.body
+    for elemento in list(corpo):
+        if elemento.tag != qn("w:sectPr"):
+            corpo.remove(elemento)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Renderizador DOCX do modelo do documento
+# O documento tem capa, sumário, introdução e uma seção por notebook. Cada seção é renderizada em um
+# fragmento em cache ('.cache/fragmentos_dit/'); só as seções cuja chave mudou são renderizadas de novo,
+# e o restante é copiado dos fragmentos.
+# Com 'modelo_docx' (um .docx de referência), o documento usa os estilos, margens, cabeçalho e rodapé
+# desse arquivo; o conteúdo dele é descartado. Os fragmentos usam os nomes de estilo padrão do Word
+# ('Heading 1', 'List Bullet'...), então não dependem do modelo e continuam válidos no cache.
+# 'existentes' lista os documentos (Markdown ou notebooks) que ainda existem: os fragmentos deles são mantidos
+# mesmo fora do modelo.
+def renderizar_docx(
+    modelo: ModeloDocumento,
+    armazem: ArmazemImagens,
+    output_path: Path,
+    pasta_fragmentos: Path,
+    logger: logging.Logger = logger,
+    modelo_docx: Optional[Path] = None,
+    existentes: Optional[Iterable[str]] = None,
+) -> Path:
+    from docx import Document
+
+    cache = CacheFragmentos(pasta_fragmentos)
+
+    # 1. Fragmentos: renderiza só o que mudou
+    fragmentos, renderizados = [], 0
+    with etapa("docx.fragmentos", secoes=len(modelo.secoes)):
+        for secao in modelo.secoes:
+            fragmento = cache.valido(secao.documento, secao.chave)
+            if fragmento is None:
+                arquivo = f"{secao.chave[:24]}.zip"
+                renderizar_fragmento(secao, armazem, cache.pasta / arquivo)
+                anterior = cache.fragmentos.get(secao.documento)
+                if anterior and anterior.arquivo != arquivo:
+                    (cache.pasta / anterior.arquivo).unlink(missing_ok=True)
+                fragmento = cache.fragmentos[secao.documento] = Fragmento(secao.documento, secao.chave, arquivo)
+                renderizados += 1
+            fragmentos.append(fragmento)
+        cache.salvar(set(existentes or ()) | {f.documento for f in fragmentos})
+
+    # 2. Montagem: capa, sumário, introdução e as seções copiadas dos fragmentos
+    with etapa("docx.dit", secoes=len(modelo.secoes), renderizadas=renderizados):
+        documento = Document(str(modelo_docx)) if modelo_docx else Document()
+        if modelo_docx:
+            _limpar_corpo(documento)
+        adicionar_capa(documento, modelo.titulo, modelo.subtitulo, modelo.data)
+        adicionar_sumario(documento, [t for s in modelo.secoes for t in titulos_secao(s, NIVEIS_SUMARIO)])
+        adicionar_introducao(documento, modelo.introducao)
+        montador = MontadorDIT(documento)
+        for fragmento in fragmentos:
+            montador.anexar(cache.pasta / fragmento.arquivo)
+        _renumerar_desenhos(documento)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        documento.save(str(output_path))
+    logger.info(
+        f"[✓] DIT gerado com {len(modelo.secoes)} seção(ões) ({renderizados} renderizada(s), "
+        f"{len(modelo.secoes) - renderizados} do cache): {output_path}"
+    )
+    return output_path
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para exportar o DIT em um ou mais formatos
+# O modelo do documento é montado uma única vez (nenhum resumo é pedido de novo) e cada formato só paga o
+# custo de renderização. Com 'notebooks_dir' (ou a lista 'notebooks'), as seções saem direto das células
+# dos notebooks, sem passar pelo Markdown; sem eles, dos Markdown já convertidos em 'markdown_dir'. O PDF é
+# gerado a partir do DOCX, localmente (src/renderizadores.py). 'resumos' (documento -> texto) entra
+# no início da seção correspondente; 'documentos' limita as seções a esses Markdown e 'modelo_docx' é o
+# .docx de referência de estilos. Retorna os arquivos gerados por formato; formatos com erro ficam de fora.
+def exportar_dit(
+    base_dir: Path,
+    formatos: Iterable[str] = ("docx",),
+    logger: logging.Logger = logger,
+    markdown_dir: Optional[Path] = None,
+    pasta_saida: Optional[Path] = None,
+    titulo: str = TITULO_DIT,
+    resumos: Optional[Dict[str, str]] = None,
+    introducao: str = INTRODUCAO_PADRAO,
+    subtitulo: Optional[str] = None,
+    output_docx: Optional[Path] = None,
+    documentos: Optional[Iterable[str]] = None,
+    modelo_docx: Optional[Path] = None,
+    notebooks_dir: Optional[Path] = None,
+    notebooks: Optional[Iterable[Path]] = None,
+) -> Dict[str, Path]:
+    from src.renderizadores import renderizar_html, renderizar_pdf
+
+    formatos = list(dict.fromkeys(formatos))
+    invalidos = [f for f in formatos if f not in FORMATOS]
+    if invalidos:
+        raise ValueError(f"Formato(s) não suportado(s): {', '.join(invalidos)} (use {', '.join(FORMATOS)})")
+
+    markdown_dir = markdown_dir or base_dir / PASTA_MARKDOWN
+    pasta_saida = pasta_saida or base_dir / PASTA_DOC
+    fontes = None
+    if notebooks is None and notebooks_dir is not None:
+        notebooks = listar_notebooks(notebooks_dir)
+    if notebooks is not None:
+        fontes = {documento_markdown(n, notebooks_dir): Path(n) for n in notebooks}
+    with etapa("modelo.construcao"):
+        modelo, armazem = construir_modelo(
+            base_dir, markdown_dir, titulo, introducao, resumos, subtitulo, logger, documentos, fontes
+        )
+    existentes = {a.relative_to(markdown_dir).as_posix() for a in listar_markdown(markdown_dir)}
+    existentes.update(fontes or ())
+
+    gerados: Dict[str, Path] = {}
+    for formato in formatos:
+        try:
+            if formato == "docx":
+                destino = output_docx or pasta_saida / ARQUIVO_DIT
+                gerados[formato] = renderizar_docx(
+                    modelo, armazem, destino, base_dir / PASTA_FRAGMENTOS, logger, modelo_docx, existentes
+                )
+            elif formato == "html":
+                with etapa("html.dit"):
+                    gerados[formato] = renderizar_html(modelo, armazem, pasta_saida / f"{NOME_DIT}.html")
+                logger.info(f"[✓] HTML gerado: {gerados[formato]}")
+            else:
+                docx = gerados.get("docx") or renderizar_docx(
+                    modelo, armazem, base_dir / PASTA_FRAGMENTOS / ARQUIVO_DIT, base_dir / PASTA_FRAGMENTOS, logger,
+                    modelo_docx, existentes,
+                )
+                with etapa("pdf.dit"):
+                    gerados[formato] = renderizar_pdf(docx, pasta_saida / f"{NOME_DIT}.pdf")
+                logger.info(f"[✓] PDF gerado: {gerados[formato]}")
+        except Exception as e:
+            logger.exception(f"[✗] Erro ao gerar o DIT em {formato.upper()}: {e}")
+    return gerados
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para montar o DIT (.docx) dos notebooks de 'notebooks_dir' (ou dos Markdown já convertidos)
+# Usada pelo observador e pela interface web: exporta só o DOCX e retorna True/False.
+def gerar_dit(
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    markdown_dir: Optional[Path] = None,
+    output_path: Optional[Path] = None,
+    titulo: str = TITULO_DIT,
+    resumos: Optional[Dict[str, str]] = None,
+    introducao: str = INTRODUCAO_PADRAO,
+    subtitulo: Optional[str] = None,
+    notebooks_dir: Optional[Path] = None,
+) -> bool:
+    try:
+        gerados = exportar_dit(
+            base_dir, ("docx",), logger, markdown_dir, titulo=titulo, resumos=resumos,
+            introducao=introducao, subtitulo=subtitulo, output_docx=output_path, notebooks_dir=notebooks_dir,
+        )
+    except Exception as e:
+        logger.exception(f"[✗] Erro ao gerar o DIT: {e}")
+        return False
+    return "docx" in gerados
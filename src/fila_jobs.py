@@ -0,0 +1,269 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Local padrão da fila dentro do projeto
+PASTA_CACHE = ".cache"
+ARQUIVO_FILA = "jobs.sqlite3"
+WORKERS_PADRAO = 2
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+ESTADOS_FINAIS = (CONCLUIDO, FALHOU, CANCELADO)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Exceção usada para interromper um job cancelado
+# É lançada pelo callback de progresso, então o cancelamento acontece no próximo ponto de progresso do job.
+class JobCancelado(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Estado de um job
+# 'segredos' (ex.: a chave da API) só existe em memória e nunca é gravado no SQLite.
+@dataclass
+class Job:
+    id: str
+    estado: str
+    parametros: Dict
+    progresso: float = 0.0
+    mensagem: str = ""
+    resultado: Optional[str] = None
+    erro: Optional[str] = None
+    criado_em: float = 0.0
+    atualizado_em: float = 0.0
+    segredos: Dict = field(default_factory=dict, repr=False)
+
+    @property
+    def finalizado(self) -> bool:
+        return self.estado in ESTADOS_FINAIS
+
+
+# Assinatura da função que executa um job: recebe o job e o callback progresso(fração, mensagem)
+# e devolve o resultado (ex.: o caminho do documento gerado)
+ExecutarJob = Callable[[Job, Callable[[float, str], None]], Optional[str]]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Fila de jobs persistente com um pool limitado de workers
+# Os jobs ficam em um arquivo SQLite ('.cache/jobs.sqlite3'). Ao iniciar, jobs que estavam em execução
+# quando o servidor caiu voltam para a fila; como a conversão é incremental, a nova execução pula o
+# que já tinha sido feito. O cancelamento é cooperativo: um job pendente é cancelado na hora e um job em
+# execução é interrompido no próximo callback de progresso.
+class FilaJobs:
+    def __init__(self, caminho: Path, executar: ExecutarJob, workers: int = WORKERS_PADRAO, intervalo: float = 0.5):
+        self.caminho = Path(caminho)
+        self.executar = executar
+        self.workers = max(1, workers)
+        self.intervalo = intervalo
+        self._trava = threading.Lock()
+        self._novo_job = threading.Event()
+        self._parar = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._segredos: Dict[str, Dict] = {}
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(str(self.caminho), timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " estado TEXT NOT NULL,"
+            " parametros TEXT NOT NULL,"
+            " progresso REAL NOT NULL DEFAULT 0,"
+            " mensagem TEXT NOT NULL DEFAULT '',"
+            " resultado TEXT,"
+            " erro TEXT,"
+            " cancelar INTEGER NOT NULL DEFAULT 0,"
+            " criado_em REAL NOT NULL,"
+            " atualizado_em REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_estado ON jobs (estado, criado_em)")
+        self._conexao.commit()
+
+    @classmethod
+    def do_projeto(cls, base_dir: Path, executar: ExecutarJob, workers: int = WORKERS_PADRAO) -> "FilaJobs":
+        return cls(base_dir / PASTA_CACHE / ARQUIVO_FILA, executar, workers)
+
+    # --- Consulta e envio ----------------------------------------------------------------------------------------
+    def enviar(self, parametros: Dict, segredos: Optional[Dict] = None) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        agora = time.time()
+        with self._trava:
+            self._conexao.execute(
+                "INSERT INTO jobs (id, estado, parametros, mensagem, criado_em, atualizado_em) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, PENDENTE, json.dumps(parametros, ensure_ascii=False), "Na fila", agora, agora),
+            )
+            self._conexao.commit()
+            if segredos:
+                self._segredos[job_id] = dict(segredos)
+        self._novo_job.set()
+        logger.info(f"[+] Job {job_id} enviado para a fila")
+        return job_id
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT id, estado, parametros, progresso, mensagem, resultado, erro, criado_em, atualizado_em"
+                " FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._job(linha) if linha else None
+
+    def listar(self, limite: int = 50) -> List[Job]:
+        with self._trava:
+            linhas = self._conexao.execute(
+                "SELECT id, estado, parametros, progresso, mensagem, resultado, erro, criado_em, atualizado_em"
+                " FROM jobs ORDER BY criado_em DESC LIMIT ?", (limite,)
+            ).fetchall()
+        return [self._job(linha) for linha in linhas]
+
+    def posicao_na_fila(self, job_id: str) -> int:
+        with self._trava:
+            return self._conexao.execute(
+                "SELECT COUNT(*) FROM jobs WHERE estado = ? AND criado_em < (SELECT criado_em FROM jobs WHERE id = ?)",
+                (PENDENTE, job_id),
+            ).fetchone()[0]
+
+    def _job(self, linha) -> Job:
+        job = Job(linha[0], linha[1], json.loads(linha[2]), *linha[3:])
+        job.segredos = self._segredos.get(job.id, {})
+        return job
+
+    # --- Cancelamento e progresso --------------------------------------------------------------------------------
+    def cancelar(self, job_id: str) -> bool:
+        with self._trava:
+            agora = time.time()
+            cursor = self._conexao.execute(
+                "UPDATE jobs SET estado = ?, mensagem = 'Cancelado', atualizado_em = ? WHERE id = ? AND estado = ?",
+                (CANCELADO, agora, job_id, PENDENTE),
+            )
+            if not cursor.rowcount:
+                cursor = self._conexao.execute(
+                    "UPDATE jobs SET cancelar = 1, mensagem = 'Cancelando...', atualizado_em = ? "
+                    "WHERE id = ? AND estado = ?",
+                    (agora, job_id, EXECUTANDO),
+                )
+            self._conexao.commit()
+            return bool(cursor.rowcount)
+
+    def _progresso(self, job_id: str, progresso: float, mensagem: str):
+        with self._trava:
+            self._conexao.execute(
+                "UPDATE jobs SET progresso = ?, mensagem = ?, atualizado_em = ? WHERE id = ?",
+                (max(0.0, min(1.0, progresso)), mensagem, time.time(), job_id),
+            )
+            self._conexao.commit()
+            cancelar = self._conexao.execute("SELECT cancelar FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        if cancelar:
+            raise JobCancelado(job_id)
+
+    def _finalizar(self, job_id: str, estado: str, mensagem: str, resultado: Optional[str] = None,
+                   erro: Optional[str] = None):
+        with self._trava:
+            self._conexao.execute(
+                "UPDATE jobs SET estado = ?, mensagem = ?, resultado = ?, erro = ?, atualizado_em = ?,"
+                " progresso = CASE WHEN ? = ? THEN 1.0 ELSE progresso END WHERE id = ?",
+                (estado, mensagem, resultado, erro, time.time(), estado, CONCLUIDO, job_id),
+            )
+            self._conexao.commit()
+            self._segredos.pop(job_id, None)
+
+    # --- Workers ---------------------------------------------------------------------------------------------------
+    def _reservar(self) -> Optional[Job]:
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT id FROM jobs WHERE estado = ? ORDER BY criado_em LIMIT 1", (PENDENTE,)
+            ).fetchone()
+            if linha is None:
+                return None
+            self._conexao.execute(
+                "UPDATE jobs SET estado = ?, mensagem = 'Iniciando', atualizado_em = ? WHERE id = ?",
+                (EXECUTANDO, time.time(), linha[0]),
+            )
+            self._conexao.commit()
+        return self.obter(linha[0])
+
+    def _worker(self):
+        while not self._parar.is_set():
+            job = self._reservar()
+            if job is None:
+                self._novo_job.wait(self.intervalo)
+                self._novo_job.clear()
+                continue
+
+            logger.info(f"[⚙️] Job {job.id} iniciado")
+            try:
+                resultado = self.executar(job, lambda p, m, i=job.id: self._progresso(i, p, m))
+                self._finalizar(job.id, CONCLUIDO, "Concluído", resultado=resultado)
+                logger.info(f"[✓] Job {job.id} concluído")
+            except JobCancelado:
+                self._finalizar(job.id, CANCELADO, "Cancelado")
+                logger.info(f"[-] Job {job.id} cancelado")
+            except Exception as e:
+                self._finalizar(job.id, FALHOU, "Erro", erro=str(e))
+                logger.exception(f"[✗] Job {job.id} falhou: {e}")
+
+    def iniciar(self):
+        with self._trava:
+            # Jobs interrompidos por uma parada do servidor: cancelados se já tinham sido cancelados,
+            # senão voltam para a fila
+            agora = time.time()
+            self._conexao.execute(
+                "UPDATE jobs SET estado = ?, mensagem = 'Cancelado', atualizado_em = ? WHERE estado = ? AND cancelar = 1",
+                (CANCELADO, agora, EXECUTANDO),
+            )
+            retomados = self._conexao.execute(
+                "UPDATE jobs SET estado = ?, mensagem = 'Retomado após reinício', atualizado_em = ? WHERE estado = ?",
+                (PENDENTE, agora, EXECUTANDO),
+            ).rowcount
+            self._conexao.commit()
+        if retomados:
+            logger.info(f"[*] {retomados} job(s) interrompido(s) voltaram para a fila")
+
+        self._parar.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"fila-jobs-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def parar(self, timeout: Optional[float] = None):
+        self._parar.set()
+        self._novo_job.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def fechar(self):
+        self.parar()
+        with self._trava:
+            self._conexao.close()
+
+    # --- Acompanhamento ------------------------------------------------------------------------------------------
+    # Gera o estado do job sempre que ele muda, até o job terminar (usado para mostrar o progresso na página)
+    def acompanhar(self, job_id: str, intervalo: float = 0.5) -> Iterator[Job]:
+        anterior = None
+        while True:
+            job = self.obter(job_id)
+            if job is None:
+                return
+            atual = (job.estado, job.progresso, job.mensagem)
+            if atual != anterior:
+                anterior = atual
+                yield job
+            if job.finalizado:
+                return
+            time.sleep(intervalo)
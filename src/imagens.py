@@ -0,0 +1,165 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Largura das imagens no documento final (usada também em src/converter.py)
+LARGURA_IMAGEM_CM = 15
+
+# Tabela única de formatos de imagem (leitor streaming, nbconvert e modelo do documento)
+EXTENSOES = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/svg+xml": ".svg",
+}
+MIMES_POR_EXTENSAO = {extensao: mime for mime, extensao in EXTENSOES.items()}
+MIMES_POR_EXTENSAO[".jpeg"] = "image/jpeg"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Imagem depois do processamento
+# 'duplicada' indica que o mesmo conteúdo já tinha aparecido antes no documento.
+@dataclass
+class ImagemProcessada:
+    conteudo: bytes
+    mime: str
+    hash: str
+    duplicada: bool = False
+    caminho: Optional[Path] = None
+
+    @property
+    def nome(self) -> str:
+        return f"img_{self.hash[:16]}{EXTENSOES[self.mime]}"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Processador de imagens dos outputs
+# Calcula o hash de cada imagem e processa cada conteúdo uma única vez: repetições (o mesmo gráfico
+# renderizado em várias células ou execuções) reaproveitam o resultado e, com 'pasta', o mesmo arquivo.
+# Com 'dpi_alvo', reduz imagens mais largas que LARGURA_IMAGEM_CM nesse DPI; com 'orcamento_bytes',
+# recomprime (PNG otimizado e, se ainda grande e sem transparência, JPEG) até caber no orçamento.
+# O redimensionamento usa o Pillow; sem ele, só a deduplicação é feita.
+class ProcessadorImagens:
+    def __init__(
+        self,
+        pasta: Optional[Path] = None,
+        dpi_alvo: Optional[int] = None,
+        orcamento_bytes: Optional[int] = None,
+    ):
+        self.pasta = pasta
+        self.dpi_alvo = dpi_alvo
+        self.orcamento_bytes = orcamento_bytes
+        self._processadas: Dict[str, ImagemProcessada] = {}
+        self.bytes_originais = 0
+        self.bytes_finais = 0
+        self.duplicadas = 0
+
+    @property
+    def bytes_economizados(self) -> int:
+        return self.bytes_originais - self.bytes_finais
+
+    def processar(self, conteudo: bytes, mime: str) -> ImagemProcessada:
+        h = hashlib.sha256(conteudo).hexdigest()
+        self.bytes_originais += len(conteudo)
+
+        if h in self._processadas:
+            self.duplicadas += 1
+            anterior = self._processadas[h]
+            return ImagemProcessada(anterior.conteudo, anterior.mime, h, duplicada=True, caminho=anterior.caminho)
+
+        novo_conteudo, novo_mime = self._reduzir(conteudo, mime)
+        imagem = ImagemProcessada(novo_conteudo, novo_mime, h)
+        if self.pasta is not None:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            imagem.caminho = self.pasta / imagem.nome
+            imagem.caminho.write_bytes(novo_conteudo)
+
+        self.bytes_finais += len(novo_conteudo)
+        self._processadas[h] = imagem
+        return imagem
+
+    def _reduzir(self, conteudo: bytes, mime: str):
+        if mime not in ("image/png", "image/jpeg") or (self.dpi_alvo is None and self.orcamento_bytes is None):
+            return conteudo, mime
+        try:
+            from PIL import Image
+        except ImportError:
+            logger.warning("[⚠️] Pillow não instalado: imagens não serão redimensionadas.")
+            self.dpi_alvo = self.orcamento_bytes = None
+            return conteudo, mime
+
+        try:
+            imagem = Image.open(io.BytesIO(conteudo))
+            imagem.load()
+        except OSError:
+            return conteudo, mime
+
+        alterada = False
+        if self.dpi_alvo:
+            largura_maxima = int(LARGURA_IMAGEM_CM / 2.54 * self.dpi_alvo)
+            if imagem.width > largura_maxima:
+                altura = max(1, round(imagem.height * largura_maxima / imagem.width))
+                imagem = imagem.resize((largura_maxima, altura), Image.LANCZOS)
+                alterada = True
+
+        if not alterada and (self.orcamento_bytes is None or len(conteudo) <= self.orcamento_bytes):
+            return conteudo, mime
+
+        candidatos = [self._salvar(imagem, "PNG", optimize=True)]
+        tem_alfa = imagem.mode in ("RGBA", "LA") or "transparency" in imagem.info
+        if self.orcamento_bytes and len(candidatos[0][0]) > self.orcamento_bytes and not tem_alfa:
+            rgb = imagem.convert("RGB")
+            for qualidade in (85, 70, 55, 40):
+                candidatos.append(self._salvar(rgb, "JPEG", quality=qualidade, optimize=True))
+                if len(candidatos[-1][0]) <= self.orcamento_bytes:
+                    break
+
+        melhor = min(candidatos, key=lambda c: len(c[0]))
+        if len(melhor[0]) >= len(conteudo):
+            return conteudo, mime
+        return melhor
+
+    @staticmethod
+    def _salvar(imagem, formato: str, **opcoes):
+        buffer = io.BytesIO()
+        imagem.save(buffer, format=formato, **opcoes)
+        return buffer.getvalue(), "image/png" if formato == "PNG" else "image/jpeg"
+
+    def registrar_economia(self, nome_documento: str, logger: logging.Logger = logger):
+        if not self.bytes_originais:
+            return
+        logger.info(
+            f"[*] Imagens de {nome_documento}: {len(self._processadas)} única(s), {self.duplicadas} duplicada(s), "
+            f"{self.bytes_originais / 1024:.0f} KB -> {self.bytes_finais / 1024:.0f} KB "
+            f"({self.bytes_economizados / 1024:.0f} KB economizados)"
+        )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que aplica o ProcessadorImagens às imagens extraídas pelo nbconvert
+# 'outputs' é o resources['outputs'] do exportador (caminho relativo -> bytes). Cada imagem é reduzida,
+# recomprimida e deduplicada como no leitor streaming; as referências no Markdown passam a apontar para
+# o arquivo final ('img_<hash>.<ext>'), e imagens repetidas viram um único arquivo.
+def processar_outputs(corpo: str, outputs: Dict[str, bytes],
+                      processador: ProcessadorImagens) -> Tuple[str, Dict[str, bytes]]:
+    novos: Dict[str, bytes] = {}
+    for nome, conteudo in outputs.items():
+        caminho = Path(nome)
+        mime = MIMES_POR_EXTENSAO.get(caminho.suffix.lower())
+        if mime is None or mime == "image/svg+xml":
+            novos[nome] = conteudo
+            continue
+        imagem = processador.processar(conteudo, mime)
+        destino = (caminho.parent / imagem.nome).as_posix()
+        for referencia in dict.fromkeys((nome, quote(nome))):
+            corpo = corpo.replace(f"]({referencia})", f"]({destino})")
+        novos[destino] = imagem.conteudo
+    return corpo, novos
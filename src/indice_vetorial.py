@@ -0,0 +1,379 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import hashlib
+import heapq
+import logging
+import math
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence
+
+from src.cache_llm import normalizar_texto
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Local padrão do índice dentro do projeto
+PASTA_CACHE = ".cache"
+ARQUIVO_INDICE = "indice_vetorial.sqlite3"
+MODELO_EMBEDDING_PADRAO = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_CARACTERES_SECAO = 4000
+
+_TITULO = re.compile(r"^#{1,6}\s+\S")
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Interface de um gerador de embeddings
+# Qualquer objeto com 'nome' e 'gerar(textos)' serve. O 'nome' identifica o modelo: se mudar, o índice é
+# refeito, porque vetores de modelos diferentes não são comparáveis.
+class Embedder(Protocol):
+    nome: str
+
+    def gerar(self, textos: List[str]) -> List[Sequence[float]]:
+        ...
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Embedder local com sentence-transformers (instalado pelo installer.py)
+# O modelo é carregado só na primeira chamada.
+class EmbedderSentenceTransformers:
+    def __init__(self, modelo: str = MODELO_EMBEDDING_PADRAO, tamanho_lote: int = 32):
+        self.nome = modelo
+        self.tamanho_lote = tamanho_lote
+        self._modelo = None
+
+    def gerar(self, textos: List[str]) -> List[Sequence[float]]:
+        if self._modelo is None:
+            from sentence_transformers import SentenceTransformer
+            self._modelo = SentenceTransformer(self.nome)
+        return [list(v) for v in self._modelo.encode(textos, batch_size=self.tamanho_lote)]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Embedder por hashing de palavras (sem modelo e sem dependências)
+# Cada palavra soma +1/-1 em uma posição escolhida pelo hash. Captura só a sobreposição de vocabulário,
+# mas é determinístico e funciona offline: serve para testes e como alternativa sem o modelo baixado.
+class EmbedderHash:
+    def __init__(self, dimensao: int = 256):
+        self.dimensao = dimensao
+        self.nome = f"hash-{dimensao}"
+
+    def gerar(self, textos: List[str]) -> List[Sequence[float]]:
+        vetores = []
+        for texto in textos:
+            vetor = [0.0] * self.dimensao
+            for palavra in _PALAVRA.findall(texto.lower()):
+                h = int.from_bytes(hashlib.blake2b(palavra.encode("utf-8"), digest_size=8).digest(), "little")
+                vetor[h % self.dimensao] += 1.0 if (h >> 32) & 1 else -1.0
+            vetores.append(vetor)
+        return vetores
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Seção de um documento convertido e resultado de busca
+@dataclass
+class Secao:
+    id: str
+    documento: str
+    texto: str
+
+    @property
+    def hash(self) -> str:
+        return hashlib.sha256(normalizar_texto(self.texto).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResultadoBusca:
+    id: str
+    documento: str
+    texto: str
+    similaridade: float
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para dividir um Markdown convertido em seções
+# Corta nos títulos (fora de blocos de código); seções maiores que 'max_caracteres' são divididas
+# nos parágrafos. O id de cada seção é '<documento>#<n>'.
+def dividir_secoes(documento: str, texto: str, max_caracteres: int = MAX_CARACTERES_SECAO) -> List[Secao]:
+    blocos, atual, em_codigo = [], [], False
+    for linha in texto.splitlines():
+        if linha.strip().startswith("```"):
+            em_codigo = not em_codigo
+        if not em_codigo and _TITULO.match(linha) and atual:
+            blocos.append("\n".join(atual))
+            atual = []
+        atual.append(linha)
+    if atual:
+        blocos.append("\n".join(atual))
+
+    partes = []
+    for bloco in blocos:
+        if not bloco.strip():
+            continue
+        if len(bloco) <= max_caracteres:
+            partes.append(bloco.strip())
+            continue
+        pedaco = ""
+        for paragrafo in bloco.split("\n\n"):
+            if pedaco and len(pedaco) + len(paragrafo) + 2 > max_caracteres:
+                partes.append(pedaco.strip())
+                pedaco = ""
+            pedaco = f"{pedaco}\n\n{paragrafo}" if pedaco else paragrafo
+        if pedaco.strip():
+            partes.append(pedaco.strip())
+
+    return [Secao(f"{documento}#{n}", documento, parte) for n, parte in enumerate(partes)]
+
+
+def _normalizar(vetor: Sequence[float]) -> array:
+    norma = math.sqrt(sum(x * x for x in vetor)) or 1.0
+    return array("f", (x / norma for x in vetor))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Índice vetorial persistente das seções
+# Fica em um SQLite ('.cache/indice_vetorial.sqlite3') com duas tabelas: 'vetores' (um embedding por hash de
+# conteúdo) e 'secoes' (id -> documento, texto e hash). Na atualização só o conteúdo novo é enviado ao
+# embedder: seções iguais (mesmo hash, mesmo em outro notebook) reaproveitam o vetor gravado.
+# Os vetores são gravados normalizados, então a similaridade de cosseno é o produto escalar. A busca
+# carrega a matriz uma vez (recarregada após atualizações) e usa faiss ou numpy quando instalados;
+# sem eles, faz a busca em Python puro.
+class IndiceVetorial:
+    def __init__(self, caminho: Path, embedder: Optional[Embedder] = None):
+        self.caminho = Path(caminho)
+        self.embedder = embedder or EmbedderSentenceTransformers()
+        self._trava = threading.Lock()
+        self._matriz = None
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(str(self.caminho), timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+        self._conexao.execute("CREATE TABLE IF NOT EXISTS vetores (hash TEXT PRIMARY KEY, vetor BLOB NOT NULL)")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS secoes ("
+            " id TEXT PRIMARY KEY,"
+            " documento TEXT NOT NULL,"
+            " texto TEXT NOT NULL,"
+            " hash TEXT NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_documento ON secoes (documento)")
+        self._verificar_modelo()
+        self._conexao.commit()
+
+    @classmethod
+    def do_projeto(cls, base_dir: Path, embedder: Optional[Embedder] = None) -> "IndiceVetorial":
+        return cls(base_dir / PASTA_CACHE / ARQUIVO_INDICE, embedder)
+
+    def _verificar_modelo(self):
+        linha = self._conexao.execute("SELECT valor FROM meta WHERE chave = 'modelo'").fetchone()
+        if linha and linha[0] != self.embedder.nome:
+            logger.info(f"[*] Modelo de embedding mudou ({linha[0]} -> {self.embedder.nome}); refazendo o índice")
+            self._conexao.execute("DELETE FROM vetores")
+            self._conexao.execute("DELETE FROM secoes")
+        self._conexao.execute("INSERT OR REPLACE INTO meta VALUES ('modelo', ?)", (self.embedder.nome,))
+
+    # --- Atualização -----------------------------------------------------------------------------------------------
+    # Sincroniza as seções dos documentos informados; seções antigas desses documentos que não existem mais
+    # são removidas. Com 'completo', documentos ausentes de 'secoes' também saem do índice.
+    def atualizar(self, secoes: Iterable[Secao], completo: bool = False) -> Dict[str, int]:
+        secoes = list(secoes)
+        documentos = {s.documento for s in secoes}
+        with self._trava:
+            conhecidos = {h for (h,) in self._conexao.execute("SELECT hash FROM vetores")}
+            novos: Dict[str, str] = {}
+            for secao in secoes:
+                if secao.hash not in conhecidos:
+                    novos.setdefault(secao.hash, secao.texto)
+
+        if novos:
+            vetores = self.embedder.gerar(list(novos.values()))
+        else:
+            vetores = []
+
+        with self._trava:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO vetores (hash, vetor) VALUES (?, ?)",
+                [(h, _normalizar(v).tobytes()) for h, v in zip(novos, vetores)],
+            )
+            ids = {s.id for s in secoes}
+            antigas = [
+                i for (i, d) in self._conexao.execute("SELECT id, documento FROM secoes")
+                if i not in ids and (completo or d in documentos)
+            ]
+            self._conexao.executemany("DELETE FROM secoes WHERE id = ?", [(i,) for i in antigas])
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO secoes (id, documento, texto, hash) VALUES (?, ?, ?, ?)",
+                [(s.id, s.documento, s.texto, s.hash) for s in secoes],
+            )
+            # Vetores que nenhuma seção usa mais
+            self._conexao.execute("DELETE FROM vetores WHERE hash NOT IN (SELECT hash FROM secoes)")
+            self._conexao.commit()
+            if novos or antigas:
+                self._matriz = None
+
+        estatisticas = {"secoes": len(secoes), "embeddings_gerados": len(novos), "removidas": len(antigas)}
+        logger.info(
+            f"[*] Índice vetorial: {estatisticas['secoes']} seção(ões), {estatisticas['embeddings_gerados']} "
+            f"embedding(s) gerado(s), {estatisticas['removidas']} removida(s)"
+        )
+        return estatisticas
+
+    # Indexa todos os Markdown de uma pasta (ex.: 'markdown/'), com o caminho relativo à pasta como documento.
+    # Com 'completo', documentos que não existem mais na pasta saem do índice; sem ele, os documentos de
+    # outras pastas (ex.: outros jobs no mesmo índice do projeto) são mantidos.
+    def atualizar_pasta(
+        self, markdown_dir: Path, max_caracteres: int = MAX_CARACTERES_SECAO, completo: bool = True
+    ) -> Dict[str, int]:
+        secoes = []
+        for arquivo in sorted(markdown_dir.rglob("*.md")):
+            documento = arquivo.relative_to(markdown_dir).as_posix()
+            secoes.extend(dividir_secoes(documento, arquivo.read_text(encoding="utf-8"), max_caracteres))
+        return self.atualizar(secoes, completo=completo)
+
+    # --- Busca -----------------------------------------------------------------------------------------------------
+    def _carregar_matriz(self):
+        linhas = self._conexao.execute(
+            "SELECT s.id, s.documento, s.texto, v.vetor FROM secoes s JOIN vetores v ON v.hash = s.hash ORDER BY s.id"
+        ).fetchall()
+        metadados = [linha[:3] for linha in linhas]
+        vetores = [array("f", linha[3]) for linha in linhas]
+        try:
+            import numpy as np
+        except ImportError:
+            return metadados, vetores, None
+
+        matriz = np.array([np.frombuffer(v.tobytes(), dtype=np.float32) for v in vetores], dtype=np.float32)
+        try:
+            import faiss
+        except ImportError:
+            return metadados, matriz, None
+        indice = faiss.IndexFlatIP(matriz.shape[1]) if len(matriz) else None
+        if indice is not None:
+            indice.add(matriz)
+        return metadados, matriz, indice
+
+    # Com 'documentos', só as seções desses documentos entram no resultado (ex.: os notebooks do job atual)
+    def buscar(
+        self,
+        texto: str,
+        k: int = 5,
+        excluir_documento: Optional[str] = None,
+        documentos: Optional[Iterable[str]] = None,
+    ) -> List[ResultadoBusca]:
+        consulta = _normalizar(self.embedder.gerar([texto])[0])
+        with self._trava:
+            if self._matriz is None:
+                self._matriz = self._carregar_matriz()
+            metadados, matriz, indice_faiss = self._matriz
+        if not metadados:
+            return []
+
+        permitidos = set(documentos) if documentos is not None else None
+
+        def permitido(documento: str) -> bool:
+            return documento != excluir_documento and (permitidos is None or documento in permitidos)
+
+        # Pede alguns candidatos a mais para compensar os dos documentos excluídos
+        n = min(len(metadados), k + sum(1 for m in metadados if not permitido(m[1])))
+        if indice_faiss is not None:
+            import numpy as np
+            similaridades, posicoes = indice_faiss.search(np.array([consulta], dtype=np.float32), n)
+            candidatos = list(zip(similaridades[0].tolist(), posicoes[0].tolist()))
+        elif not isinstance(matriz, list):
+            import numpy as np
+            pontuacoes = matriz @ np.frombuffer(consulta.tobytes(), dtype=np.float32)
+            melhores = np.argsort(-pontuacoes)[:n]
+            candidatos = [(float(pontuacoes[i]), int(i)) for i in melhores]
+        else:
+            pontuacoes = ((sum(a * b for a, b in zip(v, consulta)), i) for i, v in enumerate(matriz))
+            candidatos = heapq.nlargest(n, pontuacoes)
+
+        resultados = []
+        for similaridade, posicao in candidatos:
+            identificador, documento, texto_secao = metadados[posicao]
+            if not permitido(documento):
+                continue
+            resultados.append(ResultadoBusca(identificador, documento, texto_secao, similaridade))
+        return resultados[:k]
+
+    def fechar(self):
+        with self._trava:
+            self._conexao.close()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que escolhe o embedder disponível
+# Usa o sentence-transformers quando instalado; sem ele, o EmbedderHash (offline, sem modelo).
+def embedder_padrao(logger: logging.Logger = logger) -> Embedder:
+    import importlib.util
+
+    if importlib.util.find_spec("sentence_transformers") is not None:
+        return EmbedderSentenceTransformers()
+    logger.info("[*] sentence-transformers não instalado: índice vetorial usa embeddings por hashing")
+    return EmbedderHash()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que abre o índice do projeto e indexa os Markdown de 'markdown_dir' (sem 'completo')
+# Se o embedder falhar (ex.: modelo não baixado e sem rede), usa um índice em memória com o EmbedderHash só
+# nesta execução: o índice do projeto não é refeito com outro modelo e o job não falha por causa do contexto.
+def indexar_pasta(
+    base_dir: Path, markdown_dir: Path, embedder: Optional[Embedder] = None, logger: logging.Logger = logger
+) -> IndiceVetorial:
+    indice = IndiceVetorial.do_projeto(base_dir, embedder or embedder_padrao(logger))
+    try:
+        indice.atualizar_pasta(markdown_dir, completo=False)
+        return indice
+    except Exception as e:
+        indice.fechar()
+        if isinstance(indice.embedder, EmbedderHash):
+            raise
+        logger.warning(f"[⚠️] Falha ao gerar embeddings com {indice.embedder.nome} ({e}); usando hashing neste job")
+
+    indice = IndiceVetorial(Path(":memory:"), EmbedderHash())
+    indice.atualizar_pasta(markdown_dir, completo=False)
+    return indice
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta o bloco de contexto com as seções relacionadas de outros notebooks
+# Só as 'k' seções mais parecidas com 'texto', limitadas a 'max_caracteres'; vazio se não houver nenhuma.
+# 'documentos' restringe a busca a esses documentos do índice.
+def contexto_relacionado(
+    indice: IndiceVetorial,
+    texto: str,
+    k: int = 3,
+    max_caracteres: int = MAX_CARACTERES_SECAO,
+    documento: Optional[str] = None,
+    documentos: Optional[Iterable[str]] = None,
+) -> str:
+    trechos, total = [], 0
+    for resultado in indice.buscar(texto, k, excluir_documento=documento, documentos=documentos):
+        if total + len(resultado.texto) > max_caracteres:
+            break
+        trechos.append(f"[{resultado.id}]\n{resultado.texto}")
+        total += len(resultado.texto)
+    if not trechos:
+        return ""
+    contexto = "\n\n".join(trechos)
+    return f"---\nContexto relacionado (outros notebooks do projeto, apenas para referência):\n{contexto}"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que acrescenta ao texto de uma seção as seções relacionadas de outros notebooks
+# O resultado vai para o prompt no lugar do texto original (ex.: resumir_secao / resumir_secoes): o modelo
+# recebe só as 'k' seções mais parecidas, limitadas a 'max_caracteres', e não o corpus inteiro.
+def texto_com_contexto(
+    indice: IndiceVetorial,
+    texto: str,
+    k: int = 3,
+    max_caracteres: int = MAX_CARACTERES_SECAO,
+    documento: Optional[str] = None,
+) -> str:
+    contexto = contexto_relacionado(indice, texto, k, max_caracteres, documento)
+    return f"{texto}\n\n{contexto}" if contexto else texto
@@ -0,0 +1,231 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+FORMATO_LOG = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Uma thread de gravação por logger configurado (a chave é o nome do logger; None é o raiz)
+_listeners: Dict[Optional[str], logging.handlers.QueueListener] = {}
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para configurar um logger que não bloqueia em disco
+# O logger só coloca os registros em uma fila (QueueHandler); uma thread em segundo plano (QueueListener)
+# grava no arquivo da pasta 'log/' e no console. Assim a escrita em disco sai do caminho crítico.
+# Com nome=None configura o logger raiz, capturando também os loggers dos módulos de src/.
+# 'fluxo' troca o console (padrão: stdout), ex.: para stderr quando o stdout é a saída da CLI.
+def configurar_logger_assincrono(
+    base_dir: Path,
+    nome: Optional[str] = "ditfy",
+    prefixo_arquivo: str = "log_",
+    fluxo: Optional[TextIO] = None,
+) -> logging.Logger:
+    log_dir = base_dir / "log"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = log_dir / f"{prefixo_arquivo}{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.log"
+
+    logger = logging.getLogger(nome)
+    logger.setLevel(logging.DEBUG)
+    # Remove handlers anteriores (para evitar duplicidade em múltiplas execuções) e para a thread de
+    # gravação da configuração anterior, fechando o arquivo de log dela
+    _parar_listener(_listeners.pop(nome, None))
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    if nome is not None:
+        logger.propagate = False
+
+    formatter = logging.Formatter(FORMATO_LOG)
+
+    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(formatter)
+
+    stream_handler = logging.StreamHandler(fluxo or sys.stdout)
+    stream_handler.setLevel(logging.INFO)
+    stream_handler.setFormatter(formatter)
+
+    fila: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(fila))
+
+    listener = logging.handlers.QueueListener(fila, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    _listeners[nome] = listener
+
+    logger.info(f"[✓] Arquivo de log criado: {log_path}")
+    return logger
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que esvazia a fila de um QueueListener, para a thread e fecha os handlers (arquivo e console)
+def _parar_listener(listener: Optional[logging.handlers.QueueListener]):
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para esvaziar as filas de log e parar as threads de gravação
+# Registrada no atexit, para que nenhuma mensagem se perca no fim do processo.
+def encerrar_logs():
+    while _listeners:
+        _parar_listener(_listeners.popitem()[1])
+
+
+atexit.register(encerrar_logs)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Registro de tempo de uma etapa
+@dataclass
+class TempoEtapa:
+    etapa: str
+    inicio: float
+    duracao: float
+    sucesso: bool = True
+    atributos: Dict = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Coletor das etapas da execução atual
+# Guarda os tempos em memória (barato e thread-safe); o arquivo só é escrito no final, em gravar_resumo,
+# que também esvazia o registro. Processos longos (observador, interface) usam um registro por lote ou
+# job (ver 'execucao_medida'), então a memória não cresce com o tempo de vida do processo.
+class RegistroEtapas:
+    def __init__(self):
+        self._etapas: List[TempoEtapa] = []
+        self._trava = threading.Lock()
+
+    def registrar(self, etapa: TempoEtapa):
+        with self._trava:
+            self._etapas.append(etapa)
+
+    def etapas(self) -> List[TempoEtapa]:
+        with self._trava:
+            return list(self._etapas)
+
+    def limpar(self):
+        with self._trava:
+            self._etapas.clear()
+
+    def esvaziar(self) -> List[TempoEtapa]:
+        with self._trava:
+            etapas, self._etapas = self._etapas, []
+        return etapas
+
+    def resumo(self, etapas: Optional[List[TempoEtapa]] = None) -> Dict[str, Dict]:
+        totais: Dict[str, Dict] = {}
+        for e in self.etapas() if etapas is None else etapas:
+            total = totais.setdefault(e.etapa, {"quantidade": 0, "falhas": 0, "total": 0.0, "maximo": 0.0})
+            total["quantidade"] += 1
+            total["falhas"] += 0 if e.sucesso else 1
+            total["total"] += e.duracao
+            total["maximo"] = max(total["maximo"], e.duracao)
+        for total in totais.values():
+            total["media"] = total["total"] / total["quantidade"]
+        return totais
+
+
+registro_etapas = RegistroEtapas()
+
+# Registro em uso no contexto atual (thread ou tarefa asyncio); fora de 'execucao_medida' é o global
+_registro_atual: contextvars.ContextVar[RegistroEtapas] = contextvars.ContextVar(
+    "registro_etapas", default=registro_etapas
+)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para registrar uma duração já medida (ex.: tempo devolvido por um worker do pool de processos)
+def registrar_etapa(nome: str, duracao: float, sucesso: bool = True, **atributos):
+    _registro_atual.get().registrar(TempoEtapa(nome, time.time() - duracao, duracao, sucesso, atributos))
+    logger.debug(f"[⏱] {nome}: {duracao:.3f}s" + (f" {atributos}" if atributos else ""))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Context manager que mede o tempo de uma etapa
+#   with etapa("docx.gravacao", arquivo="DIT.docx"):
+#       ...
+# Se o bloco lançar exceção, a etapa é registrada como falha e a exceção segue normalmente.
+@contextmanager
+def etapa(nome: str, **atributos):
+    inicio = time.perf_counter()
+    sucesso = True
+    try:
+        yield
+    except BaseException:
+        sucesso = False
+        raise
+    finally:
+        registrar_etapa(nome, time.perf_counter() - inicio, sucesso, **atributos)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Decorator equivalente ao 'etapa', para funções inteiras
+def cronometrar(nome: Optional[str] = None):
+    def decorator(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            with etapa(nome or funcao.__qualname__):
+                return funcao(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para gravar o resumo de tempos da execução em JSON lines na pasta 'log/'
+# Uma linha por etapa medida e, por último, uma linha com os totais por nome de etapa. As etapas gravadas
+# saem do registro (o do contexto atual, se 'registro' não for informado).
+def gravar_resumo_etapas(base_dir: Path, execucao: str = "execucao",
+                         registro: Optional[RegistroEtapas] = None) -> Path:
+    registro = registro or _registro_atual.get()
+    etapas = registro.esvaziar()
+    log_dir = base_dir / "log"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    caminho = log_dir / f"tempos_{execucao}_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S_%f')}.jsonl"
+
+    with open(caminho, "w", encoding="utf-8") as f:
+        for e in etapas:
+            f.write(json.dumps({"tipo": "etapa", **asdict(e)}, ensure_ascii=False, default=str) + "\n")
+        f.write(json.dumps({"tipo": "resumo", "execucao": execucao, "etapas": registro.resumo(etapas)},
+                           ensure_ascii=False) + "\n")
+
+    logger.info(f"[✓] Resumo de tempos gravado: {caminho}")
+    return caminho
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Context manager que mede uma execução (um comando da CLI, um lote do observador, um job da interface)
+#   with execucao_medida(base_dir, f"job_{job.id}"):
+#       ...
+# As etapas do bloco vão para um registro próprio (execuções em threads diferentes não se misturam) e o
+# resumo é gravado no final, mesmo com erro.
+@contextmanager
+def execucao_medida(base_dir: Path, execucao: str) -> Iterator[RegistroEtapas]:
+    registro = RegistroEtapas()
+    token = _registro_atual.set(registro)
+    try:
+        yield registro
+    finally:
+        _registro_atual.reset(token)
+        try:
+            gravar_resumo_etapas(base_dir, execucao, registro)
+        except OSError as e:
+            logger.warning(f"[⚠️] Não foi possível gravar o resumo de tempos ({execucao}): {e}")
@@ -0,0 +1,255 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import argparse
+import logging
+import shutil
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.fila_jobs import CONCLUIDO, FALHOU, PENDENTE, FilaJobs, Job
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+PORTA_PADRAO = 7860
+PASTA_JOBS = ".jobs"
+RETENCAO_JOBS = 24 * 3600  # segundos que a pasta de um job finalizado (e o DIT.docx dele) fica disponível
+URL_TOKEN_OPENAI = "https://platform.openai.com/api-keys"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que executa um job de geração do DIT
+# Cada job tem a sua pasta de trabalho ('.jobs/<id>/' com notebooks/, markdown/ e doc/), então usuários
+# diferentes não sobrescrevem os arquivos uns dos outros. A conversão é incremental dentro dessa pasta:
+# se o servidor reiniciar no meio do job, a nova execução pula os notebooks já convertidos.
+# 'progresso' é chamado entre as etapas; é por ele que o cancelamento interrompe o job.
+# 'plano' (src/recursos.py) define o teto de memória por notebook, o cache e a concorrência do LLM.
+# Os tempos das etapas do job são gravados em 'log/tempos_job_<id>_*.jsonl' no fim do job.
+def gerar_documentacao(job: Job, progresso: Callable[[float, str], None], base_dir: Path, plano=None) -> str:
+    from src.instrumentacao import execucao_medida
+
+    with execucao_medida(base_dir, f"job_{job.id}"):
+        return _gerar_documentacao(job, progresso, base_dir, plano)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Etapas do job: cópia dos notebooks, conversão incremental, resumos (opcional) e DIT.docx
+def _gerar_documentacao(job: Job, progresso: Callable[[float, str], None], base_dir: Path, plano=None) -> str:
+    from src.cache_conversao import converte_incremental
+    from src.conversao import listar_notebooks
+    from src.dit import gerar_dit
+
+    origem = Path(job.parametros["pasta"]).expanduser()
+    trabalho = base_dir / PASTA_JOBS / job.id
+    notebooks_dir = trabalho / "notebooks"
+
+    progresso(0.0, f"Copiando notebooks de {origem}")
+    arquivos = listar_notebooks(origem)
+    if not arquivos:
+        raise ValueError(f"Nenhum notebook (.ipynb) encontrado em {origem}")
+    for arquivo in arquivos:
+        destino = notebooks_dir / arquivo.relative_to(origem)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(arquivo, destino)
+
+    copias = listar_notebooks(notebooks_dir)
+    resumir = bool(job.parametros.get("resumir"))
+    peso_conversao = 0.5 if resumir else 0.9
+    saidas: Dict[Path, Path] = {}
+    for i, arquivo in enumerate(copias):
+        progresso(0.05 + peso_conversao * i / len(copias), f"Convertendo {arquivo.name} ({i + 1}/{len(copias)})")
+        resultado = converte_incremental(trabalho, logger, notebooks_dir, apenas=[arquivo], plano=plano)[0]
+        if not resultado.sucesso:
+            raise RuntimeError(f"Falha ao converter {arquivo.name}: {resultado.erro}")
+        saidas[arquivo] = resultado.saida
+
+    resumos = {}
+    if resumir:
+        resumos = _resumir_notebooks(
+            saidas, job, progresso, base_dir, trabalho / "markdown", inicio=0.05 + peso_conversao, plano=plano
+        )
+
+    progresso(0.95, "Gerando o DIT.docx")
+    if not gerar_dit(trabalho, logger, resumos=resumos, notebooks_dir=notebooks_dir):
+        raise RuntimeError("Falha ao gerar o DIT.docx (detalhes no log)")
+    return str(trabalho / "doc" / "DIT.docx")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para resumir cada notebook com o modelo
+# Usa o cache de respostas do projeto (compartilhado entre os jobs) e o planejador de requisições.
+# 'saidas' liga cada notebook ao seu Markdown em 'markdown_dir'. O índice vetorial também é do projeto
+# ('.cache/', fora da pasta do job): as seções são chaveadas pelo caminho relativo do Markdown e só o conteúdo
+# alterado é embedado de novo. Cada notebook recebe, como contexto do prompt, só as seções mais parecidas
+# dos outros notebooks do mesmo job.
+def _resumir_notebooks(
+    saidas: Dict[Path, Path], job: Job, progresso, base_dir: Path, markdown_dir: Path, inicio: float, plano=None
+):
+    from src.cache_llm import CacheLLM
+    from src.indice_vetorial import MAX_CARACTERES_SECAO, contexto_relacionado, indexar_pasta
+    from src.leitor_notebook import iterar_celulas
+    from src.llm import criar_cliente_async
+    from src.planejador_tokens import resumir_celulas
+
+    cache = CacheLLM.do_projeto(base_dir, plano.cache_llm_bytes) if plano else CacheLLM.do_projeto(base_dir)
+    # Sem 'completo': as seções dos outros jobs continuam no índice do projeto
+    indice = indexar_pasta(base_dir, markdown_dir, logger=logger)
+    opcoes = {"concorrencia": plano.concorrencia_llm} if plano else {}
+    documentos = {arquivo: markdown.relative_to(markdown_dir).as_posix() for arquivo, markdown in saidas.items()}
+    resumos = {}
+    try:
+        for i, (arquivo, markdown) in enumerate(saidas.items()):
+            etapa = f"Resumindo {arquivo.name} ({i + 1}/{len(saidas)})"
+            progresso(inicio + (0.95 - inicio) * i / len(saidas), etapa)
+            texto = markdown.read_text(encoding="utf-8")[:MAX_CARACTERES_SECAO]
+            try:
+                contexto = contexto_relacionado(
+                    indice, texto, documento=documentos[arquivo], documentos=documentos.values()
+                )
+            except Exception as e:
+                logger.warning(f"[⚠️] Contexto relacionado indisponível para {arquivo.name}: {e}")
+                contexto = ""
+            cliente = criar_cliente_async(base_dir, api_key=job.segredos.get("api_key"))
+            por_celula = resumir_celulas(
+                list(iterar_celulas(arquivo)), cliente=cliente, cache=cache, logger=logger, contexto=contexto, **opcoes
+            )
+            resumos[documentos[arquivo]] = "\n\n".join(por_celula.values())
+    finally:
+        indice.fechar()
+        cache.fechar()
+    return resumos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que apaga as pastas de trabalho ('.jobs/<id>/') de jobs finalizados há mais de 'retencao' segundos
+# Pastas de jobs pendentes ou em execução nunca são apagadas; pastas sem job na fila (ex.: de uma fila
+# apagada) usam a data de modificação da pasta. Retorna quantas pastas foram removidas.
+def limpar_jobs(base_dir: Path, fila: FilaJobs, retencao: float = RETENCAO_JOBS) -> int:
+    pasta_jobs = base_dir / PASTA_JOBS
+    if not pasta_jobs.exists():
+        return 0
+    limite = time.time() - retencao
+    removidas = 0
+    for pasta in pasta_jobs.iterdir():
+        if not pasta.is_dir():
+            continue
+        job = fila.obter(pasta.name)
+        if job is None:
+            expirada = pasta.stat().st_mtime < limite
+        else:
+            expirada = job.finalizado and job.atualizado_em < limite
+        if expirada:
+            shutil.rmtree(pasta, ignore_errors=True)
+            removidas += 1
+    if removidas:
+        logger.info(f"[-] {removidas} pasta(s) de job expirada(s) removida(s) de {pasta_jobs}")
+    return removidas
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que formata o estado de um job para o painel de status
+def formatar_status(job: Job, posicao: int = 0) -> str:
+    linhas = [f"Job {job.id}: {job.estado} ({job.progresso:.0%})", job.mensagem]
+    if posicao:
+        linhas.append(f"{posicao} job(s) na frente na fila")
+    if job.estado == FALHOU and job.erro:
+        linhas.append(f"[✗] {job.erro}")
+    return "\n".join(linha for linha in linhas if linha)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta a interface Gradio
+# O botão "Processar" só envia o job para a fila e acompanha o progresso: o trabalho pesado roda no pool
+# de workers da FilaJobs, então vários usuários podem usar a página ao mesmo tempo. O campo "ID do job"
+# permite voltar a acompanhar um job (por exemplo, depois de recarregar a página ou reiniciar o servidor).
+# Com 'base_dir', cada envio também apaga as pastas de jobs expirados (ver limpar_jobs), então o disco
+# só guarda os jobs do período de retenção.
+def criar_interface(fila: FilaJobs, base_dir: Optional[Path] = None, retencao: float = RETENCAO_JOBS):
+    import gradio as gr
+
+    def acompanhar(job_id: str):
+        arquivo = None
+        for job in fila.acompanhar(job_id):
+            if job.estado == CONCLUIDO and job.resultado and Path(job.resultado).exists():
+                arquivo = job.resultado
+            posicao = fila.posicao_na_fila(job_id) if job.estado == PENDENTE else 0
+            yield job_id, formatar_status(job, posicao), arquivo
+
+    def processar(token: str, pasta: str):
+        if not pasta or not Path(pasta).expanduser().is_dir():
+            yield "", "[✗] Informe uma pasta válida com os notebooks.", None
+            return
+        if base_dir is not None:
+            limpar_jobs(base_dir, fila, retencao)
+        # O token fica só em memória; se o servidor reiniciar, o job retomado usa a chave do .env
+        job_id = fila.enviar({"pasta": pasta, "resumir": bool(token)}, segredos={"api_key": token} if token else None)
+        yield from acompanhar(job_id)
+
+    def retomar(job_id: str):
+        if not job_id or fila.obter(job_id.strip()) is None:
+            yield job_id, "[✗] Job não encontrado.", None
+            return
+        yield from acompanhar(job_id.strip())
+
+    def cancelar(job_id: str):
+        if job_id and fila.cancelar(job_id.strip()):
+            return "Cancelamento solicitado."
+        return "[✗] Nenhum job pendente ou em execução com esse ID."
+
+    with gr.Blocks(title="DITfy") as interface:
+        gr.Markdown("# DITfy\nConverte notebooks Jupyter em um Documento de Implementação Técnica (DIT.docx).")
+        with gr.Row():
+            token = gr.Textbox(label="Token OpenAI", type="password", placeholder="sk-...")
+            gr.Button("Criar Token OpenAI", link=URL_TOKEN_OPENAI)
+        pasta = gr.Textbox(label="Pasta dos notebooks", placeholder="C:/projetos/notebooks")
+        with gr.Row():
+            botao_processar = gr.Button("⚙️ Processar", variant="primary")
+            botao_cancelar = gr.Button("Cancelar")
+        with gr.Row():
+            job_id = gr.Textbox(label="ID do job")
+            botao_acompanhar = gr.Button("Acompanhar job")
+        status = gr.Textbox(label="Status", lines=4, interactive=False)
+        download = gr.File(label="DIT.docx")
+
+        # Os handlers só acompanham a fila, então não precisam de limite de concorrência
+        botao_processar.click(processar, [token, pasta], [job_id, status, download], concurrency_limit=None)
+        botao_acompanhar.click(retomar, [job_id], [job_id, status, download], concurrency_limit=None)
+        botao_cancelar.click(cancelar, [job_id], [status], concurrency_limit=None)
+
+    return interface
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Execução pela linha de comando
+#   python -m src.interface [--port 7860] [--workers 2] [--retencao-horas 24]
+# '--workers' é o número de jobs processados ao mesmo tempo; sem ele, e para os demais recursos, vale o
+# plano escolhido pelo hardware (src/recursos.py).
+def main(argv: Optional[List[str]] = None):
+    from src.instrumentacao import configurar_logger_assincrono
+    from src.recursos import adicionar_argumentos_recursos, plano_dos_argumentos
+
+    parser = argparse.ArgumentParser(description="Interface web do DITfy")
+    parser.add_argument("--port", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 para acesso pela rede")
+    parser.add_argument("--base-dir", type=Path, default=Path.cwd())
+    parser.add_argument("--retencao-horas", type=float, default=RETENCAO_JOBS / 3600,
+                        help="horas que o DIT de um job finalizado fica disponível para download")
+    adicionar_argumentos_recursos(parser)
+    args = parser.parse_args(argv)
+
+    logger = configurar_logger_assincrono(args.base_dir, None, "log_interface_")
+    plano = plano_dos_argumentos(args, args.base_dir, logger)
+    executar = partial(gerar_documentacao, base_dir=args.base_dir, plano=plano)
+    fila = FilaJobs.do_projeto(args.base_dir, executar, plano.workers_conversao)
+    limpar_jobs(args.base_dir, fila, args.retencao_horas * 3600)
+    fila.iniciar()
+    logger.info(f"[*] Fila de jobs iniciada com {fila.workers} worker(s)")
+    try:
+        criar_interface(fila, args.base_dir, args.retencao_horas * 3600).queue().launch(server_name=args.host, server_port=args.port)
+    finally:
+        fila.fechar()
+
+
+if __name__ == "__main__":
+    main()
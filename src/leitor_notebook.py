@@ -0,0 +1,276 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import base64
+import json
+import logging
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, TextIO
+
+from src.conversao import ResultadoConversao
+from src.imagens import EXTENSOES, ProcessadorImagens
+from src.recursos import pico_rss
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+_ESPACOS = " \t\n\r"
+ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Limites aplicados aos outputs das células
+# Textos maiores que 'max_caracteres_texto' são truncados (e, com 'externalizar_texto', gravados inteiros
+# em um arquivo à parte). Imagens maiores que 'max_bytes_imagem' são omitidas do documento; as demais
+# podem ser reduzidas para 'dpi_imagem' e recomprimidas até 'orcamento_bytes_imagem' (src/imagens.py).
+@dataclass
+class LimitesSaida:
+    max_caracteres_texto: int = 20_000
+    max_bytes_imagem: int = 5 * 1024 * 1024
+    externalizar_texto: bool = True
+    tamanho_bloco: int = 1024 * 1024
+    dpi_imagem: Optional[int] = None
+    orcamento_bytes_imagem: Optional[int] = None
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Leitor incremental de JSON
+# Lê o arquivo em blocos e decodifica um valor por vez com json.JSONDecoder.raw_decode, descartando o
+# que já foi consumido. Assim só o valor atual (por exemplo, uma célula) fica na memória.
+class _LeitorJSON:
+    def __init__(self, arquivo: TextIO, tamanho_bloco: int):
+        self.arquivo = arquivo
+        self.tamanho_bloco = tamanho_bloco
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.posicao = 0
+        self.fim = False
+
+    def _ler(self, tamanho: Optional[int] = None) -> bool:
+        if self.fim:
+            return False
+        bloco = self.arquivo.read(tamanho or self.tamanho_bloco)
+        if not bloco:
+            self.fim = True
+            return False
+        # Descarta a parte já consumida antes de anexar o novo bloco
+        self.buffer = self.buffer[self.posicao:] + bloco
+        self.posicao = 0
+        return True
+
+    def proximo_caractere(self) -> str:
+        while True:
+            while self.posicao < len(self.buffer) and self.buffer[self.posicao] in _ESPACOS:
+                self.posicao += 1
+            if self.posicao < len(self.buffer):
+                return self.buffer[self.posicao]
+            if not self._ler():
+                raise ValueError("Fim inesperado do arquivo JSON")
+
+    def consumir(self, esperado: str) -> str:
+        caractere = self.proximo_caractere()
+        if caractere not in esperado:
+            raise ValueError(f"JSON inválido: esperado {esperado!r}, encontrado {caractere!r}")
+        self.posicao += 1
+        return caractere
+
+    def valor(self):
+        self.proximo_caractere()
+        while True:
+            try:
+                valor, fim = self.decoder.raw_decode(self.buffer, self.posicao)
+                # Um número no final do buffer pode estar incompleto: lê mais antes de aceitar
+                if fim < len(self.buffer) or self.fim:
+                    self.posicao = fim
+                    return valor
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+            # Dobra a leitura a cada tentativa para manter o custo linear em valores grandes
+            self._ler(max(self.tamanho_bloco, len(self.buffer) - self.posicao))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para percorrer as células de um notebook sem carregar o documento inteiro
+# Cada célula é entregue como um dicionário assim que termina de ser lida; as demais chaves de nível
+# superior (metadata, nbformat...) são lidas e descartadas.
+def iterar_celulas(caminho: Path, tamanho_bloco: int = 1024 * 1024) -> Iterator[Dict]:
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        leitor = _LeitorJSON(arquivo, tamanho_bloco)
+        leitor.consumir("{")
+        if leitor.proximo_caractere() == "}":
+            return
+
+        while True:
+            chave = leitor.valor()
+            leitor.consumir(":")
+            if chave == "cells":
+                leitor.consumir("[")
+                if leitor.proximo_caractere() == "]":
+                    leitor.consumir("]")
+                else:
+                    while True:
+                        yield leitor.valor()
+                        if leitor.consumir(",]") == "]":
+                            break
+            else:
+                leitor.valor()
+
+            if leitor.consumir(",}") == "}":
+                return
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Funções auxiliares de formatação
+def juntar_texto(valor) -> str:
+    return "".join(valor) if isinstance(valor, list) else (valor or "")
+
+
+def _bloco_codigo(texto: str, linguagem: str = "") -> str:
+    return f"```{linguagem}\n{texto.rstrip()}\n```\n\n"
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Escritor de Markdown
+# Recebe as células uma a uma e grava o Markdown direto no arquivo de saída. Imagens e textos grandes
+# vão para a pasta '<nome>_files', no mesmo formato usado pelo nbconvert; imagens repetidas são
+# gravadas uma única vez.
+class _EscritorMarkdown:
+    def __init__(self, saida: TextIO, pasta_arquivos: Path, limites: LimitesSaida):
+        self.saida = saida
+        self.pasta_arquivos = pasta_arquivos
+        self.limites = limites
+        self.contador = 0
+        self.bytes_omitidos = 0
+        self.imagens = ProcessadorImagens(pasta_arquivos, limites.dpi_imagem, limites.orcamento_bytes_imagem)
+
+    def _gravar_arquivo(self, conteudo: bytes, extensao: str) -> str:
+        self.pasta_arquivos.mkdir(parents=True, exist_ok=True)
+        nome = f"output_{self.contador}{extensao}"
+        self.contador += 1
+        (self.pasta_arquivos / nome).write_bytes(conteudo)
+        return f"{self.pasta_arquivos.name}/{nome}"
+
+    def _texto_limitado(self, texto: str) -> str:
+        limite = self.limites.max_caracteres_texto
+        if len(texto) <= limite:
+            return _bloco_codigo(texto)
+
+        omitidos = len(texto) - limite
+        self.bytes_omitidos += omitidos
+        nota = f"[... {omitidos} caracteres omitidos]"
+        if self.limites.externalizar_texto:
+            link = self._gravar_arquivo(texto.encode("utf-8"), ".txt")
+            nota = f"[... {omitidos} caracteres omitidos — saída completa em [{link}]({link})]"
+        return _bloco_codigo(texto[:limite]) + nota + "\n\n"
+
+    def _imagem(self, dados: str, mime: str) -> str:
+        if mime == "image/svg+xml":
+            conteudo = dados.encode("utf-8")
+        else:
+            conteudo = base64.b64decode(dados)
+
+        if len(conteudo) > self.limites.max_bytes_imagem:
+            self.bytes_omitidos += len(conteudo)
+            return f"[Imagem omitida: {len(conteudo) / (1024 ** 2):.1f} MB]\n\n"
+        imagem = self.imagens.processar(conteudo, mime)
+        return f"![{EXTENSOES[imagem.mime][1:]}]({self.pasta_arquivos.name}/{imagem.nome})\n\n"
+
+    def _output(self, output: Dict) -> str:
+        tipo = output.get("output_type")
+        if tipo == "stream":
+            return self._texto_limitado(juntar_texto(output.get("text")))
+        if tipo == "error":
+            traceback = ANSI.sub("", "\n".join(output.get("traceback", [])))
+            return self._texto_limitado(traceback or f"{output.get('ename')}: {output.get('evalue')}")
+
+        dados = output.get("data", {})
+        for mime in EXTENSOES:
+            if mime in dados:
+                return self._imagem(juntar_texto(dados[mime]), mime)
+        if "text/markdown" in dados:
+            return juntar_texto(dados["text/markdown"]) + "\n\n"
+        if "text/plain" in dados:
+            return self._texto_limitado(juntar_texto(dados["text/plain"]))
+        return ""
+
+    def escrever(self, celula: Dict, linguagem: str = "python"):
+        tipo = celula.get("cell_type")
+        fonte = juntar_texto(celula.get("source"))
+
+        if tipo == "code":
+            if fonte.strip():
+                self.saida.write(_bloco_codigo(fonte, linguagem))
+            for output in celula.get("outputs", []):
+                self.saida.write(self._output(output))
+        elif fonte.strip():
+            self.saida.write(fonte.rstrip() + "\n\n")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter um notebook para Markdown em modo streaming
+# Lê uma célula por vez, aplica os limites de output e grava o Markdown incrementalmente. Com
+# 'medir_memoria' (testes e benchmarks), o pico de memória alocada durante a conversão é medido com
+# tracemalloc e devolvido no resultado; fora disso o tracemalloc fica desligado, porque deixa cada alocação
+# mais lenta, e o resultado traz o pico de RSS do processo (recursos.pico_rss).
+def converter_notebook_streaming(
+    arquivo_path: Path,
+    markdown_dir: Path,
+    limites: Optional[LimitesSaida] = None,
+    medir_memoria: bool = False,
+) -> ResultadoConversao:
+    limites = limites or LimitesSaida()
+    arquivo_path = Path(arquivo_path)
+    inicio = time.perf_counter()
+
+    if not arquivo_path.exists():
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=False,
+            erro=f"Arquivo '{arquivo_path}' não encontrado.",
+        )
+
+    iniciou_medicao = medir_memoria and not tracemalloc.is_tracing()
+    if iniciou_medicao:
+        tracemalloc.start()
+    elif medir_memoria:
+        tracemalloc.reset_peak()
+
+    def pico():
+        return tracemalloc.get_traced_memory()[1] if medir_memoria else pico_rss()
+
+    try:
+        markdown_dir.mkdir(parents=True, exist_ok=True)
+        saida = markdown_dir / f"{arquivo_path.stem}.md"
+        pasta_arquivos = markdown_dir / f"{arquivo_path.stem}_files"
+
+        with open(saida, "w", encoding="utf-8") as f:
+            escritor = _EscritorMarkdown(f, pasta_arquivos, limites)
+            for celula in iterar_celulas(arquivo_path, limites.tamanho_bloco):
+                escritor.escrever(celula)
+
+        if escritor.bytes_omitidos:
+            logger.info(f"[→] {arquivo_path.name}: {escritor.bytes_omitidos} bytes de output truncados/omitidos")
+        escritor.imagens.registrar_economia(arquivo_path.name, logger)
+
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=True,
+            saida=saida,
+            duracao=time.perf_counter() - inicio,
+            memoria_pico=pico(),
+            bytes_economizados=escritor.imagens.bytes_economizados,
+        )
+    except Exception as e:
+        return ResultadoConversao(
+            arquivo=arquivo_path,
+            sucesso=False,
+            duracao=time.perf_counter() - inicio,
+            erro=str(e),
+            memoria_pico=pico(),
+        )
+    finally:
+        if iniciou_medicao:
+            tracemalloc.stop()
@@ -0,0 +1,104 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.instrumentacao import etapa
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Modelo padrão usado nos resumos
+MODELO_PADRAO = "gpt-3.5-turbo"
+
+# Template do prompt de resumo de uma seção do notebook
+TEMPLATE_RESUMO = (
+    "Você é um engenheiro de dados escrevendo um Documento de Implementação Técnica (DIT).\n"
+    "Explique de forma objetiva, em português, o que o trecho de notebook abaixo faz, "
+    "destacando entradas, transformações e saídas.\n\n"
+    "{texto}"
+)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para carregar as variáveis do arquivo .env
+# O .env é criado pelo installer (cria_env) e atualizado pelo upsert_key_gpt.
+def carregar_env(base_dir: Optional[Path] = None):
+    from dotenv import load_dotenv
+
+    caminho = (base_dir or Path.cwd()) / ".env"
+    if caminho.exists():
+        load_dotenv(caminho)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para criar o cliente da OpenAI
+# A URL pode ser trocada por OPENAI_BASE_URL (ou 'base_url'), o que permite apontar para um servidor local
+# compatível com a API, por exemplo nos testes.
+def criar_cliente(base_dir: Optional[Path] = None, base_url: Optional[str] = None, api_key: Optional[str] = None):
+    from openai import OpenAI
+
+    carregar_env(base_dir)
+    return OpenAI(
+        api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+        base_url=base_url or os.environ.get("OPENAI_BASE_URL"),
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para criar o cliente assíncrono da OpenAI
+# As novas tentativas do SDK ficam desligadas: quem controla retry e limite de taxa é o src/resumo_async.py.
+def criar_cliente_async(base_dir: Optional[Path] = None, base_url: Optional[str] = None, api_key: Optional[str] = None):
+    from openai import AsyncOpenAI
+
+    carregar_env(base_dir)
+    return AsyncOpenAI(
+        api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+        base_url=base_url or os.environ.get("OPENAI_BASE_URL"),
+        max_retries=0,
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para montar as mensagens do chat a partir do template
+def montar_mensagens(texto: str, template: str = TEMPLATE_RESUMO) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": template.format(texto=texto)}]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para pedir uma resposta ao modelo
+def completar(cliente, mensagens: List[Dict[str, str]], modelo: str = MODELO_PADRAO, **parametros) -> str:
+    with etapa("llm.chamada", modelo=modelo):
+        resposta = cliente.chat.completions.create(model=modelo, messages=mensagens, **parametros)
+    return resposta.choices[0].message.content or ""
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Versão assíncrona de 'completar'
+async def completar_async(cliente, mensagens: List[Dict[str, str]], modelo: str = MODELO_PADRAO, **parametros) -> str:
+    with etapa("llm.chamada", modelo=modelo):
+        resposta = await cliente.chat.completions.create(model=modelo, messages=mensagens, **parametros)
+    return resposta.choices[0].message.content or ""
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para resumir uma seção do notebook
+# Com 'cache', a resposta é reaproveitada sempre que o texto normalizado, o modelo, o template e os
+# parâmetros forem os mesmos de uma chamada anterior.
+def resumir_secao(
+    texto: str,
+    cliente=None,
+    modelo: str = MODELO_PADRAO,
+    template: str = TEMPLATE_RESUMO,
+    cache=None,
+    **parametros,
+) -> str:
+    def gerar() -> str:
+        nonlocal cliente
+        cliente = cliente or criar_cliente()
+        return completar(cliente, montar_mensagens(texto, template), modelo, **parametros)
+
+    if cache is None:
+        return gerar()
+    return cache.obter_ou_gerar(texto, modelo, template, parametros, gerar)
@@ -0,0 +1,247 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+# Só biblioteca padrão no nível do módulo: 'python -m src.main --help' e a validação dos argumentos não
+# carregam nbconvert, python-docx nem o cliente do LLM. Cada etapa importa o que usa quando começa.
+import argparse
+import glob
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Códigos de saída da CLI
+SAIDA_OK = 0
+SAIDA_FALHA_NOTEBOOK = 1      # algum notebook falhou; o DIT foi gerado com os demais
+SAIDA_USO = 2                 # argumentos inválidos (mesmo código do argparse)
+SAIDA_SEM_NOTEBOOKS = 3       # nenhum notebook encontrado nas entradas
+SAIDA_FALHA_DOCUMENTO = 4     # algum formato do documento não foi gerado
+SAIDA_ERRO_INTERNO = 5        # erro inesperado (detalhes no log)
+SAIDA_INTERROMPIDO = 130      # Ctrl+C
+
+Entradas = Union[str, Path, Iterable[Union[str, Path]]]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Resultado de uma execução
+# 'conversoes' segue a ordem das entradas; 'documentos' traz o arquivo gerado por formato.
+@dataclass
+class ResultadoExecucao:
+    codigo: int
+    conversoes: List = field(default_factory=list)
+    documentos: Dict[str, Path] = field(default_factory=dict)
+    duracao: float = 0.0
+
+    @property
+    def falhas(self) -> int:
+        return sum(1 for r in self.conversoes if not r.sucesso)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para expandir as entradas em uma lista de notebooks
+# Cada entrada pode ser uma pasta (todos os .ipynb dela), um arquivo .ipynb ou um glob ('nb/**/*.ipynb').
+# A ordem das entradas é mantida e notebooks repetidos aparecem uma única vez.
+def expandir_entradas(entradas: Iterable[Union[str, Path]], base: Optional[Path] = None) -> List[Path]:
+    from src.conversao import listar_notebooks
+
+    notebooks: Dict[Path, None] = {}
+    for entrada in entradas:
+        caminho = Path(entrada).expanduser()
+        if base is not None and not caminho.is_absolute():
+            caminho = base / caminho
+        if caminho.is_dir():
+            encontrados = listar_notebooks(caminho)
+        elif glob.has_magic(str(caminho)):
+            encontrados = sorted(
+                Path(p) for p in glob.glob(str(caminho), recursive=True)
+                if p.endswith(".ipynb") and ".ipynb_checkpoints" not in Path(p).parts
+            )
+        else:
+            encontrados = [caminho] if caminho.suffix == ".ipynb" and caminho.is_file() else []
+        for notebook in encontrados:
+            notebooks.setdefault(notebook.resolve(), None)
+    return list(notebooks)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para ler um manifesto de notebooks
+# Texto com uma entrada por linha (linhas vazias e iniciadas por '#' são ignoradas) ou JSON com uma lista
+# de entradas ou {"notebooks": [...]}. Caminhos relativos são relativos à pasta do manifesto.
+def ler_manifesto(caminho: Path) -> List[Path]:
+    texto = caminho.read_text(encoding="utf-8")
+    if caminho.suffix.lower() == ".json":
+        dados = json.loads(texto)
+        entradas = dados["notebooks"] if isinstance(dados, dict) else dados
+    else:
+        entradas = [linha.strip() for linha in texto.splitlines()]
+        entradas = [linha for linha in entradas if linha and not linha.startswith("#")]
+    return expandir_entradas(entradas, base=caminho.parent)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter notebooks em um DIT, sem interface
+# Converte (de forma incremental, pelo cache em '<base_dir>/.cache') só os notebooks informados e gera o DIT
+# em 'output_dir' nos formatos pedidos, com só essas seções. 'template' é um .docx de referência de estilos.
+# 'ao_evento' recebe cada evento da execução como um dicionário (é o que a CLI imprime em JSON).
+def convert_notebooks_to_dit(
+    input_dir: Entradas,
+    output_dir: Union[str, Path] = "doc",
+    template: Optional[Union[str, Path]] = None,
+    formatos: Sequence[str] = ("docx",),
+    titulo: Optional[str] = None,
+    subtitulo: Optional[str] = None,
+    base_dir: Optional[Path] = None,
+    plano=None,
+    ao_evento: Optional[Callable[[Dict], None]] = None,
+    logger: logging.Logger = logger,
+) -> ResultadoExecucao:
+    inicio = time.perf_counter()
+    base_dir = Path(base_dir or Path.cwd())
+    emitir = ao_evento or (lambda evento: None)
+
+    if isinstance(input_dir, (str, Path)):
+        input_dir = [input_dir]
+    notebooks = expandir_entradas(input_dir)
+    if not notebooks:
+        emitir({"evento": "fim", "codigo": SAIDA_SEM_NOTEBOOKS, "erro": "nenhum notebook encontrado"})
+        return ResultadoExecucao(SAIDA_SEM_NOTEBOOKS, duracao=time.perf_counter() - inicio)
+
+    # Etapa 1: conversão para Markdown
+    from src.cache_conversao import converte_incremental
+    from src.conversao import PASTA_MARKDOWN, PASTA_NOTEBOOKS
+    from src.recursos import planejar_recursos, sondar_hardware
+
+    plano = plano or planejar_recursos(sondar_hardware(base_dir))
+    emitir({"evento": "inicio", "notebooks": len(notebooks), "workers": plano.workers_conversao})
+
+    def notebook_concluido(resultado):
+        emitir({
+            "evento": "notebook",
+            "arquivo": str(resultado.arquivo),
+            "sucesso": resultado.sucesso,
+            "em_cache": resultado.em_cache,
+            "duracao": round(resultado.duracao, 3),
+            "saida": str(resultado.saida) if resultado.saida else None,
+            "erro": resultado.erro,
+        })
+
+    # Mesma pasta de notebooks do observador e da interface ('<base_dir>/notebooks'): o manifesto do cache e
+    # o Markdown usam caminhos relativos a ela, e um notebook convertido por qualquer caminho vira uma única
+    # seção. Notebooks de fora dessa pasta entram pelo caminho absoluto.
+    notebooks_dir = base_dir / PASTA_NOTEBOOKS
+    markdown_dir = base_dir / PASTA_MARKDOWN
+    conversoes = converte_incremental(
+        base_dir, logger, notebooks_dir, markdown_dir, workers=plano.workers_conversao, apenas=notebooks,
+        plano=plano, ao_concluir=notebook_concluido,
+    )
+    for resultado in conversoes:
+        if resultado.em_cache:
+            notebook_concluido(resultado)
+
+    # Etapa 2: documento, só com as seções dos notebooks convertidos (montadas direto dos .ipynb)
+    from src.dit import TITULO_DIT, exportar_dit
+
+    documentos = [r.arquivo for r in conversoes if r.sucesso]
+    gerados = {}
+    if documentos:
+        gerados = exportar_dit(
+            base_dir, formatos, logger, markdown_dir, Path(output_dir), titulo or TITULO_DIT,
+            subtitulo=subtitulo, modelo_docx=Path(template) if template else None,
+            notebooks_dir=notebooks_dir, notebooks=documentos,
+        )
+    for formato, caminho in gerados.items():
+        emitir({"evento": "documento", "formato": formato, "arquivo": str(caminho)})
+
+    falhas = sum(1 for r in conversoes if not r.sucesso)
+    if documentos and len(gerados) < len(set(formatos)):
+        codigo = SAIDA_FALHA_DOCUMENTO
+    elif falhas:
+        codigo = SAIDA_FALHA_NOTEBOOK
+    else:
+        codigo = SAIDA_OK
+    resultado = ResultadoExecucao(codigo, conversoes, gerados, time.perf_counter() - inicio)
+    emitir({
+        "evento": "fim",
+        "codigo": codigo,
+        "convertidos": sum(1 for r in conversoes if r.sucesso and not r.em_cache),
+        "em_cache": sum(1 for r in conversoes if r.em_cache),
+        "falhas": falhas,
+        "duracao": round(resultado.duracao, 3),
+    })
+    return resultado
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que imprime um evento como uma linha JSON no stdout
+def imprimir_evento(evento: Dict):
+    sys.stdout.write(json.dumps(evento, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Execução pela linha de comando (pipelines de CI)
+#   python -m src.main notebooks/ 'extra/**/*.ipynb' --manifesto lista.txt --saida doc --formatos docx,html
+# O stdout traz só os eventos em JSON (um por linha); o log vai para o stderr e para a pasta 'log/'.
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description="Converte notebooks em um DIT sem interface (para pipelines de CI)",
+    )
+    parser.add_argument("entradas", nargs="*", help="pastas, arquivos .ipynb ou globs ('nb/**/*.ipynb')")
+    parser.add_argument("--manifesto", type=Path, action="append", default=[],
+                        help="arquivo com uma entrada por linha, ou JSON com a lista (pode repetir)")
+    parser.add_argument("--saida", type=Path, default=Path("doc"), help="pasta do documento gerado")
+    parser.add_argument("--formatos", default="docx", help="formatos separados por vírgula: docx, html, pdf")
+    parser.add_argument("--modelo-docx", type=Path, help=".docx de referência com os estilos do documento")
+    parser.add_argument("--titulo", help="título do documento")
+    parser.add_argument("--subtitulo", help="subtítulo da capa")
+    parser.add_argument("--base-dir", type=Path, default=Path.cwd(), help="pasta do projeto (cache, markdown e log)")
+    from src.recursos import adicionar_argumentos_recursos
+
+    adicionar_argumentos_recursos(parser)
+    args = parser.parse_args(argv)
+
+    formatos = [f.strip().lower() for f in args.formatos.split(",") if f.strip()]
+    invalidos = sorted(set(formatos) - {"docx", "html", "pdf"})
+    if not formatos or invalidos:
+        parser.error(f"formato(s) inválido(s): {', '.join(invalidos) or args.formatos}")
+    if not args.entradas and not args.manifesto:
+        parser.error("informe ao menos uma entrada ou um --manifesto")
+    if args.modelo_docx and not args.modelo_docx.is_file():
+        parser.error(f"modelo .docx não encontrado: {args.modelo_docx}")
+
+    entradas: List[Union[str, Path]] = list(args.entradas)
+    for manifesto in args.manifesto:
+        try:
+            entradas.extend(ler_manifesto(manifesto))
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"manifesto inválido ({manifesto}): {e}")
+
+    from src.instrumentacao import configurar_logger_assincrono, execucao_medida
+    from src.recursos import plano_dos_argumentos
+
+    logger = configurar_logger_assincrono(args.base_dir, None, "log_cli_", fluxo=sys.stderr)
+    plano = plano_dos_argumentos(args, args.base_dir, logger)
+
+    try:
+        with execucao_medida(args.base_dir, "cli"):
+            resultado = convert_notebooks_to_dit(
+                entradas, args.saida, args.modelo_docx, formatos, args.titulo, args.subtitulo,
+                base_dir=args.base_dir, plano=plano, ao_evento=imprimir_evento, logger=logger,
+            )
+    except KeyboardInterrupt:
+        imprimir_evento({"evento": "fim", "codigo": SAIDA_INTERROMPIDO, "erro": "interrompido"})
+        return SAIDA_INTERROMPIDO
+    except Exception as e:
+        logger.exception(f"[✗] Erro inesperado: {e}")
+        imprimir_evento({"evento": "fim", "codigo": SAIDA_ERRO_INTERNO, "erro": str(e)})
+        return SAIDA_ERRO_INTERNO
+    return resultado.codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
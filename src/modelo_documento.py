@@ -0,0 +1,502 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import unquote
+
+from src.imagens import MIMES_POR_EXTENSAO
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Cache do modelo dentro do projeto
+PASTA_MODELO = Path(".cache") / "modelo_dit"
+ARQUIVO_MODELO = "modelo.json.gz"
+PASTA_IMAGENS_MODELO = "imagens"
+# Aumentar quando o parser ou o formato serializado mudarem, para invalidar o modelo em cache
+VERSAO_MODELO = 1
+
+
+_TITULO = re.compile(r"^(#{1,6})\s+(.*)$")
+_LISTA = re.compile(r"^\s*[-*+]\s+(.*)$")
+_LISTA_NUMERADA = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_INLINE = re.compile(r"(\*\*[^*]+\*\*|`[^`]+`|\*[^*\s][^*]*\*)")
+_IMAGEM = re.compile(r"^\s*!\[[^\]]*\]\(([^)\s]+)\)\s*$")
+
+# Trecho de texto com o seu estilo: "" (normal), "b" (negrito), "i" (itálico) ou "c" (código)
+Trecho = Tuple[str, str]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Blocos do modelo
+# O modelo não sabe nada de DOCX, HTML ou PDF: cada renderizador percorre os mesmos blocos.
+# Em 'Imagem', 'ref' é o caminho do arquivo logo após o parse e o hash do conteúdo dentro do modelo.
+@dataclass
+class Titulo:
+    nivel: int
+    texto: str
+
+
+@dataclass
+class Paragrafo:
+    trechos: List[Trecho]
+
+
+@dataclass
+class Lista:
+    itens: List[List[Trecho]]
+    numerada: bool = False
+
+
+@dataclass
+class Codigo:
+    texto: str
+
+
+@dataclass
+class Imagem:
+    ref: str
+
+
+Bloco = Union[Titulo, Paragrafo, Lista, Codigo, Imagem]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Documento
+# Uma seção por notebook; 'chave' identifica o conteúdo de origem (Markdown, imagens e resumo).
+@dataclass
+class Secao:
+    documento: str
+    titulo: str
+    chave: str
+    blocos: List[Bloco] = field(default_factory=list)
+
+
+@dataclass
+class ModeloDocumento:
+    titulo: str
+    introducao: List[Bloco]
+    secoes: List[Secao]
+    subtitulo: Optional[str] = None
+    data: str = ""
+    imagens: Dict[str, str] = field(default_factory=dict)  # hash -> mime
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para separar as marcações inline (**negrito**, *itálico*, `código`) de um texto
+def parsear_inline(texto: str) -> List[Trecho]:
+    trechos = []
+    for parte in _INLINE.split(texto):
+        if not parte:
+            continue
+        if parte.startswith("**") and parte.endswith("**") and len(parte) > 4:
+            trechos.append((parte[2:-2], "b"))
+        elif parte[0] == "`" and parte[-1] == "`" and len(parte) > 2:
+            trechos.append((parte[1:-1], "c"))
+        elif parte[0] == "*" and parte[-1] == "*" and len(parte) > 2:
+            trechos.append((parte[1:-1], "i"))
+        else:
+            trechos.append((parte, ""))
+    return trechos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para converter texto Markdown em blocos
+# Cobre o que aparece nas células de notebooks: títulos, listas, blocos de código, imagens e parágrafos.
+# 'nivel_base' desloca os títulos (ex.: um '#' dentro da seção de um notebook vira título de nível 2).
+# Com 'pasta_imagens', linhas '![...](caminho)' relativas a essa pasta viram blocos de imagem.
+def parsear_markdown(texto: str, nivel_base: int = 0, pasta_imagens: Optional[Path] = None) -> List[Bloco]:
+    blocos: List[Bloco] = []
+    paragrafo_atual: List[str] = []
+    codigo = None
+
+    def fechar_paragrafo():
+        if paragrafo_atual:
+            blocos.append(Paragrafo(parsear_inline(" ".join(paragrafo_atual))))
+            paragrafo_atual.clear()
+
+    def adicionar_item(item: str, numerada: bool):
+        fechar_paragrafo()
+        if blocos and isinstance(blocos[-1], Lista) and blocos[-1].numerada == numerada:
+            blocos[-1].itens.append(parsear_inline(item))
+        else:
+            blocos.append(Lista([parsear_inline(item)], numerada))
+
+    for linha in texto.splitlines():
+        if linha.strip().startswith("```"):
+            if codigo is None:
+                fechar_paragrafo()
+                codigo = []
+            else:
+                blocos.append(Codigo("\n".join(codigo)))
+                codigo = None
+            continue
+        if codigo is not None:
+            codigo.append(linha)
+            continue
+
+        if not linha.strip():
+            fechar_paragrafo()
+        elif pasta_imagens is not None and _IMAGEM.match(linha):
+            fechar_paragrafo()
+            blocos.append(Imagem(str(pasta_imagens / unquote(_IMAGEM.match(linha).group(1)))))
+        elif _TITULO.match(linha):
+            fechar_paragrafo()
+            marcas, titulo = _TITULO.match(linha).groups()
+            blocos.append(Titulo(min(len(marcas) + nivel_base, 9), titulo.strip()))
+        elif _LISTA.match(linha):
+            adicionar_item(_LISTA.match(linha).group(1), False)
+        elif _LISTA_NUMERADA.match(linha):
+            adicionar_item(_LISTA_NUMERADA.match(linha).group(1), True)
+        else:
+            paragrafo_atual.append(linha.strip())
+
+    fechar_paragrafo()
+    if codigo:
+        blocos.append(Codigo("\n".join(codigo)))
+    return blocos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Serialização compacta
+# Cada bloco vira uma lista curta (["h", nível, texto], ["p", trechos], ...) e o documento inteiro é
+# gravado como JSON compactado com gzip.
+def _bloco_para_lista(bloco: Bloco) -> list:
+    if isinstance(bloco, Titulo):
+        return ["h", bloco.nivel, bloco.texto]
+    if isinstance(bloco, Paragrafo):
+        return ["p", bloco.trechos]
+    if isinstance(bloco, Lista):
+        return ["l", int(bloco.numerada), bloco.itens]
+    if isinstance(bloco, Codigo):
+        return ["c", bloco.texto]
+    return ["i", bloco.ref]
+
+
+def _lista_para_bloco(dados: list) -> Bloco:
+    tipo = dados[0]
+    if tipo == "h":
+        return Titulo(dados[1], dados[2])
+    if tipo == "p":
+        return Paragrafo([tuple(t) for t in dados[1]])
+    if tipo == "l":
+        return Lista([[tuple(t) for t in item] for item in dados[2]], bool(dados[1]))
+    if tipo == "c":
+        return Codigo(dados[1])
+    return Imagem(dados[1])
+
+
+def serializar(modelo: ModeloDocumento) -> bytes:
+    dados = {
+        "v": VERSAO_MODELO,
+        "titulo": modelo.titulo,
+        "subtitulo": modelo.subtitulo,
+        "data": modelo.data,
+        "imagens": modelo.imagens,
+        "introducao": [_bloco_para_lista(b) for b in modelo.introducao],
+        "secoes": [
+            {"d": s.documento, "t": s.titulo, "k": s.chave, "b": [_bloco_para_lista(b) for b in s.blocos]}
+            for s in modelo.secoes
+        ],
+    }
+    texto = json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(texto.encode("utf-8"), compresslevel=6)
+
+
+def desserializar(conteudo: bytes) -> ModeloDocumento:
+    dados = json.loads(gzip.decompress(conteudo).decode("utf-8"))
+    if dados.get("v") != VERSAO_MODELO:
+        raise ValueError(f"Versão do modelo incompatível: {dados.get('v')}")
+    return ModeloDocumento(
+        titulo=dados["titulo"],
+        subtitulo=dados.get("subtitulo"),
+        data=dados.get("data", ""),
+        imagens=dados.get("imagens", {}),
+        introducao=[_lista_para_bloco(b) for b in dados["introducao"]],
+        secoes=[
+            Secao(s["d"], s["t"], s["k"], [_lista_para_bloco(b) for b in s["b"]])
+            for s in dados["secoes"]
+        ],
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Armazém de imagens do modelo
+# Cada imagem é gravada uma vez, com o hash do conteúdo como nome; o modelo guarda só o hash.
+class ArmazemImagens:
+    def __init__(self, pasta: Path):
+        self.pasta = pasta
+
+    def guardar(self, conteudo: bytes) -> str:
+        h = hashlib.sha256(conteudo).hexdigest()
+        caminho = self.pasta / h
+        if not caminho.exists():
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            temporario = caminho.with_name(f"{h}.{os.getpid()}.tmp")
+            temporario.write_bytes(conteudo)
+            os.replace(temporario, caminho)
+        return h
+
+    def ler(self, h: str) -> bytes:
+        return (self.pasta / h).read_bytes()
+
+    def limpar(self, em_uso: set):
+        if not self.pasta.exists():
+            return
+        for caminho in self.pasta.iterdir():
+            if caminho.name not in em_uso:
+                caminho.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que calcula a chave de uma seção
+# Combina o texto do Markdown, o resumo, a versão do modelo e a assinatura (mtime/tamanho) das imagens
+# da pasta '<nome>_files', cujos nomes não mudam quando o gráfico muda.
+def chave_secao(arquivo: Path, documento: str, resumo: Optional[str] = None) -> str:
+    h = hashlib.sha256(f"v{VERSAO_MODELO}\0{documento}\0{resumo or ''}\0".encode("utf-8"))
+    h.update(arquivo.read_bytes())
+    pasta_imagens = arquivo.with_name(f"{arquivo.stem}_files")
+    if pasta_imagens.is_dir():
+        for imagem in sorted(pasta_imagens.iterdir()):
+            info = imagem.stat()
+            h.update(f"\0{imagem.name}:{info.st_mtime_ns}:{info.st_size}".encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta os blocos de uma seção a partir do Markdown de um notebook
+# As imagens vão para o armazém e o bloco passa a guardar o hash; imagens ausentes ou em formato não
+# suportado viram um aviso no texto.
+def parsear_secao(arquivo: Path, documento: str, chave: str, armazem: ArmazemImagens,
+                  imagens: Dict[str, str], resumo: Optional[str] = None) -> Secao:
+    blocos: List[Bloco] = [Titulo(1, arquivo.stem)]
+    if resumo:
+        blocos.extend(parsear_markdown(resumo, nivel_base=1))
+
+    for bloco in parsear_markdown(arquivo.read_text(encoding="utf-8"), nivel_base=1, pasta_imagens=arquivo.parent):
+        if isinstance(bloco, Imagem):
+            caminho = Path(bloco.ref)
+            mime = MIMES_POR_EXTENSAO.get(caminho.suffix.lower())
+            if mime is None or mime == "image/svg+xml" or not caminho.exists():
+                bloco = Paragrafo([(f"[Imagem não encontrada: {caminho.name}]", "")])
+            else:
+                bloco = Imagem(armazem.guardar(caminho.read_bytes()))
+                imagens[bloco.ref] = mime
+        blocos.append(bloco)
+    return Secao(documento, arquivo.stem, chave, blocos)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta os blocos de um notebook direto das células, sem Markdown intermediário
+# As células são lidas em streaming (src/leitor_notebook.py): o Markdown das células vira blocos pelo
+# parsear_markdown, o código e os outputs de texto viram blocos de código (cortados em
+# 'limites.max_caracteres_texto') e as imagens passam pelo 'processador' e são entregues a 'guardar'
+# (conteúdo, mime -> 'ref' do bloco Imagem). Um mesmo processador compartilhado entre notebooks
+# deduplica as imagens entre eles.
+def blocos_notebook(
+    arquivo: Path,
+    guardar: Callable[[bytes, str], str],
+    limites=None,
+    processador=None,
+) -> List[Bloco]:
+    import base64
+
+    from src.imagens import EXTENSOES, ProcessadorImagens
+    from src.leitor_notebook import ANSI, LimitesSaida, iterar_celulas, juntar_texto
+
+    limites = limites or LimitesSaida()
+    processador = processador or ProcessadorImagens(
+        dpi_alvo=limites.dpi_imagem, orcamento_bytes=limites.orcamento_bytes_imagem
+    )
+
+    def texto_limitado(texto: str) -> List[Bloco]:
+        if len(texto) <= limites.max_caracteres_texto:
+            return [Codigo(texto.rstrip("\n"))]
+        omitidos = len(texto) - limites.max_caracteres_texto
+        return [
+            Codigo(texto[:limites.max_caracteres_texto].rstrip("\n")),
+            Paragrafo([(f"[... {omitidos} caracteres omitidos]", "")]),
+        ]
+
+    def output(dados_output: Dict) -> List[Bloco]:
+        tipo = dados_output.get("output_type")
+        if tipo == "stream":
+            return texto_limitado(juntar_texto(dados_output.get("text")))
+        if tipo == "error":
+            traceback = ANSI.sub("", "\n".join(dados_output.get("traceback", [])))
+            return texto_limitado(traceback or f"{dados_output.get('ename')}: {dados_output.get('evalue')}")
+
+        dados = dados_output.get("data", {})
+        for mime in EXTENSOES:
+            if mime not in dados or mime == "image/svg+xml":
+                continue
+            conteudo = base64.b64decode(juntar_texto(dados[mime]))
+            if len(conteudo) > limites.max_bytes_imagem:
+                return [Paragrafo([(f"[Imagem omitida: {len(conteudo) / (1024 ** 2):.1f} MB]", "")])]
+            imagem = processador.processar(conteudo, mime)
+            return [Imagem(guardar(imagem.conteudo, imagem.mime))]
+        if "image/svg+xml" in dados:
+            return [Paragrafo([("[Imagem SVG omitida]", "")])]
+        if "text/markdown" in dados:
+            return parsear_markdown(juntar_texto(dados["text/markdown"]), nivel_base=1)
+        if "text/plain" in dados:
+            return texto_limitado(juntar_texto(dados["text/plain"]))
+        return []
+
+    blocos: List[Bloco] = []
+    for celula in iterar_celulas(arquivo, limites.tamanho_bloco):
+        fonte = juntar_texto(celula.get("source"))
+        if celula.get("cell_type") == "code":
+            if fonte.strip():
+                blocos.append(Codigo(fonte.rstrip("\n")))
+            for dados_output in celula.get("outputs", []):
+                blocos.extend(output(dados_output))
+        elif fonte.strip():
+            blocos.extend(parsear_markdown(fonte, nivel_base=1))
+    return blocos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que calcula a chave de uma seção montada direto do notebook
+# Usa a assinatura (mtime/tamanho) do .ipynb, sem ler o arquivo, que pode ter centenas de MB.
+def chave_notebook(arquivo: Path, documento: str, resumo: Optional[str] = None) -> str:
+    info = arquivo.stat()
+    return hashlib.sha256(
+        f"v{VERSAO_MODELO}\0ipynb\0{documento}\0{resumo or ''}\0{info.st_mtime_ns}:{info.st_size}".encode("utf-8")
+    ).hexdigest()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta a seção de um notebook direto das células (ver blocos_notebook)
+# As imagens vão para o armazém do modelo, com o hash do conteúdo como 'ref'.
+def secao_notebook(arquivo: Path, documento: str, chave: str, armazem: ArmazemImagens,
+                   imagens: Dict[str, str], resumo: Optional[str] = None, processador=None) -> Secao:
+    def guardar(conteudo: bytes, mime: str) -> str:
+        ref = armazem.guardar(conteudo)
+        imagens[ref] = mime
+        return ref
+
+    blocos: List[Bloco] = [Titulo(1, arquivo.stem)]
+    if resumo:
+        blocos.extend(parsear_markdown(resumo, nivel_base=1))
+    blocos.extend(blocos_notebook(arquivo, guardar, processador=processador))
+    return Secao(documento, arquivo.stem, chave, blocos)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que lista os Markdown convertidos da pasta (ignorando checkpoints do Jupyter)
+def listar_markdown(markdown_dir: Path) -> List[Path]:
+    if not markdown_dir.exists():
+        return []
+    return sorted(p for p in markdown_dir.rglob("*.md") if ".ipynb_checkpoints" not in p.parts)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que monta (ou atualiza) o modelo do documento
+# Com 'notebooks' (documento -> .ipynb, ex.: {'vendas/carga.md': Path('notebooks/vendas/carga.ipynb')}), as
+# seções são montadas direto das células dos notebooks (secao_notebook), sem gravar nem reler Markdown.
+# Sem 'notebooks', as seções vêm dos Markdown já convertidos em 'markdown_dir'.
+# O modelo anterior fica em '.cache/modelo_dit/modelo.json.gz'; seções cuja chave não mudou são
+# reaproveitadas sem novo parse. O modelo atualizado é gravado de forma atômica e devolvido.
+# 'resumos' usa a mesma chave das seções (o caminho relativo do Markdown), então notebooks de mesmo nome em
+# pastas diferentes têm resumos separados. Com 'documentos' (caminhos relativos à pasta, ex.: 'vendas.md'),
+# só essas seções entram no modelo devolvido; as seções dos demais documentos continuam no cache.
+def construir_modelo(
+    base_dir: Path,
+    markdown_dir: Path,
+    titulo: str,
+    introducao: str,
+    resumos: Optional[Dict[str, str]] = None,
+    subtitulo: Optional[str] = None,
+    logger: logging.Logger = logger,
+    documentos: Optional[Iterable[str]] = None,
+    notebooks: Optional[Dict[str, Path]] = None,
+) -> Tuple[ModeloDocumento, ArmazemImagens]:
+    from src.imagens import ProcessadorImagens
+
+    pasta = base_dir / PASTA_MODELO
+    caminho = pasta / ARQUIVO_MODELO
+    armazem = ArmazemImagens(pasta / PASTA_IMAGENS_MODELO)
+    resumos = resumos or {}
+
+    anteriores: Dict[str, Secao] = {}
+    imagens_anteriores: Dict[str, str] = {}
+    if caminho.exists():
+        try:
+            anterior = desserializar(caminho.read_bytes())
+            anteriores = {s.documento: s for s in anterior.secoes}
+            imagens_anteriores = anterior.imagens
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"[⚠️] Modelo do documento em cache inválido, refazendo: {caminho}")
+
+    existentes = {a.relative_to(markdown_dir).as_posix() for a in listar_markdown(markdown_dir)}
+    if notebooks is not None:
+        fontes = dict(sorted(notebooks.items()))
+        existentes.update(fontes)
+    else:
+        fontes = {a.relative_to(markdown_dir).as_posix(): a for a in listar_markdown(markdown_dir)}
+    if documentos is not None:
+        selecionados = set(documentos)
+        fontes = {d: a for d, a in fontes.items() if d in selecionados}
+
+    secoes, imagens, reprocessadas = [], {}, 0
+    processador = ProcessadorImagens()
+    for documento, arquivo in fontes.items():
+        resumo = resumos.get(documento)
+        if notebooks is not None:
+            chave = chave_notebook(arquivo, documento, resumo)
+        else:
+            chave = chave_secao(arquivo, documento, resumo)
+        secao = anteriores.get(documento)
+        if secao is not None and secao.chave == chave:
+            for bloco in secao.blocos:
+                if isinstance(bloco, Imagem):
+                    imagens[bloco.ref] = imagens_anteriores.get(bloco.ref, "image/png")
+        elif notebooks is not None:
+            secao = secao_notebook(arquivo, documento, chave, armazem, imagens, resumo, processador)
+            reprocessadas += 1
+        else:
+            secao = parsear_secao(arquivo, documento, chave, armazem, imagens, resumo)
+            reprocessadas += 1
+        secoes.append(secao)
+
+    modelo = ModeloDocumento(
+        titulo=titulo,
+        subtitulo=subtitulo,
+        data=datetime.now().strftime("%d/%m/%Y"),
+        introducao=parsear_markdown(introducao, nivel_base=1),
+        secoes=secoes,
+        imagens=imagens,
+    )
+
+    # O cache guarda também as seções que ficaram fora de 'documentos': uma execução parcial não
+    # descarta o trabalho das outras. Só saem do cache as seções sem Markdown nem notebook.
+    mantidas = {d: s for d, s in anteriores.items() if d in existentes}
+    mantidas.update((s.documento, s) for s in secoes)
+    imagens_cache = dict(imagens)
+    for secao in mantidas.values():
+        for bloco in secao.blocos:
+            if isinstance(bloco, Imagem):
+                imagens_cache.setdefault(bloco.ref, imagens_anteriores.get(bloco.ref, "image/png"))
+    cache = replace(modelo, secoes=[mantidas[d] for d in sorted(mantidas)], imagens=imagens_cache)
+    pasta.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+    temporario.write_bytes(serializar(cache))
+    os.replace(temporario, caminho)
+    armazem.limpar(set(imagens_cache))
+
+    logger.info(f"[*] Modelo do documento: {len(secoes)} seção(ões), {reprocessadas} reprocessada(s)")
+    return modelo, armazem
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que lista os títulos do documento até 'nivel_maximo' (usada nos sumários)
+def titulos_secao(secao: Secao, nivel_maximo: int = 2) -> List[Tuple[int, str]]:
+    return [(b.nivel, b.texto) for b in secao.blocos if isinstance(b, Titulo) and b.nivel <= nivel_maximo]
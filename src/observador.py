@@ -0,0 +1,260 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import argparse
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.conversao import PASTA_NOTEBOOKS
+from src.instrumentacao import execucao_medida
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+INTERVALO_PADRAO = 1.0   # segundos entre varreduras (modo polling)
+ESPERA_PADRAO = 2.0      # segundos sem novas mudanças antes de reconverter (debounce)
+
+# Assinatura barata de um arquivo: (mtime em ns, tamanho em bytes)
+Assinatura = Tuple[int, int]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para montar o índice mtime/tamanho dos notebooks de uma pasta
+# Usa apenas os.scandir/stat: nenhum arquivo é aberto, então a varredura é barata mesmo com muitos notebooks.
+def indexar_notebooks(pasta: Path) -> Dict[str, Assinatura]:
+    indice: Dict[str, Assinatura] = {}
+    if not pasta.exists():
+        return indice
+
+    pendentes = [pasta]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            entradas = list(os.scandir(atual))
+        except OSError:
+            continue
+        for entrada in entradas:
+            try:
+                if entrada.is_dir():
+                    if entrada.name != ".ipynb_checkpoints":
+                        pendentes.append(Path(entrada.path))
+                elif entrada.name.endswith(".ipynb"):
+                    info = entrada.stat()
+                    nome = Path(entrada.path).relative_to(pasta).as_posix()
+                    indice[nome] = (info.st_mtime_ns, info.st_size)
+            except OSError:
+                # Arquivo removido ou ainda sendo gravado entre o scandir e o stat
+                continue
+    return indice
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Diferença entre dois índices
+# 'completa' marca a sincronização da partida: a pasta inteira é comparada com o cache, o que também limpa
+# as saídas de notebooks apagados enquanto o observador estava parado (que não aparecem em 'removidos').
+@dataclass
+class Mudancas:
+    adicionados: List[str] = field(default_factory=list)
+    alterados: List[str] = field(default_factory=list)
+    removidos: List[str] = field(default_factory=list)
+    completa: bool = False
+
+    @property
+    def vazia(self) -> bool:
+        return not (self.adicionados or self.alterados or self.removidos)
+
+    @property
+    def afetados(self) -> List[str]:
+        return sorted(self.adicionados + self.alterados)
+
+
+def comparar_indices(anterior: Dict[str, Assinatura], atual: Dict[str, Assinatura]) -> Mudancas:
+    return Mudancas(
+        adicionados=sorted(set(atual) - set(anterior)),
+        alterados=sorted(n for n in set(atual) & set(anterior) if atual[n] != anterior[n]),
+        removidos=sorted(set(anterior) - set(atual)),
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Observador da pasta 'notebooks/'
+# A fonte da verdade é sempre o índice mtime/tamanho. Com o 'watchdog' instalado, os eventos do sistema
+# de arquivos só acordam o observador antes do próximo intervalo; sem ele, a pasta é varrida a cada
+# 'intervalo' segundos (polling). Depois da primeira mudança, espera 'espera' segundos sem novas
+# alterações (debounce) para não reconverter um notebook no meio de uma sequência de salvamentos.
+class ObservadorNotebooks:
+    def __init__(
+        self,
+        notebooks_dir: Path,
+        intervalo: float = INTERVALO_PADRAO,
+        espera: float = ESPERA_PADRAO,
+        logger: logging.Logger = logger,
+    ):
+        self.notebooks_dir = notebooks_dir
+        self.intervalo = intervalo
+        self.espera = espera
+        self.logger = logger
+        self.indice = indexar_notebooks(notebooks_dir)
+        self._acordar = threading.Event()
+        self._watchdog = None
+
+    def iniciar_eventos(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            self.logger.info(f"[*] watchdog não instalado: varrendo a pasta a cada {self.intervalo:.1f}s")
+            return False
+
+        acordar = self._acordar
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                acordar.set()
+
+        self.notebooks_dir.mkdir(parents=True, exist_ok=True)
+        self._watchdog = Observer()
+        self._watchdog.schedule(_Handler(), str(self.notebooks_dir), recursive=True)
+        self._watchdog.start()
+        return True
+
+    def parar_eventos(self):
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog.join()
+            self._watchdog = None
+
+    def aguardar_mudancas(self, parar: Optional[threading.Event] = None) -> Optional[Mudancas]:
+        parar = parar or threading.Event()
+
+        # Espera a primeira mudança
+        while not parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            atual = indexar_notebooks(self.notebooks_dir)
+            if atual != self.indice:
+                break
+        else:
+            return None
+
+        # Debounce: continua varrendo até o índice ficar estável por 'espera' segundos
+        estavel_desde = time.monotonic()
+        while not parar.is_set() and time.monotonic() - estavel_desde < self.espera:
+            time.sleep(min(self.intervalo, self.espera) / 2)
+            novo = indexar_notebooks(self.notebooks_dir)
+            if novo != atual:
+                atual, estavel_desde = novo, time.monotonic()
+
+        mudancas = comparar_indices(self.indice, atual)
+        self.indice = atual
+        return mudancas
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que processa um lote de mudanças
+# Reconverte só os notebooks adicionados/alterados (e limpa as saídas dos removidos) pelo cache incremental
+# e remonta o DIT direto dos notebooks: as seções dos notebooks não alterados vêm do cache do modelo.
+def processar_mudancas(
+    base_dir: Path,
+    mudancas: Mudancas,
+    logger: logging.Logger = logger,
+    notebooks_dir: Optional[Path] = None,
+    markdown_dir: Optional[Path] = None,
+    workers: int = 1,
+    limites=None,
+    gerar_documento: bool = True,
+    plano=None,
+):
+    from src.cache_conversao import converte_incremental
+    from src.dit import gerar_dit
+
+    notebooks_dir = notebooks_dir or base_dir / PASTA_NOTEBOOKS
+    logger.info(
+        f"[⚙️] Mudanças detectadas: {len(mudancas.adicionados)} novo(s), {len(mudancas.alterados)} alterado(s), "
+        f"{len(mudancas.removidos)} removido(s)"
+    )
+    apenas = None if mudancas.completa else [notebooks_dir / n for n in mudancas.afetados + mudancas.removidos]
+    resultados = converte_incremental(
+        base_dir, logger, notebooks_dir, markdown_dir, workers=workers, limites=limites, apenas=apenas, plano=plano,
+    )
+    if gerar_documento:
+        gerar_dit(base_dir, logger, markdown_dir=markdown_dir, notebooks_dir=notebooks_dir)
+    return resultados
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para observar a pasta 'notebooks/' até 'parar' ser sinalizado (ou Ctrl+C)
+# Na partida, sincroniza tudo uma vez (o cache incremental pula o que já está atualizado).
+def observar(
+    base_dir: Path,
+    logger: logging.Logger = logger,
+    notebooks_dir: Optional[Path] = None,
+    markdown_dir: Optional[Path] = None,
+    intervalo: float = INTERVALO_PADRAO,
+    espera: float = ESPERA_PADRAO,
+    workers: int = 1,
+    limites=None,
+    parar: Optional[threading.Event] = None,
+    processar: Callable = processar_mudancas,
+    plano=None,
+):
+    notebooks_dir = notebooks_dir or base_dir / PASTA_NOTEBOOKS
+    parar = parar or threading.Event()
+    observador = ObservadorNotebooks(notebooks_dir, intervalo, espera, logger)
+
+    # Cada lote grava o seu resumo de tempos em 'log/' e esvazia o registro, que não cresce com o tempo
+    inicial = Mudancas(adicionados=sorted(observador.indice), completa=True)
+    with execucao_medida(base_dir, "observador"):
+        processar(base_dir, inicial, logger, notebooks_dir, markdown_dir, workers=workers, limites=limites,
+                  plano=plano)
+
+    observador.iniciar_eventos()
+    logger.info(f"[*] Observando {notebooks_dir} (Ctrl+C para encerrar)")
+    try:
+        while not parar.is_set():
+            mudancas = observador.aguardar_mudancas(parar)
+            if mudancas is None or mudancas.vazia:
+                continue
+            try:
+                with execucao_medida(base_dir, "observador"):
+                    processar(
+                        base_dir, mudancas, logger, notebooks_dir, markdown_dir, workers=workers, limites=limites,
+                        plano=plano,
+                    )
+            except Exception as e:
+                # Um lote com erro não derruba o observador; o próximo salvamento tenta de novo
+                logger.exception(f"[✗] Erro ao processar mudanças: {e}")
+    except KeyboardInterrupt:
+        logger.info("[*] Observador encerrado.")
+    finally:
+        observador.parar_eventos()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Execução pela linha de comando
+#   python -m src.observador [--intervalo 1] [--espera 2] [--workers 4] [--memoria-maxima-mb 3000]
+# Os recursos não informados são escolhidos pelo hardware (src/recursos.py).
+def main(argv: Optional[List[str]] = None):
+    from src.instrumentacao import configurar_logger_assincrono
+    from src.recursos import adicionar_argumentos_recursos, plano_dos_argumentos
+
+    parser = argparse.ArgumentParser(description="Regenera o DIT à medida que os notebooks mudam")
+    parser.add_argument("--base-dir", type=Path, default=Path.cwd())
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PADRAO, help="segundos entre varreduras")
+    parser.add_argument("--espera", type=float, default=ESPERA_PADRAO, help="segundos de estabilidade (debounce)")
+    adicionar_argumentos_recursos(parser)
+    args = parser.parse_args(argv)
+
+    logger = configurar_logger_assincrono(args.base_dir, None, "log_observador_")
+    plano = plano_dos_argumentos(args, args.base_dir, logger)
+    observar(
+        args.base_dir, logger, intervalo=args.intervalo, espera=args.espera,
+        workers=plano.workers_conversao, plano=plano,
+    )
+
+
+if __name__ == "__main__":
+    main()
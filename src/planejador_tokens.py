@@ -0,0 +1,287 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.llm import MODELO_PADRAO
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Janela de contexto (tokens) dos modelos usados
+JANELAS_CONTEXTO = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+}
+JANELA_PADRAO = 8_192
+
+# Resposta: tokens reservados por requisição e estimativa por célula explicada. O número de células por
+# requisição é limitado para que a explicação de todas caiba na resposta (1024 // 128 = 8 células).
+TOKENS_RESPOSTA = 1024
+TOKENS_POR_CELULA = 128
+# Novas rodadas para as células que ficaram sem explicação (resposta truncada ou marcação omitida)
+TENTATIVAS_FALTANTES = 2
+
+# Template das requisições agrupadas: cada célula vai marcada e a resposta deve repetir as marcações
+TEMPLATE_LOTE = (
+    "Você é um engenheiro de dados escrevendo um Documento de Implementação Técnica (DIT).\n"
+    "Abaixo estão trechos de um notebook, cada um iniciado por uma marcação [célula N].\n"
+    "Para cada trecho, explique em português o que ele faz. Responda repetindo a mesma marcação "
+    "[célula N] antes de cada explicação.\n\n"
+    "{texto}"
+)
+
+_MARCACAO = re.compile(r"\[célula (\d+)\]")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Trecho de uma célula e requisição planejada
+# Uma célula grande pode virar vários trechos ('parte' 0, 1, 2...); uma requisição agrupa vários trechos.
+@dataclass
+class Trecho:
+    indice_celula: int
+    parte: int
+    tipo: str
+    texto: str
+    tokens: int
+
+
+@dataclass
+class Requisicao:
+    trechos: List[Trecho] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def celulas(self) -> List[int]:
+        return sorted({t.indice_celula for t in self.trechos})
+
+    def texto(self) -> str:
+        blocos = []
+        for t in self.trechos:
+            cerca = "```python" if t.tipo == "code" else ""
+            corpo = f"{cerca}\n{t.texto}\n```" if cerca else t.texto
+            blocos.append(f"[célula {t.indice_celula}]\n{corpo}")
+        return "\n\n".join(blocos)
+
+
+@dataclass
+class PlanoRequisicoes:
+    requisicoes: List[Requisicao]
+    modelo: str
+    tokens_entrada: int
+    tokens_saida: int
+
+    @property
+    def tokens_totais(self) -> int:
+        return self.tokens_entrada + self.tokens_saida
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que cria o contador de tokens do modelo
+# Usa o tiktoken (já instalado pelo installer); modelos desconhecidos caem no encoding cl100k_base.
+def contador_tiktoken(modelo: str = MODELO_PADRAO) -> Callable[[str], int]:
+    import tiktoken
+
+    try:
+        encoding = tiktoken.encoding_for_model(modelo)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda texto: len(encoding.encode(texto, disallowed_special=()))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para dividir um texto grande em pedaços que caibam no limite de tokens
+# Quebra primeiro entre parágrafos (linha em branco), depois entre linhas e, só em último caso, no meio
+# de uma linha muito longa.
+def dividir_texto(texto: str, limite: int, contar: Callable[[str], int]) -> List[str]:
+    if contar(texto) <= limite:
+        return [texto]
+
+    for separador in ("\n\n", "\n"):
+        partes = texto.split(separador)
+        if len(partes) > 1:
+            break
+    else:
+        # Linha única: corta em fatias de caracteres proporcionais ao limite
+        tamanho = max(1, len(texto) * limite // max(contar(texto), 1))
+        fatias = [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)]
+        return [p for fatia in fatias for p in dividir_texto(fatia, limite, contar)]
+
+    pedacos, atual = [], ""
+    for parte in partes:
+        candidato = f"{atual}{separador}{parte}" if atual else parte
+        if contar(candidato) <= limite:
+            atual = candidato
+            continue
+        if atual:
+            pedacos.append(atual)
+        if contar(parte) > limite:
+            pedacos.extend(dividir_texto(parte, limite, contar))
+            atual = ""
+        else:
+            atual = parte
+    if atual:
+        pedacos.append(atual)
+    return pedacos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para planejar as requisições ao modelo
+# Recebe as células do notebook (dicionários com 'cell_type' e 'source', como os de iterar_celulas),
+# divide as que não cabem sozinhas e agrupa, em ordem, o máximo de trechos por requisição dentro da
+# janela de contexto, descontando o template e os tokens reservados para a resposta. Cada requisição
+# tem no máximo 'tokens_resposta // tokens_por_celula' células, para que a resposta não seja truncada.
+def planejar_requisicoes(
+    celulas: Iterable[Dict],
+    modelo: str = MODELO_PADRAO,
+    contar: Optional[Callable[[str], int]] = None,
+    janela_contexto: Optional[int] = None,
+    tokens_resposta: int = TOKENS_RESPOSTA,
+    template: str = TEMPLATE_LOTE,
+    tokens_por_celula: int = TOKENS_POR_CELULA,
+) -> PlanoRequisicoes:
+    contar = contar or contador_tiktoken(modelo)
+    janela = janela_contexto or JANELAS_CONTEXTO.get(modelo, JANELA_PADRAO)
+    capacidade = janela - tokens_resposta - contar(template.format(texto=""))
+    if capacidade <= 0:
+        raise ValueError(f"Janela de contexto de {janela} tokens não comporta o template e a resposta")
+    maximo_celulas = max(1, tokens_resposta // max(1, tokens_por_celula))
+
+    # Cada trecho ganha a marcação '[célula N]' e a cerca de código; reserva uma folga para isso
+    folga = contar("[célula 00000]\n```python\n\n```\n\n")
+    trechos = []
+    for indice, celula in enumerate(celulas):
+        fonte = celula.get("source", "")
+        fonte = "".join(fonte) if isinstance(fonte, list) else fonte
+        if not fonte.strip():
+            continue
+        tipo = celula.get("cell_type", "code")
+        for parte, texto in enumerate(dividir_texto(fonte, capacidade - folga, contar)):
+            trechos.append(Trecho(indice, parte, tipo, texto, contar(texto) + folga))
+
+    requisicoes = []
+    atual = Requisicao()
+    for trecho in trechos:
+        nova_celula = not atual.trechos or atual.trechos[-1].indice_celula != trecho.indice_celula
+        cheia = nova_celula and len(atual.celulas) >= maximo_celulas
+        if atual.trechos and (atual.tokens + trecho.tokens > capacidade or cheia):
+            requisicoes.append(atual)
+            atual = Requisicao()
+        atual.trechos.append(trecho)
+        atual.tokens += trecho.tokens
+    if atual.trechos:
+        requisicoes.append(atual)
+
+    sobrecarga = contar(template.format(texto=""))
+    return PlanoRequisicoes(
+        requisicoes=requisicoes,
+        modelo=modelo,
+        tokens_entrada=sum(r.tokens + sobrecarga for r in requisicoes),
+        tokens_saida=len(requisicoes) * tokens_resposta,
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para registrar a estimativa do plano antes de qualquer chamada
+def registrar_estimativa(plano: PlanoRequisicoes, total_celulas: int, logger: logging.Logger = logger):
+    logger.info(
+        f"[*] Estimativa ({plano.modelo}): {total_celulas} célula(s) em {len(plano.requisicoes)} requisição(ões), "
+        f"~{plano.tokens_entrada} tokens de entrada + até {plano.tokens_saida} de saída "
+        f"(~{plano.tokens_totais} no total)"
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para mapear as respostas de volta às células de origem
+# Separa cada resposta pelas marcações '[célula N]'. Se o modelo não repetir as marcações, a resposta
+# inteira é atribuída a todas as células daquela requisição.
+def mapear_respostas(plano: PlanoRequisicoes, respostas: List[str]) -> Dict[int, str]:
+    por_celula: Dict[int, List[str]] = {}
+    for requisicao, resposta in zip(plano.requisicoes, respostas):
+        partes = _MARCACAO.split(resposta)
+        encontrados = {}
+        for i in range(1, len(partes) - 1, 2):
+            indice = int(partes[i])
+            if indice in requisicao.celulas:
+                encontrados.setdefault(indice, []).append(partes[i + 1].strip())
+
+        if not encontrados:
+            encontrados = {indice: [resposta.strip()] for indice in requisicao.celulas}
+        for indice, textos in encontrados.items():
+            por_celula.setdefault(indice, []).extend(textos)
+
+    return {indice: "\n\n".join(textos) for indice, textos in sorted(por_celula.items())}
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que lista as células do plano que ficaram sem explicação nas respostas
+# Acontece quando a resposta é truncada ou o modelo pula alguma marcação '[célula N]'.
+def celulas_sem_resposta(plano: PlanoRequisicoes, por_celula: Dict[int, str]) -> List[int]:
+    planejadas = {indice for requisicao in plano.requisicoes for indice in requisicao.celulas}
+    return sorted(indice for indice in planejadas if not por_celula.get(indice))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que acrescenta ao template de lote um bloco fixo de contexto
+# As chaves do contexto são escapadas: o texto das células continua entrando só por '{texto}'.
+def template_com_contexto(contexto: str, template: str = TEMPLATE_LOTE) -> str:
+    if not contexto:
+        return template
+    return template + "\n\n" + contexto.replace("{", "{{").replace("}", "}}")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para resumir as células de um notebook usando o menor número de requisições
+# Monta o plano, registra a estimativa e só então envia as requisições pelo pipeline assíncrono.
+# As células que voltarem sem explicação são pedidas de novo (em requisições só com elas) até
+# 'tentativas_faltantes' vezes; as que ainda faltarem ficam de fora do resultado, com aviso no log.
+# 'contexto' (ex.: indice_vetorial.contexto_relacionado) vai em todas as requisições, já descontado da janela.
+def resumir_celulas(
+    celulas: List[Dict],
+    modelo: str = MODELO_PADRAO,
+    contar: Optional[Callable[[str], int]] = None,
+    tokens_resposta: int = TOKENS_RESPOSTA,
+    logger: logging.Logger = logger,
+    tentativas_faltantes: int = TENTATIVAS_FALTANTES,
+    contexto: str = "",
+    **kwargs,
+) -> Dict[int, str]:
+    from src.resumo_async import resumir_secoes
+
+    contar = contar or contador_tiktoken(modelo)
+    template = template_com_contexto(contexto)
+    plano = planejar_requisicoes(celulas, modelo, contar, tokens_resposta=tokens_resposta, template=template)
+    registrar_estimativa(plano, len(celulas), logger)
+
+    por_celula: Dict[int, str] = {}
+    for rodada in range(tentativas_faltantes + 1):
+        respostas = resumir_secoes(
+            [r.texto() for r in plano.requisicoes],
+            modelo=modelo,
+            template=template,
+            contar_tokens=lambda mensagens: sum(contar(m["content"]) for m in mensagens) + tokens_resposta,
+            max_tokens=tokens_resposta,
+            logger=logger,
+            **kwargs,
+        )
+        mapa = mapear_respostas(plano, respostas)
+        por_celula.update((indice, texto) for indice, texto in mapa.items() if texto)
+        faltantes = celulas_sem_resposta(plano, por_celula)
+        if not faltantes:
+            break
+        if rodada == tentativas_faltantes:
+            logger.warning(
+                f"[⚠️] {len(faltantes)} célula(s) sem explicação após {rodada + 1} rodada(s): {faltantes}"
+            )
+            break
+        logger.warning(f"[⚠️] {len(faltantes)} célula(s) sem explicação, pedindo de novo: {faltantes}")
+        # Mantém as posições (os índices das células) e esvazia as que já foram explicadas
+        pendentes = set(faltantes)
+        restantes = [c if i in pendentes else {**c, "source": ""} for i, c in enumerate(celulas)]
+        plano = planejar_requisicoes(restantes, modelo, contar, tokens_resposta=tokens_resposta, template=template)
+
+    return dict(sorted(por_celula.items()))
@@ -0,0 +1,339 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import argparse
+import gc
+import logging
+import os
+import shutil
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+GB = 1024 ** 3
+
+# Memória deixada para o sistema operacional e outros processos: o maior entre o mínimo e a fração da RAM
+RESERVA_SISTEMA_MINIMA = 512 * MB
+FRACAO_RESERVA_SISTEMA = 0.10
+# Memória de um worker de conversão parado (interpretador, nbconvert e templates carregados)
+MEMORIA_BASE_WORKER = 200 * MB
+# Menor teto por notebook que ainda justifica um worker a mais no pool
+MEMORIA_MINIMA_NOTEBOOK = 256 * MB
+# Quantas vezes o tamanho do .ipynb um notebook ocupa na memória quando carregado inteiro pelo nbformat
+FATOR_MEMORIA_NOTEBOOK = 6
+# Chamadas ao LLM são limitadas pela rede e pela cota, não pela CPU; abaixo de 1 GB livre, poucas por vez
+CONCORRENCIA_LLM_MINIMA = 2
+CONCORRENCIA_LLM_MAXIMA = 16
+MEMORIA_CONCORRENCIA_REDUZIDA = 1 * GB
+# O cache de respostas do LLM usa no máximo esta fração do disco livre, entre os dois limites
+FRACAO_DISCO_CACHE_LLM = 0.05
+CACHE_LLM_MINIMO = 16 * MB
+CACHE_LLM_MAXIMO = 1 * GB
+# A partir desta fração do limite de RSS o pool reduz o paralelismo; no limite, passa a usar o leitor streaming
+FRACAO_PRESSAO = 0.85
+INTERVALO_MONITOR = 0.5
+
+# Limites de memória do cgroup (contêineres e agentes de CI), v2 e v1
+CGROUP_LIMITES = (Path("/sys/fs/cgroup/memory.max"), Path("/sys/fs/cgroup/memory/memory.limit_in_bytes"))
+CGROUP_USO = (Path("/sys/fs/cgroup/memory.current"), Path("/sys/fs/cgroup/memory/memory.usage_in_bytes"))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Recursos da máquina
+# Mesma sondagem do 'informacoes_instalacao.txt' (installer.py). Usa o psutil quando instalado; sem ele,
+# lê os mesmos números do sistema operacional. Dentro de um contêiner, vale o limite do cgroup.
+@dataclass
+class Hardware:
+    cpus: int
+    memoria_total: int
+    memoria_disponivel: int
+    disco_livre: int
+
+
+def _ler_inteiro(caminhos) -> Optional[int]:
+    for caminho in caminhos:
+        try:
+            valor = caminho.read_text().strip()
+        except OSError:
+            continue
+        if valor.isdigit():
+            return int(valor)
+    return None
+
+
+def _memoria_sistema():
+    try:
+        import psutil
+
+        memoria = psutil.virtual_memory()
+        return memoria.total, memoria.available
+    except ImportError:
+        pass
+
+    total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") if hasattr(os, "sysconf") else 0
+    disponivel = None
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for linha in f:
+                if linha.startswith("MemAvailable:"):
+                    disponivel = int(linha.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    return total, disponivel if disponivel is not None else total // 2
+
+
+def sondar_hardware(base_dir: Optional[Path] = None) -> Hardware:
+    total, disponivel = _memoria_sistema()
+
+    limite_cgroup = _ler_inteiro(CGROUP_LIMITES)
+    if limite_cgroup and (not total or limite_cgroup < total):
+        uso = _ler_inteiro(CGROUP_USO) or 0
+        total = limite_cgroup
+        disponivel = min(disponivel, max(0, limite_cgroup - uso))
+
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    return Hardware(
+        cpus=max(1, cpus),
+        memoria_total=total,
+        memoria_disponivel=disponivel,
+        disco_livre=shutil.disk_usage(base_dir or Path.cwd()).free,
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para medir a memória residente (RSS) do processo atual e dos seus filhos (workers do pool)
+# Retorna None quando não há como medir (sem psutil e fora do Linux).
+def medir_rss(incluir_filhos: bool = True) -> Optional[int]:
+    try:
+        import psutil
+
+        processo = psutil.Process()
+        total = processo.memory_info().rss
+        if incluir_filhos:
+            for filho in processo.children(recursive=True):
+                try:
+                    total += filho.memory_info().rss
+                except psutil.Error:
+                    pass
+        return total
+    except ImportError:
+        pass
+
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+
+    pagina = os.sysconf("SC_PAGE_SIZE")
+    pendentes, total = [os.getpid()], 0
+    while pendentes:
+        pid = pendentes.pop()
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * pagina
+        except (OSError, IndexError, ValueError):
+            continue
+        if incluir_filhos:
+            for tarefa in (proc / str(pid) / "task").glob("*/children"):
+                try:
+                    pendentes.extend(int(p) for p in tarefa.read_text().split())
+                except OSError:
+                    pass
+    return total
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para ler o pico de memória residente (RSS) do processo atual
+# É o ru_maxrss do getrusage: uma chamada de sistema, sem amostragem nem tracemalloc, então pode ser lido
+# depois de cada notebook em produção. Vale para o processo inteiro até agora; num worker do pool, que
+# converte poucos notebooks em sequência, é o limite superior do pico do notebook atual. None fora do Unix.
+def pico_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Em KB no Linux e em bytes no macOS
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Plano de recursos de uma execução
+# Tamanho do pool de conversão, chamadas simultâneas ao LLM, tamanho do cache de respostas e o teto de
+# memória de cada notebook. 'limite_rss' é o máximo de memória residente da execução inteira (processo
+# principal e workers); perto dele o pool reduz o paralelismo e, no limite, a conversão passa a usar o
+# leitor streaming, que grava os outputs grandes em disco em vez de mantê-los na memória.
+@dataclass
+class PlanoRecursos:
+    workers_conversao: int
+    concorrencia_llm: int
+    cache_llm_bytes: int
+    memoria_por_notebook: int
+    limite_rss: int
+
+    # Limites do leitor streaming para um notebook: os informados pelo usuário; senão, só quando o
+    # notebook carregado inteiro não caberia no teto por notebook ou quando 'forcar' (memória no limite)
+    def limites_para(self, arquivo: Path, limites=None, forcar: bool = False):
+        if limites is not None:
+            return limites
+        try:
+            estimativa = Path(arquivo).stat().st_size * FATOR_MEMORIA_NOTEBOOK
+        except OSError:
+            return None
+        if forcar or estimativa > self.memoria_por_notebook:
+            from src.leitor_notebook import LimitesSaida
+
+            return LimitesSaida()
+        return None
+
+    def descrever(self) -> str:
+        return (
+            f"{self.workers_conversao} worker(s) de conversão, {self.concorrencia_llm} chamada(s) simultânea(s) "
+            f"ao LLM, cache do LLM de {self.cache_llm_bytes // MB} MB, até {self.memoria_por_notebook // MB} MB "
+            f"por notebook, limite de memória de {self.limite_rss // MB} MB"
+        )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que escolhe o plano de recursos a partir do hardware
+# Os valores informados (ex.: pela linha de comando) têm prioridade; os demais são derivados deles.
+def planejar_recursos(
+    hardware: Optional[Hardware] = None,
+    workers: Optional[int] = None,
+    concorrencia_llm: Optional[int] = None,
+    cache_llm_bytes: Optional[int] = None,
+    memoria_por_notebook: Optional[int] = None,
+    limite_rss: Optional[int] = None,
+) -> PlanoRecursos:
+    hardware = hardware or sondar_hardware()
+
+    if limite_rss is None:
+        reserva = max(RESERVA_SISTEMA_MINIMA, int(hardware.memoria_total * FRACAO_RESERVA_SISTEMA))
+        limite_rss = min(hardware.memoria_disponivel, hardware.memoria_total - reserva)
+        limite_rss = max(MEMORIA_BASE_WORKER + MEMORIA_MINIMA_NOTEBOOK, limite_rss)
+
+    if workers is None:
+        if memoria_por_notebook is not None:
+            por_worker = MEMORIA_BASE_WORKER + memoria_por_notebook
+        else:
+            por_worker = MEMORIA_BASE_WORKER + MEMORIA_MINIMA_NOTEBOOK
+        workers = min(hardware.cpus, limite_rss // por_worker)
+    workers = max(1, workers)
+
+    if memoria_por_notebook is None:
+        memoria_por_notebook = max(MEMORIA_MINIMA_NOTEBOOK, limite_rss // workers - MEMORIA_BASE_WORKER)
+
+    if concorrencia_llm is None:
+        if limite_rss < MEMORIA_CONCORRENCIA_REDUZIDA:
+            concorrencia_llm = CONCORRENCIA_LLM_MINIMA
+        else:
+            concorrencia_llm = min(CONCORRENCIA_LLM_MAXIMA, max(CONCORRENCIA_LLM_MINIMA, hardware.cpus * 2))
+
+    if cache_llm_bytes is None:
+        cache_llm_bytes = int(hardware.disco_livre * FRACAO_DISCO_CACHE_LLM)
+        cache_llm_bytes = min(CACHE_LLM_MAXIMO, max(CACHE_LLM_MINIMO, cache_llm_bytes))
+
+    return PlanoRecursos(
+        workers_conversao=workers,
+        concorrencia_llm=max(1, concorrencia_llm),
+        cache_llm_bytes=cache_llm_bytes,
+        memoria_por_notebook=memoria_por_notebook,
+        limite_rss=limite_rss,
+    )
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Monitor de memória
+# Uma thread mede o RSS do processo e dos workers a cada 'intervalo' segundos. O pool de conversão
+# consulta 'sob_pressao' antes de enviar cada notebook (e reduz o paralelismo) e 'excedido' para decidir
+# se o próximo notebook usa o leitor streaming. Sem como medir o RSS, o monitor nunca acusa pressão.
+class MonitorMemoria:
+    def __init__(self, limite_rss: int, intervalo: float = INTERVALO_MONITOR, logger: logging.Logger = logger):
+        self.limite_rss = limite_rss
+        self.intervalo = intervalo
+        self.logger = logger
+        self.rss = medir_rss() or 0
+        self.pico = self.rss
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._avisado = False
+
+    @property
+    def sob_pressao(self) -> bool:
+        return self.rss >= self.limite_rss * FRACAO_PRESSAO
+
+    @property
+    def excedido(self) -> bool:
+        return self.rss >= self.limite_rss
+
+    def medir(self) -> int:
+        self.rss = medir_rss() or 0
+        self.pico = max(self.pico, self.rss)
+        if self.sob_pressao and not self._avisado:
+            self._avisado = True
+            self.logger.warning(
+                f"[⚠️] Memória em {self.rss // MB} MB de {self.limite_rss // MB} MB: reduzindo o paralelismo"
+            )
+            gc.collect()
+        elif not self.sob_pressao:
+            self._avisado = False
+        return self.rss
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self.medir()
+
+    def iniciar(self) -> "MonitorMemoria":
+        if self._thread is None:
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="monitor-memoria", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MonitorMemoria":
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Argumentos de linha de comando comuns
+# Cada opção não informada fica por conta do planejador.
+def adicionar_argumentos_recursos(parser: argparse.ArgumentParser):
+    grupo = parser.add_argument_group("recursos (padrão: escolhidos pelo hardware)")
+    grupo.add_argument("--workers", type=int, help="notebooks convertidos ao mesmo tempo")
+    grupo.add_argument("--concorrencia-llm", type=int, help="chamadas simultâneas ao LLM")
+    grupo.add_argument("--cache-llm-mb", type=int, help="tamanho máximo do cache de respostas do LLM")
+    grupo.add_argument("--memoria-notebook-mb", type=int, help="teto de memória por notebook")
+    grupo.add_argument("--memoria-maxima-mb", type=int, help="limite de memória da execução inteira")
+
+
+def plano_dos_argumentos(args: argparse.Namespace, base_dir: Optional[Path] = None,
+                         logger: logging.Logger = logger) -> PlanoRecursos:
+    def em_bytes(valor: Optional[int]) -> Optional[int]:
+        return valor * MB if valor is not None else None
+
+    plano = planejar_recursos(
+        sondar_hardware(base_dir),
+        workers=args.workers,
+        concorrencia_llm=args.concorrencia_llm,
+        cache_llm_bytes=em_bytes(args.cache_llm_mb),
+        memoria_por_notebook=em_bytes(args.memoria_notebook_mb),
+        limite_rss=em_bytes(args.memoria_maxima_mb),
+    )
+    logger.info(f"[⚙️] Plano de recursos: {plano.descrever()}")
+    return plano
@@ -0,0 +1,181 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import base64
+import html
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from src.modelo_documento import (
+    ArmazemImagens,
+    Bloco,
+    Codigo,
+    Imagem,
+    Lista,
+    ModeloDocumento,
+    Paragrafo,
+    Titulo,
+    Trecho,
+)
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Conversão DOCX -> PDF pelo LibreOffice em modo headless
+EXECUTAVEIS_LIBREOFFICE = ("soffice", "libreoffice")
+CAMINHOS_LIBREOFFICE_WINDOWS = (
+    Path(os.environ.get("PROGRAMFILES", r"C:\Program Files")) / "LibreOffice" / "program" / "soffice.exe",
+    Path(os.environ.get("PROGRAMFILES(X86)", r"C:\Program Files (x86)")) / "LibreOffice" / "program" / "soffice.exe",
+)
+TIMEOUT_PDF = 600
+NIVEIS_SUMARIO = 2
+
+ESTILO_HTML = """
+body { font-family: Calibri, Arial, sans-serif; max-width: 52rem; margin: 2rem auto; padding: 0 1rem; color: #222; }
+header { text-align: center; margin-bottom: 3rem; }
+pre { background: #f4f4f4; padding: .75rem; overflow-x: auto; font-size: .85rem; }
+code { font-family: Consolas, monospace; }
+img { max-width: 100%; }
+nav li { list-style: none; }
+nav .nivel-2 { margin-left: 1.5rem; }
+"""
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Funções auxiliares do HTML
+def _trechos_html(trechos: List[Trecho]) -> str:
+    partes = []
+    for texto, estilo in trechos:
+        texto = html.escape(texto)
+        if estilo == "b":
+            texto = f"<strong>{texto}</strong>"
+        elif estilo == "i":
+            texto = f"<em>{texto}</em>"
+        elif estilo == "c":
+            texto = f"<code>{texto}</code>"
+        partes.append(texto)
+    return "".join(partes)
+
+
+class _EscritorHTML:
+    def __init__(self, modelo: ModeloDocumento, armazem: ArmazemImagens):
+        self.modelo = modelo
+        self.armazem = armazem
+        self.sumario: List[str] = []
+        self._ancoras = 0
+
+    def blocos(self, blocos: List[Bloco]) -> List[str]:
+        linhas = []
+        for bloco in blocos:
+            if isinstance(bloco, Titulo):
+                nivel = min(max(bloco.nivel, 1), 6)
+                texto = html.escape(bloco.texto)
+                if nivel <= NIVEIS_SUMARIO:
+                    self._ancoras += 1
+                    ancora = f"s{self._ancoras}"
+                    self.sumario.append(f'<li class="nivel-{nivel}"><a href="#{ancora}">{texto}</a></li>')
+                    linhas.append(f'<h{nivel} id="{ancora}">{texto}</h{nivel}>')
+                else:
+                    linhas.append(f"<h{nivel}>{texto}</h{nivel}>")
+            elif isinstance(bloco, Paragrafo):
+                linhas.append(f"<p>{_trechos_html(bloco.trechos)}</p>")
+            elif isinstance(bloco, Lista):
+                tag = "ol" if bloco.numerada else "ul"
+                itens = "".join(f"<li>{_trechos_html(item)}</li>" for item in bloco.itens)
+                linhas.append(f"<{tag}>{itens}</{tag}>")
+            elif isinstance(bloco, Codigo):
+                linhas.append(f"<pre><code>{html.escape(bloco.texto)}</code></pre>")
+            elif isinstance(bloco, Imagem):
+                mime = self.modelo.imagens.get(bloco.ref, "image/png")
+                dados = base64.b64encode(self.armazem.ler(bloco.ref)).decode("ascii")
+                linhas.append(f'<p><img src="data:{mime};base64,{dados}" alt=""></p>')
+        return linhas
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Renderizador HTML do modelo do documento
+# Gera um único arquivo autocontido (estilo embutido e imagens como data URI), com sumário por âncoras.
+def renderizar_html(modelo: ModeloDocumento, armazem: ArmazemImagens, output_path: Path) -> Path:
+    escritor = _EscritorHTML(modelo, armazem)
+    corpo = escritor.blocos([Titulo(1, "Introdução")] + modelo.introducao)
+    for secao in modelo.secoes:
+        corpo.append(f'<section data-documento="{html.escape(secao.documento, quote=True)}">')
+        corpo.extend(escritor.blocos(secao.blocos))
+        corpo.append("</section>")
+
+    titulo = html.escape(modelo.titulo)
+    capa = [f"<h1>{titulo}</h1>"]
+    if modelo.subtitulo:
+        capa.append(f"<p>{html.escape(modelo.subtitulo)}</p>")
+    if modelo.data:
+        capa.append(f"<p>{html.escape(modelo.data)}</p>")
+
+    pagina = "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="pt-BR">',
+        "<head>",
+        '<meta charset="utf-8">',
+        f"<title>{titulo}</title>",
+        f"<style>{ESTILO_HTML}</style>",
+        "</head>",
+        "<body>",
+        "<header>", *capa, "</header>",
+        "<nav><h2>Sumário</h2><ul>", *escritor.sumario, "</ul></nav>",
+        "<main>", *corpo, "</main>",
+        "</body>",
+        "</html>",
+        "",
+    ])
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temporario = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    temporario.write_text(pagina, encoding="utf-8")
+    os.replace(temporario, output_path)
+    return output_path
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para localizar o LibreOffice
+def localizar_libreoffice() -> Optional[str]:
+    for nome in EXECUTAVEIS_LIBREOFFICE:
+        caminho = shutil.which(nome)
+        if caminho:
+            return caminho
+    for caminho in CAMINHOS_LIBREOFFICE_WINDOWS:
+        if caminho.exists():
+            return str(caminho)
+    return None
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Renderizador PDF
+# Converte o DIT.docx já renderizado com o LibreOffice local (sem serviço externo), então o PDF tem a mesma
+# paginação e o sumário com números de página. Cada conversão usa um perfil temporário do LibreOffice,
+# para não conflitar com uma instância aberta pelo usuário ou com outro job em paralelo.
+def renderizar_pdf(docx_path: Path, output_path: Path, timeout: int = TIMEOUT_PDF) -> Path:
+    soffice = localizar_libreoffice()
+    if soffice is None:
+        raise RuntimeError(
+            "LibreOffice não encontrado: instale o LibreOffice (comando 'soffice') para exportar o DIT em PDF"
+        )
+
+    with tempfile.TemporaryDirectory(prefix="ditfy_pdf_") as temporaria:
+        temporaria = Path(temporaria)
+        comando = [
+            soffice,
+            f"-env:UserInstallation={(temporaria / 'perfil').as_uri()}",
+            "--headless",
+            "--convert-to", "pdf",
+            "--outdir", str(temporaria),
+            str(docx_path),
+        ]
+        processo = subprocess.run(comando, capture_output=True, text=True, timeout=timeout)
+        gerado = temporaria / f"{docx_path.stem}.pdf"
+        if processo.returncode != 0 or not gerado.exists():
+            raise RuntimeError(f"Falha ao converter para PDF: {(processo.stderr or processo.stdout).strip()}")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(gerado), str(output_path))
+    return output_path
@@ -0,0 +1,174 @@
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.cache_llm import chave_cache
+from src.instrumentacao import etapa
+from src.llm import MODELO_PADRAO, TEMPLATE_RESUMO, completar_async, criar_cliente_async, montar_mensagens
+
+# Configuração do logger
+logger = logging.getLogger(__name__)
+
+# Limites padrão (ajustáveis por chamada)
+CONCORRENCIA_PADRAO = 8
+REQUISICOES_POR_MINUTO = 500
+TOKENS_POR_MINUTO = 90_000
+TENTATIVAS_PADRAO = 5
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Limitador de taxa por requisições e tokens por minuto
+# Dois "baldes" que se recarregam continuamente. Cada chamada retira 1 requisição e a estimativa de tokens;
+# se faltar saldo em algum deles, espera o tempo necessário para recarregar.
+class LimitadorTaxa:
+    def __init__(self, requisicoes_por_minuto: int = REQUISICOES_POR_MINUTO, tokens_por_minuto: int = TOKENS_POR_MINUTO):
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self.tokens_por_minuto = tokens_por_minuto
+        self._requisicoes = float(requisicoes_por_minuto)
+        self._tokens = float(tokens_por_minuto)
+        self._ultima = time.monotonic()
+        self._trava = asyncio.Lock()
+
+    def _recarregar(self):
+        agora = time.monotonic()
+        decorrido = agora - self._ultima
+        self._ultima = agora
+        self._requisicoes = min(self.requisicoes_por_minuto, self._requisicoes + decorrido * self.requisicoes_por_minuto / 60)
+        self._tokens = min(self.tokens_por_minuto, self._tokens + decorrido * self.tokens_por_minuto / 60)
+
+    async def aguardar(self, tokens: int):
+        # Uma chamada maior que o limite por minuto nunca caberia no balde: limita ao tamanho do balde
+        tokens = min(tokens, self.tokens_por_minuto)
+        async with self._trava:
+            while True:
+                self._recarregar()
+                if self._requisicoes >= 1 and self._tokens >= tokens:
+                    self._requisicoes -= 1
+                    self._tokens -= tokens
+                    return
+                espera_requisicao = max(0.0, (1 - self._requisicoes) * 60 / self.requisicoes_por_minuto)
+                espera_tokens = max(0.0, (tokens - self._tokens) * 60 / self.tokens_por_minuto)
+                await asyncio.sleep(max(espera_requisicao, espera_tokens))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para estimar os tokens de uma chamada
+# Aproximação de 4 caracteres por token, somada ao limite de tokens da resposta.
+def estimar_tokens(mensagens, max_tokens: int = 512) -> int:
+    return sum(len(m["content"]) for m in mensagens) // 4 + max_tokens
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para decidir se um erro da API deve ser tentado de novo
+# Repete em 429 (limite de taxa), em erros 5xx e em falhas de conexão/timeout.
+def erro_repetivel(erro: Exception) -> bool:
+    status = getattr(erro, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    try:
+        import openai
+        return isinstance(erro, (openai.APIConnectionError, openai.APITimeoutError))
+    except ImportError:
+        return isinstance(erro, (ConnectionError, TimeoutError, asyncio.TimeoutError))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que calcula a espera antes de uma nova tentativa
+# Respeita o cabeçalho Retry-After quando a API informa; caso contrário usa backoff exponencial com jitter.
+def tempo_espera(erro: Exception, tentativa: int, base: float = 1.0, maximo: float = 60.0) -> float:
+    resposta = getattr(erro, "response", None)
+    retry_after = getattr(resposta, "headers", {}).get("retry-after") if resposta is not None else None
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), maximo)
+    except ValueError:
+        pass
+    return min(base * (2 ** tentativa), maximo) * (0.5 + random.random() / 2)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função para resumir várias seções de forma concorrente
+# Até 'concorrencia' chamadas ficam em andamento ao mesmo tempo, todas passando pelo limitador de
+# requisições/tokens por minuto. Erros 429/5xx são repetidos com backoff. A lista devolvida segue
+# a mesma ordem de 'secoes', independente da ordem em que as respostas chegam.
+# Uma seção que falha não interrompe as outras: volta como "" e o erro fica no log (e em 'falhas', se
+# informado, indexado pela posição da seção). Só quando todas as seções falham o primeiro erro é relançado.
+async def resumir_secoes_async(
+    secoes: List[str],
+    cliente=None,
+    modelo: str = MODELO_PADRAO,
+    template: str = TEMPLATE_RESUMO,
+    concorrencia: int = CONCORRENCIA_PADRAO,
+    requisicoes_por_minuto: int = REQUISICOES_POR_MINUTO,
+    tokens_por_minuto: int = TOKENS_POR_MINUTO,
+    tentativas: int = TENTATIVAS_PADRAO,
+    espera_base: float = 1.0,
+    cache=None,
+    contar_tokens: Optional[Callable[[list], int]] = None,
+    logger: logging.Logger = logger,
+    falhas: Optional[Dict[int, Exception]] = None,
+    **parametros,
+) -> List[str]:
+    cliente = cliente or criar_cliente_async()
+    limitador = LimitadorTaxa(requisicoes_por_minuto, tokens_por_minuto)
+    semaforo = asyncio.Semaphore(max(1, concorrencia))
+    contar_tokens = contar_tokens or (lambda m: estimar_tokens(m, parametros.get("max_tokens", 512)))
+
+    async def resumir(indice: int, texto: str) -> str:
+        chave = chave_cache(texto, modelo, template, parametros)
+        if cache is not None:
+            resposta = await asyncio.to_thread(cache.obter, chave)
+            if resposta is not None:
+                return resposta
+
+        mensagens = montar_mensagens(texto, template)
+        async with semaforo:
+            for tentativa in range(tentativas):
+                await limitador.aguardar(contar_tokens(mensagens))
+                try:
+                    resposta = await completar_async(cliente, mensagens, modelo, **parametros)
+                    break
+                except Exception as e:
+                    if not erro_repetivel(e) or tentativa == tentativas - 1:
+                        raise
+                    espera = tempo_espera(e, tentativa, espera_base)
+                    logger.warning(f"[⚠️] Seção {indice}: {e}. Nova tentativa em {espera:.1f}s")
+                    await asyncio.sleep(espera)
+
+        if cache is not None:
+            await asyncio.to_thread(cache.gravar, chave, resposta)
+        return resposta
+
+    inicio = time.perf_counter()
+    with etapa("llm.lote", secoes=len(secoes), concorrencia=concorrencia):
+        resultados = await asyncio.gather(
+            *(resumir(i, texto) for i, texto in enumerate(secoes)), return_exceptions=True
+        )
+
+    resumos, erros = [], {}
+    for indice, resultado in enumerate(resultados):
+        if isinstance(resultado, BaseException):
+            if not isinstance(resultado, Exception):
+                raise resultado
+            logger.error(f"[✗] Seção {indice} sem resumo: {resultado}")
+            erros[indice] = resultado
+            resultado = ""
+        resumos.append(resultado)
+    if falhas is not None:
+        falhas.update(erros)
+    if secoes and len(erros) == len(secoes):
+        raise erros[0]
+    logger.info(
+        f"[✓] {len(secoes) - len(erros)} seção(ões) resumida(s) em {time.perf_counter() - inicio:.2f}s"
+        + (f" ({len(erros)} com falha)" if erros else "")
+    )
+    return resumos
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Versão síncrona, para quem não está dentro de um loop asyncio
+def resumir_secoes(secoes: List[str], **kwargs) -> List[str]:
+    return asyncio.run(resumir_secoes_async(secoes, **kwargs))
@@ -0,0 +1,96 @@
+# Corpus sintético de notebooks, usado pelos testes e pelo benchmark (benchmarks/bench_pipeline.py)
+# IMPORTAÇÃO DAS BIBLIOTECAS
+import base64
+import json
+import random
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Perfil de um notebook sintético
+# 'proporcao_codigo' é a fração de células de código; 'bytes_output' é o tamanho do stdout de cada célula
+# de código; 'imagens' é o número de gráficos e 'imagens_repetidas' quantos deles repetem um anterior.
+@dataclass
+class PerfilNotebook:
+    nome: str
+    celulas: int
+    proporcao_codigo: float = 0.6
+    bytes_output: int = 200
+    imagens: int = 0
+    imagens_repetidas: int = 0
+    lado_imagem: int = 400
+    notebooks: int = 1
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que gera um PNG válido (ruído em tons de cinza) sem depender do Pillow
+def png_sintetico(lado: int, rng: random.Random) -> bytes:
+    linhas = b"".join(b"\x00" + rng.randbytes(lado) for _ in range(lado))
+
+    def bloco(tipo: bytes, dados: bytes) -> bytes:
+        return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+    cabecalho = struct.pack(">IIBBBBB", lado, lado, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + bloco(b"IHDR", cabecalho) + bloco(b"IDAT", zlib.compress(linhas, 1)) + bloco(b"IEND", b"")
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que gera o conteúdo de um notebook sintético
+# A mesma semente sempre gera o mesmo notebook, para que execuções diferentes sejam comparáveis.
+def gerar_notebook(perfil: PerfilNotebook, semente: int = 0) -> dict:
+    rng = random.Random(f"{perfil.nome}:{semente}")
+    posicoes_imagem = set(rng.sample(range(perfil.celulas), min(perfil.imagens, perfil.celulas)))
+    imagens: List[str] = []
+
+    celulas = []
+    for i in range(perfil.celulas):
+        if i in posicoes_imagem or rng.random() < perfil.proporcao_codigo:
+            outputs = [{
+                "output_type": "stream",
+                "name": "stdout",
+                "text": [f"linha {j}: {rng.random():.6f}\n" for j in range(max(1, perfil.bytes_output // 20))],
+            }]
+            if i in posicoes_imagem:
+                if imagens and len(imagens) >= max(1, perfil.imagens - perfil.imagens_repetidas):
+                    dados = rng.choice(imagens)
+                else:
+                    dados = base64.b64encode(png_sintetico(perfil.lado_imagem, rng)).decode("ascii")
+                    imagens.append(dados)
+                outputs.append({"output_type": "display_data", "metadata": {}, "data": {"image/png": dados}})
+            celulas.append({
+                "cell_type": "code",
+                "execution_count": i,
+                "metadata": {},
+                "source": [f"df_{i} = spark.read.table('tabela_{i}')\n", f"df_{i}.groupBy('col').count().show()"],
+                "outputs": outputs,
+            })
+        else:
+            celulas.append({
+                "cell_type": "markdown",
+                "metadata": {},
+                "source": [f"## Etapa {i}\n", "Descrição da etapa com **destaques** e uma lista:\n", "- item a\n", "- item b"],
+            })
+
+    return {
+        "cells": celulas,
+        "metadata": {"kernelspec": {"name": "python3", "display_name": "Python 3"}},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Função que grava o corpus de um perfil em uma pasta e devolve os caminhos dos notebooks
+def gerar_corpus(perfil: PerfilNotebook, pasta: Path, semente: int = 0) -> List[Path]:
+    pasta.mkdir(parents=True, exist_ok=True)
+    caminhos = []
+    for n in range(perfil.notebooks):
+        caminho = pasta / f"{perfil.nome}_{n:03d}.ipynb"
+        caminho.write_text(json.dumps(gerar_notebook(perfil, semente + n), indent=1), encoding="utf-8")
+        caminhos.append(caminho)
+    (pasta / "perfil.json").write_text(json.dumps(asdict(perfil), indent=2), encoding="utf-8")
+    return caminhos
@@ -0,0 +1,63 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorFalsoOpenAI:
+    """
+    Servidor HTTP local que imita o endpoint /v1/chat/completions da OpenAI.
+    Responde com o início do prompt e pode devolver códigos de erro nas primeiras chamadas.
+    """
+
+    def __init__(self, erros=None):
+        self.erros = list(erros or [])
+        self.requisicoes = []
+        self._trava = threading.Lock()
+
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                tamanho = int(self.headers.get("Content-Length", 0))
+                corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+                with servidor._trava:
+                    servidor.requisicoes.append(corpo)
+                    status = servidor.erros.pop(0) if servidor.erros else 200
+
+                if status != 200:
+                    resposta = {"error": {"message": "erro simulado", "type": "teste", "code": status}}
+                else:
+                    conteudo = corpo["messages"][-1]["content"]
+                    resposta = {
+                        "id": "chatcmpl-teste",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": corpo.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": f"Resumo: {conteudo[-40:]}"},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                    }
+
+                dados = json.dumps(resposta).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._servidor.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self._servidor.shutdown()
+        self._servidor.server_close()
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.cache_conversao import converte_incremental, trava_arquivo
+from src.conversao import ResultadoConversao, pasta_markdown
+
+
+def converte_lote_falso(arquivos, base_dir, logger, markdown_dir=None, limites=None, plano=None, ao_concluir=None,
+                        notebooks_dir=None):
+    resultados = []
+    for arquivo in arquivos:
+        destino = pasta_markdown(arquivo, markdown_dir, notebooks_dir)
+        destino.mkdir(parents=True, exist_ok=True)
+        saida = destino / f"{arquivo.stem}.md"
+        saida.write_text(arquivo.read_text(encoding="utf-8"), encoding="utf-8")
+        resultados.append(ResultadoConversao(arquivo=arquivo, sucesso=True, saida=saida))
+    return resultados
+
+
+class TestCacheConversao(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.notebooks = self.base_dir / "notebooks"
+        self.notebooks.mkdir()
+        self.logger = logging.getLogger("test_cache_conversao")
+
+        patcher = mock.patch("src.cache_conversao.converte_lote", side_effect=converte_lote_falso)
+        self.converte_lote = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def executar(self):
+        return converte_incremental(self.base_dir, self.logger)
+
+    def test_converte_apenas_alterados(self):
+        (self.notebooks / "a.ipynb").write_text('{"a": 1}', encoding="utf-8")
+        (self.notebooks / "b.ipynb").write_text('{"b": 1}', encoding="utf-8")
+
+        primeira = self.executar()
+        self.assertEqual([r.em_cache for r in primeira], [False, False])
+
+        segunda = self.executar()
+        self.assertEqual([r.em_cache for r in segunda], [True, True])
+
+        (self.notebooks / "b.ipynb").write_text('{"b": 2}', encoding="utf-8")
+        terceira = self.executar()
+        self.assertEqual([r.em_cache for r in terceira], [True, False])
+        self.assertTrue((self.base_dir / ".cache" / "manifesto_conversao.json").exists())
+
+    def test_remove_saidas_obsoletas(self):
+        (self.notebooks / "a.ipynb").write_text('{"a": 1}', encoding="utf-8")
+        self.executar()
+        self.assertTrue((self.base_dir / "markdown" / "a.md").exists())
+
+        (self.notebooks / "a.ipynb").unlink()
+        self.assertEqual(self.executar(), [])
+        self.assertFalse((self.base_dir / "markdown" / "a.md").exists())
+
+    def test_apenas_limita_leitura_aos_notebooks_informados(self):
+        (self.notebooks / "a.ipynb").write_text('{"a": 1}', encoding="utf-8")
+        (self.notebooks / "b.ipynb").write_text('{"b": 1}', encoding="utf-8")
+        self.executar()
+        (self.notebooks / "a.ipynb").write_text('{"a": 2}', encoding="utf-8")
+        (self.notebooks / "b.ipynb").write_text('{"b": 2}', encoding="utf-8")
+
+        with mock.patch("src.cache_conversao.hash_arquivo", return_value="h") as hash_arquivo:
+            resultados = converte_incremental(self.base_dir, self.logger, apenas=[self.notebooks / "b.ipynb"])
+        hash_arquivo.assert_called_once_with(self.notebooks / "b.ipynb")
+        self.assertEqual([r.arquivo.name for r in resultados], ["b.ipynb"])
+        self.assertFalse(resultados[0].em_cache)
+
+    def test_saida_apagada_forca_reconversao(self):
+        (self.notebooks / "a.ipynb").write_text('{"a": 1}', encoding="utf-8")
+        self.executar()
+        (self.base_dir / "markdown" / "a.md").unlink()
+
+        resultados = self.executar()
+        self.assertFalse(resultados[0].em_cache)
+        self.assertTrue((self.base_dir / "markdown" / "a.md").exists())
+
+    def test_notebooks_com_o_mesmo_nome_em_subpastas(self):
+        for pasta in ("vendas", "compras"):
+            (self.notebooks / pasta).mkdir()
+            (self.notebooks / pasta / "carga.ipynb").write_text(f'{{"{pasta}": 1}}', encoding="utf-8")
+
+        saidas = [r.saida for r in self.executar()]
+        markdown = self.base_dir / "markdown"
+        self.assertEqual(saidas, [markdown / "compras" / "carga.md", markdown / "vendas" / "carga.md"])
+        self.assertEqual([s.read_text(encoding="utf-8") for s in saidas], ['{"compras": 1}', '{"vendas": 1}'])
+        self.assertTrue(all(r.em_cache for r in self.executar()))
+
+    def test_manifesto_antigo_apaga_as_saidas_no_formato_anterior(self):
+        (self.notebooks / "sub").mkdir()
+        (self.notebooks / "sub" / "a.ipynb").write_text('{"a": 1}', encoding="utf-8")
+        antiga = self.base_dir / "markdown" / "a.md"
+        antiga.parent.mkdir()
+        antiga.write_text("antigo", encoding="utf-8")
+        manifesto = self.base_dir / ".cache" / "manifesto_conversao.json"
+        manifesto.parent.mkdir()
+        manifesto.write_text(
+            json.dumps({"versao": 1, "entradas": {"sub/a.ipynb": {"chave": "x", "saidas": ["a.md"]}}}),
+            encoding="utf-8",
+        )
+
+        resultados = self.executar()
+        self.assertFalse(antiga.exists())
+        self.assertEqual(resultados[0].saida, self.base_dir / "markdown" / "sub" / "a.md")
+
+
+class TestTravaArquivo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trava = Path(self.tmp.name) / "manifesto.lock"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_trava_de_processo_morto_e_removida(self):
+        processo = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                  capture_output=True, text=True, check=True)
+        self.trava.write_text(f"{processo.stdout.strip()} {socket.gethostname()}", encoding="utf-8")
+        with trava_arquivo(self.trava, timeout=1):
+            self.assertEqual(self.trava.read_text(encoding="utf-8").split()[0], str(os.getpid()))
+        self.assertFalse(self.trava.exists())
+
+    def test_trava_antiga_de_processo_vivo_e_respeitada(self):
+        self.trava.write_text(f"{os.getpid()} {socket.gethostname()}", encoding="utf-8")
+        os.utime(self.trava, (0, 0))
+        with self.assertRaises(TimeoutError):
+            with trava_arquivo(self.trava, timeout=0.3, expira_em=1, intervalo=0.05):
+                pass
+        self.assertTrue(self.trava.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from servidor_falso import ServidorFalsoOpenAI
+from src.cache_llm import CacheLLM, chave_cache
+from src.llm import criar_cliente, resumir_secao
+
+
+class TestCacheLLM(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.cache = CacheLLM.do_projeto(self.base_dir)
+
+    def tearDown(self):
+        self.cache.fechar()
+        self.tmp.cleanup()
+
+    def test_chave_ignora_diferencas_de_espaco(self):
+        a = chave_cache("x = 1  \r\n\r\n\r\ny = 2\n", "gpt", "{texto}", {"temperature": 0})
+        b = chave_cache("x = 1\n\ny = 2", "gpt", "{texto}", {"temperature": 0})
+        c = chave_cache("x = 1\n\ny = 2", "gpt", "{texto}", {"temperature": 1})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_obter_ou_gerar_conta_acertos(self):
+        chamadas = []
+
+        def gerar():
+            chamadas.append(1)
+            return "resposta"
+
+        for _ in range(3):
+            self.assertEqual(self.cache.obter_ou_gerar("texto", "gpt", "{texto}", {}, gerar), "resposta")
+
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual((self.cache.estatisticas.acertos, self.cache.estatisticas.falhas), (2, 1))
+
+    def test_persiste_entre_instancias(self):
+        self.cache.obter_ou_gerar("texto", "gpt", "{texto}", {}, lambda: "salvo")
+        self.cache.fechar()
+
+        self.cache = CacheLLM.do_projeto(self.base_dir)
+        self.assertEqual(self.cache.obter(chave_cache("texto", "gpt", "{texto}", {})), "salvo")
+
+    def test_remove_mais_antigas_ao_exceder_tamanho(self):
+        self.cache.tamanho_maximo = 25
+        for i in range(5):
+            self.cache.gravar(f"chave{i}", "x" * 10)
+
+        self.assertLessEqual(self.cache.tamanho_total(), 25)
+        self.assertIsNone(self.cache.obter("chave0"))
+        self.assertEqual(self.cache.obter("chave4"), "x" * 10)
+        self.assertEqual(self.cache.estatisticas.removidas, 3)
+
+    def test_tamanho_total_mantido_sem_somar_a_tabela(self):
+        consultas = []
+        self.cache._conexao.set_trace_callback(consultas.append)
+        self.cache.gravar("a", "x" * 10)
+        self.cache.gravar("b", "x" * 5)
+        self.cache.gravar("a", "x" * 3)
+        self.assertEqual(self.cache.tamanho_total(), 8)
+        self.assertFalse([c for c in consultas if "SUM(" in c])
+        self.cache.fechar()
+
+        self.cache = CacheLLM.do_projeto(self.base_dir)
+        self.assertEqual(self.cache.tamanho_total(), 8)
+
+    def test_limite_vale_entre_processos(self):
+        # Duas conexões ao mesmo arquivo, como dois processos (ex.: CLI e interface web)
+        outro = CacheLLM.do_projeto(self.base_dir, tamanho_maximo=25)
+        self.cache.tamanho_maximo = 25
+        try:
+            for i in range(4):
+                self.cache.gravar(f"a{i}", "x" * 10)
+                outro.gravar(f"b{i}", "y" * 10)
+            soma = self.cache._conexao.execute("SELECT SUM(tamanho) FROM respostas").fetchone()[0]
+            self.assertLessEqual(soma, 25)
+            self.assertEqual(outro.tamanho_total(), soma)
+        finally:
+            outro.fechar()
+        self.assertEqual(self.cache.obter("b3"), "y" * 10)
+
+    @unittest.skipUnless(importlib.util.find_spec("openai"), "openai não instalado")
+    def test_servidor_falso(self):
+        with ServidorFalsoOpenAI() as servidor:
+            cliente = criar_cliente(self.base_dir, base_url=servidor.base_url, api_key="teste")
+            primeira = resumir_secao("df = spark.read.csv('a.csv')", cliente, cache=self.cache)
+            segunda = resumir_secao("df = spark.read.csv('a.csv')  \n", cliente, cache=self.cache)
+
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(len(servidor.requisicoes), 1)
@@ -0,0 +1,129 @@
+import base64
+import importlib.util
+import json
+import logging
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from corpus_sintetico import png_sintetico
+from src.conversao import (
+    ResultadoConversao,
+    converte_lote,
+    converte_paralelo,
+    converte_to_md,
+    converter_notebook,
+    listar_notebooks,
+    obter_exportador,
+    resumir_conversao,
+)
+
+
+def converter_ou_derrubar_worker(arquivo, markdown_dir, limites=None):
+    """Simula um notebook que derruba o processo do worker (ex.: morto por falta de memória)."""
+    if arquivo.stem == "derruba":
+        os._exit(1)
+    return ResultadoConversao(arquivo=arquivo, sucesso=True, saida=markdown_dir / f"{arquivo.stem}.md")
+
+
+class TestConversao(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.logger = logging.getLogger("test_conversao")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_listar_notebooks_ignora_checkpoints(self):
+        notebooks = self.base_dir / "notebooks"
+        (notebooks / ".ipynb_checkpoints").mkdir(parents=True)
+        (notebooks / "b.ipynb").write_text("{}", encoding="utf-8")
+        (notebooks / "a.ipynb").write_text("{}", encoding="utf-8")
+        (notebooks / ".ipynb_checkpoints" / "a-checkpoint.ipynb").write_text("{}", encoding="utf-8")
+
+        nomes = [p.name for p in listar_notebooks(notebooks)]
+        self.assertEqual(nomes, ["a.ipynb", "b.ipynb"])
+
+    def test_arquivo_inexistente(self):
+        arquivo = self.base_dir / "nao_existe.ipynb"
+        self.assertFalse(converte_to_md(arquivo, self.base_dir, self.logger))
+
+        resultados = converte_lote([arquivo], self.base_dir, self.logger)
+        self.assertEqual(len(resultados), 1)
+        self.assertFalse(resultados[0].sucesso)
+        self.assertIn("não encontrado", resultados[0].erro)
+
+    def test_paralelo_preserva_ordem_e_isola_falhas(self):
+        arquivos = [self.base_dir / f"nb_{i}.ipynb" for i in range(5)]
+        resultados = converte_paralelo(arquivos, self.base_dir, self.logger, workers=2)
+
+        self.assertEqual([r.arquivo for r in resultados], arquivos)
+        self.assertTrue(all(not r.sucesso for r in resultados))
+
+        resumo = resumir_conversao(resultados, duracao=2.0)
+        self.assertEqual((resumo.total, resumo.sucessos, resumo.falhas), (5, 0, 5))
+        self.assertEqual(resumo.vazao, 2.5)
+
+    def test_queda_de_worker_marca_so_o_notebook_que_derrubou(self):
+        arquivos = [self.base_dir / f"{nome}.ipynb" for nome in ("a", "b", "derruba", "c", "d", "e")]
+        with mock.patch("src.conversao.converter_notebook", converter_ou_derrubar_worker):
+            resultados = converte_paralelo(arquivos, self.base_dir, self.logger, workers=3)
+
+        self.assertEqual([r.arquivo for r in resultados], arquivos)
+        self.assertEqual([r.sucesso for r in resultados], [True, True, False, True, True, True])
+        self.assertIn("worker caiu", resultados[2].erro)
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("nbconvert"), "nbconvert não instalado")
+class TestConversaoNbconvert(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_converte_notebook_real(self):
+        png = base64.b64encode(png_sintetico(20, random.Random(1))).decode("ascii")
+        notebook = {
+            "cells": [
+                {"cell_type": "markdown", "metadata": {}, "source": ["# Carga\n", "Lê a tabela de **vendas**."]},
+                {
+                    "cell_type": "code",
+                    "execution_count": 1,
+                    "metadata": {},
+                    "source": ["print('total', 42)"],
+                    "outputs": [
+                        {"output_type": "stream", "name": "stdout", "text": ["total 42\n"]},
+                        {"output_type": "display_data", "metadata": {}, "data": {"image/png": png}},
+                    ],
+                },
+            ],
+            "metadata": {"kernelspec": {"name": "python3", "display_name": "Python 3", "language": "python"}},
+            "nbformat": 4,
+            "nbformat_minor": 5,
+        }
+        arquivo = self.base_dir / "carga.ipynb"
+        arquivo.write_text(json.dumps(notebook), encoding="utf-8")
+
+        resultado = converter_notebook(arquivo, self.base_dir / "markdown")
+
+        self.assertTrue(resultado.sucesso, resultado.erro)
+        self.assertIs(obter_exportador(), obter_exportador())
+        texto = resultado.saida.read_text(encoding="utf-8")
+        self.assertIn("# Carga", texto)
+        self.assertIn("Lê a tabela de **vendas**.", texto)
+        self.assertIn("print('total', 42)", texto)
+        self.assertIn("total 42", texto)
+        imagens = list((self.base_dir / "markdown" / "carga_files").iterdir())
+        self.assertEqual(len(imagens), 1)
+        self.assertIn(f"carga_files/{imagens[0].name}", texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,28 @@
+import json
+import tempfile
 import unittest
-from src.converter import markdown_to_docx
+from pathlib import Path
+
+from src.converter import markdown_to_docx, notebook_to_docx
 
 class TestConversion(unittest.TestCase):
     def test_basic_conversion(self):
         result = markdown_to_docx("# Test", "output.docx")
-        self.assertTrue(result)
\ No newline at end of file
+        self.assertTrue(result)
+
+    def test_notebook_to_docx(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            notebook = Path(tmp) / "analise.ipynb"
+            notebook.write_text(json.dumps({
+                "cells": [
+                    {"cell_type": "markdown", "metadata": {}, "source": ["# Carga\n", "Lê os **dados**."]},
+                    {"cell_type": "code", "metadata": {}, "execution_count": 1, "source": ["print(1)"],
+                     "outputs": [{"output_type": "stream", "name": "stdout", "text": ["1\n"]}]},
+                ],
+                "metadata": {}, "nbformat": 4, "nbformat_minor": 5,
+            }), encoding="utf-8")
+            saida = Path(tmp) / "analise.docx"
+
+            self.assertTrue(notebook_to_docx(notebook, saida))
+            self.assertTrue(saida.exists())
+            self.assertEqual(list(Path(tmp).glob("*.md")), [])
@@ -0,0 +1,59 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from corpus_sintetico import png_sintetico
+from src import dit
+from src.dit import gerar_dit
+
+
+class TestDIT(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.markdown = self.base_dir / "markdown"
+        self.markdown.mkdir()
+        for nome, semente in (("carga", 1), ("vendas", 2)):
+            (self.markdown / f"{nome}_files").mkdir()
+            (self.markdown / f"{nome}_files" / "output_1_0.png").write_bytes(png_sintetico(20, random.Random(semente)))
+            (self.markdown / f"{nome}.md").write_text(
+                f"# Leitura de {nome}\n\nLê os **dados**.\n\n![png]({nome}_files/output_1_0.png)\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def gerar(self):
+        with mock.patch("src.dit.renderizar_fragmento", side_effect=dit.renderizar_fragmento) as renderizar:
+            self.assertTrue(gerar_dit(self.base_dir, resumos={"vendas.md": "Resumo das vendas."}))
+        return [chamada.args[0].documento for chamada in renderizar.call_args_list]
+
+    def test_rerenderiza_so_a_secao_alterada(self):
+        from docx import Document
+
+        self.assertEqual(self.gerar(), ["carga.md", "vendas.md"])
+        self.assertEqual(self.gerar(), [])
+
+        (self.markdown / "vendas.md").write_text("# Vendas por mês\n\nNovo texto.\n", encoding="utf-8")
+        self.assertEqual(self.gerar(), ["vendas.md"])
+
+        documento = Document(str(self.base_dir / "doc" / "DIT.docx"))
+        textos = [p.text for p in documento.paragraphs]
+        self.assertIn("Sumário", textos)
+        self.assertIn("Introdução", textos)
+        self.assertLess(textos.index("carga"), textos.index("vendas"))
+        self.assertIn("Resumo das vendas.", textos)
+        self.assertIn("Vendas por mês", textos)
+        self.assertEqual(len(documento.inline_shapes), 1)
+
+    def test_remove_fragmentos_de_notebooks_apagados(self):
+        self.gerar()
+        (self.markdown / "vendas.md").unlink()
+        self.gerar()
+        fragmentos = list((self.base_dir / dit.PASTA_FRAGMENTOS).glob("*.zip"))
+        self.assertEqual(len(fragmentos), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
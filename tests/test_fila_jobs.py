@@ -0,0 +1,88 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.fila_jobs import CANCELADO, CONCLUIDO, FALHOU, FilaJobs
+
+
+class TestFilaJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.caminho = Path(self.tmp.name) / "jobs.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def esperar(self, fila, job_id):
+        return list(fila.acompanhar(job_id, intervalo=0.01))[-1]
+
+    def test_executa_jobs_com_progresso(self):
+        vistos = []
+
+        def executar(job, progresso):
+            progresso(0.5, "metade")
+            if job.parametros.get("falhar"):
+                raise ValueError("erro proposital")
+            vistos.append(job.segredos.get("api_key"))
+            return f"resultado {job.parametros['n']}"
+
+        fila = FilaJobs(self.caminho, executar, workers=2, intervalo=0.01)
+        fila.iniciar()
+        try:
+            ok = fila.enviar({"n": 1}, segredos={"api_key": "sk-teste"})
+            erro = fila.enviar({"n": 2, "falhar": True})
+            final_ok, final_erro = self.esperar(fila, ok), self.esperar(fila, erro)
+        finally:
+            fila.fechar()
+
+        self.assertEqual(final_ok.estado, CONCLUIDO)
+        self.assertEqual(final_ok.resultado, "resultado 1")
+        self.assertIn("sk-teste", vistos)
+        self.assertEqual(final_ok.progresso, 1.0)
+        self.assertEqual(final_erro.estado, FALHOU)
+        self.assertIn("erro proposital", final_erro.erro)
+        # O segredo não vai para o disco
+        self.assertNotIn(b"sk-teste", self.caminho.read_bytes())
+
+    def test_cancela_job_em_execucao_e_pendente(self):
+        iniciado, liberar = threading.Event(), threading.Event()
+
+        def executar(job, progresso):
+            iniciado.set()
+            while True:
+                liberar.wait(0.01)
+                progresso(0.1, "trabalhando")
+
+        fila = FilaJobs(self.caminho, executar, workers=1, intervalo=0.01)
+        fila.iniciar()
+        try:
+            em_execucao = fila.enviar({})
+            pendente = fila.enviar({})
+            iniciado.wait(5)
+            self.assertTrue(fila.cancelar(pendente))
+            self.assertEqual(fila.obter(pendente).estado, CANCELADO)
+            self.assertTrue(fila.cancelar(em_execucao))
+            self.assertEqual(self.esperar(fila, em_execucao).estado, CANCELADO)
+            self.assertFalse(fila.cancelar(em_execucao))
+        finally:
+            fila.fechar()
+
+    def test_job_interrompido_e_retomado_apos_reinicio(self):
+        fila = FilaJobs(self.caminho, lambda job, progresso: None)
+        job_id = fila.enviar({"pasta": "x"})
+        fila._reservar()  # simula um worker que pegou o job e o servidor caiu
+        fila.fechar()
+
+        fila = FilaJobs(self.caminho, lambda job, progresso: "ok", intervalo=0.01)
+        fila.iniciar()
+        try:
+            final = self.esperar(fila, job_id)
+        finally:
+            fila.fechar()
+        self.assertEqual(final.estado, CONCLUIDO)
+        self.assertEqual(final.resultado, "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
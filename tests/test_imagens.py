@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.imagens import ProcessadorImagens, processar_outputs
+
+
+class TestImagens(unittest.TestCase):
+    def test_deduplica_imagens_repetidas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pasta = Path(tmp) / "nb_files"
+            processador = ProcessadorImagens(pasta)
+
+            primeira = processador.processar(b"grafico" * 100, "image/png")
+            segunda = processador.processar(b"grafico" * 100, "image/png")
+            outra = processador.processar(b"outro" * 100, "image/png")
+
+            self.assertFalse(primeira.duplicada)
+            self.assertTrue(segunda.duplicada)
+            self.assertEqual(primeira.caminho, segunda.caminho)
+            self.assertNotEqual(primeira.caminho, outra.caminho)
+            self.assertEqual(len(list(pasta.iterdir())), 2)
+            self.assertEqual(processador.duplicadas, 1)
+            self.assertEqual(processador.bytes_economizados, 700)
+
+    def test_outputs_do_nbconvert_deduplicados_e_referencias_reescritas(self):
+        corpo = ("![png](nb_files/nb_1_0.png)\n\n![png](nb_files/nb_2_0.png)\n\n"
+                 "![svg](nb_files/nb_3_0.svg)\n")
+        outputs = {
+            "nb_files/nb_1_0.png": b"grafico" * 100,
+            "nb_files/nb_2_0.png": b"grafico" * 100,
+            "nb_files/nb_3_0.svg": b"<svg/>",
+        }
+        corpo, novos = processar_outputs(corpo, outputs, ProcessadorImagens())
+
+        pngs = [nome for nome in novos if nome.endswith(".png")]
+        self.assertEqual(len(pngs), 1)
+        self.assertTrue(pngs[0].startswith("nb_files/img_"))
+        self.assertEqual(corpo.count(f"]({pngs[0]})"), 2)
+        self.assertIn("](nb_files/nb_3_0.svg)", corpo)
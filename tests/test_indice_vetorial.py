@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.indice_vetorial import (
+    EmbedderHash,
+    IndiceVetorial,
+    contexto_relacionado,
+    dividir_secoes,
+    indexar_pasta,
+    texto_com_contexto,
+)
+
+
+class EmbedderContador(EmbedderHash):
+    def __init__(self):
+        super().__init__(dimensao=128)
+        self.textos = []
+
+    def gerar(self, textos):
+        self.textos.extend(textos)
+        return super().gerar(textos)
+
+
+class EmbedderSemModelo:
+    def __init__(self, nome):
+        self.nome = nome
+
+    def gerar(self, textos):
+        raise OSError("sem rede para baixar o modelo")
+
+
+class TestIndiceVetorial(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.markdown = self.base_dir / "markdown"
+        self.markdown.mkdir()
+        self.embedder = EmbedderContador()
+        self.indice = IndiceVetorial.do_projeto(self.base_dir, self.embedder)
+
+    def tearDown(self):
+        self.indice.fechar()
+        self.tmp.cleanup()
+
+    def test_divide_nos_titulos_fora_de_codigo(self):
+        texto = "# A\ntexto a\n```python\n# comentário\n```\n## B\ntexto b"
+        secoes = dividir_secoes("nb.md", texto)
+        self.assertEqual([s.id for s in secoes], ["nb.md#0", "nb.md#1"])
+        self.assertIn("# comentário", secoes[0].texto)
+
+    def test_reembeda_so_o_conteudo_alterado(self):
+        (self.markdown / "vendas.md").write_text(
+            "# Leitura\nleitura da tabela de vendas por cliente\n# Agregação\nsoma das vendas por mês", encoding="utf-8")
+        (self.markdown / "estoque.md").write_text("# Estoque\nsaldo de estoque por produto", encoding="utf-8")
+
+        primeira = self.indice.atualizar_pasta(self.markdown)
+        self.assertEqual(primeira["embeddings_gerados"], 3)
+
+        self.embedder.textos.clear()
+        (self.markdown / "estoque.md").write_text("# Estoque\nsaldo de estoque por loja", encoding="utf-8")
+        segunda = self.indice.atualizar_pasta(self.markdown)
+        self.assertEqual(segunda["embeddings_gerados"], 1)
+        self.assertEqual(self.embedder.textos, ["# Estoque\nsaldo de estoque por loja"])
+
+        (self.markdown / "estoque.md").unlink()
+        terceira = self.indice.atualizar_pasta(self.markdown)
+        self.assertEqual(terceira["removidas"], 1)
+        self.assertEqual({r.documento for r in self.indice.buscar("estoque", k=10)}, {"vendas.md"})
+
+    def test_busca_top_k_e_contexto(self):
+        (self.markdown / "vendas.md").write_text(
+            "# Leitura\nleitura da tabela de vendas por cliente\n# Agregação\nsoma das vendas por mês", encoding="utf-8")
+        (self.markdown / "estoque.md").write_text("# Estoque\nsaldo de estoque por produto", encoding="utf-8")
+        self.indice.atualizar_pasta(self.markdown)
+
+        resultados = self.indice.buscar("saldo de estoque por produto", k=2)
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual(resultados[0].id, "estoque.md#0")
+        self.assertGreater(resultados[0].similaridade, resultados[1].similaridade)
+
+        texto = texto_com_contexto(self.indice, "vendas por cliente", k=1, documento="estoque.md")
+        self.assertIn("[vendas.md#0]", texto)
+        self.assertNotIn("estoque.md", texto)
+
+        # 'documentos' restringe a busca (ex.: aos notebooks do job atual)
+        self.assertEqual(
+            {r.documento for r in self.indice.buscar("vendas", k=5, documentos=["estoque.md"])}, {"estoque.md"}
+        )
+
+        # Seções maiores que o limite ficam de fora; sem nenhuma, não há contexto
+        self.assertEqual(contexto_relacionado(self.indice, "vendas", documento="vendas.md", k=1, max_caracteres=10), "")
+
+    def test_atualizacao_parcial_mantem_os_outros_documentos(self):
+        outra = self.base_dir / "outro_job"
+        outra.mkdir()
+        (self.markdown / "a.md").write_text("# A\nconteúdo a", encoding="utf-8")
+        (outra / "b.md").write_text("# B\nconteúdo b", encoding="utf-8")
+        self.indice.atualizar_pasta(self.markdown, completo=False)
+        self.assertEqual(self.indice.atualizar_pasta(outra, completo=False)["removidas"], 0)
+        self.assertEqual({r.documento for r in self.indice.buscar("conteúdo", k=5)}, {"a.md", "b.md"})
+
+        self.embedder.textos.clear()
+        self.assertEqual(self.indice.atualizar_pasta(self.markdown, completo=False)["embeddings_gerados"], 0)
+
+    def test_falha_do_embedder_usa_hashing_sem_mexer_no_indice_do_projeto(self):
+        (self.markdown / "vendas.md").write_text("# Vendas\nvendas por cliente", encoding="utf-8")
+        (self.markdown / "estoque.md").write_text("# Estoque\nsaldo de estoque", encoding="utf-8")
+        self.indice.atualizar_pasta(self.markdown)
+
+        # Mesmo modelo do índice, mas indisponível agora (ex.: offline)
+        (self.markdown / "rh.md").write_text("# RH\nfolha de pagamento", encoding="utf-8")
+        with self.assertLogs("src.indice_vetorial", "WARNING"):
+            alternativo = indexar_pasta(self.base_dir, self.markdown, EmbedderSemModelo(self.embedder.nome))
+        try:
+            self.assertIsInstance(alternativo.embedder, EmbedderHash)
+            self.assertIn("[vendas.md#0]", contexto_relacionado(alternativo, "vendas", documento="estoque.md"))
+        finally:
+            alternativo.fechar()
+        # O índice do projeto continua com o modelo e as seções de antes
+        self.assertEqual({r.documento for r in self.indice.buscar("vendas", k=5)}, {"vendas.md", "estoque.md"})
+
+    def test_troca_de_modelo_refaz_o_indice(self):
+        (self.markdown / "a.md").write_text("# A\nconteúdo", encoding="utf-8")
+        self.indice.atualizar_pasta(self.markdown)
+        self.indice.fechar()
+
+        self.indice = IndiceVetorial.do_projeto(self.base_dir, EmbedderHash(dimensao=64))
+        self.assertEqual(self.indice.buscar("conteúdo"), [])
+        self.assertEqual(self.indice.atualizar_pasta(self.markdown)["embeddings_gerados"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
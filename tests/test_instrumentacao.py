@@ -0,0 +1,85 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.instrumentacao import (
+    _listeners,
+    configurar_logger_assincrono,
+    cronometrar,
+    encerrar_logs,
+    etapa,
+    execucao_medida,
+    gravar_resumo_etapas,
+    registro_etapas,
+)
+
+
+class TestInstrumentacao(unittest.TestCase):
+    def setUp(self):
+        registro_etapas.limpar()
+
+    def test_resumo_de_etapas_em_json_lines(self):
+        @cronometrar("docx.gravacao")
+        def gravar():
+            return "ok"
+
+        with etapa("conversao.notebook", arquivo="a.ipynb"):
+            pass
+        with self.assertRaises(ValueError):
+            with etapa("conversao.notebook", arquivo="b.ipynb"):
+                raise ValueError("falhou")
+        self.assertEqual(gravar(), "ok")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = gravar_resumo_etapas(Path(tmp), "teste")
+            linhas = [json.loads(l) for l in caminho.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual([l["tipo"] for l in linhas], ["etapa", "etapa", "etapa", "resumo"])
+        self.assertEqual(linhas[0]["atributos"], {"arquivo": "a.ipynb"})
+        resumo = linhas[-1]["etapas"]
+        self.assertEqual(resumo["conversao.notebook"]["quantidade"], 2)
+        self.assertEqual(resumo["conversao.notebook"]["falhas"], 1)
+        self.assertEqual(resumo["docx.gravacao"]["quantidade"], 1)
+
+    def test_logger_grava_em_segundo_plano(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            logger = configurar_logger_assincrono(Path(tmp), "teste_instrumentacao", "log_teste_")
+            logger.debug("mensagem de depuração")
+            encerrar_logs()
+
+            arquivos = list((Path(tmp) / "log").glob("log_teste_*.log"))
+            self.assertEqual(len(arquivos), 1)
+            self.assertIn("mensagem de depuração", arquivos[0].read_text(encoding="utf-8"))
+            logger.handlers.clear()
+
+    def test_reconfigurar_fecha_o_log_anterior(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            logger = configurar_logger_assincrono(Path(tmp), "teste_reconfigurar", "log_a_")
+            listener = _listeners["teste_reconfigurar"]
+            configurar_logger_assincrono(Path(tmp), "teste_reconfigurar", "log_b_")
+            self.assertIsNone(listener._thread)
+            self.assertTrue(all(getattr(h, "stream", None) is None for h in listener.handlers
+                                if isinstance(h, logging.FileHandler)))
+            self.assertEqual(len(logger.handlers), 1)
+            encerrar_logs()
+            logger.handlers.clear()
+
+    def test_cada_execucao_grava_e_esvazia_o_seu_registro(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for lote in range(2):
+                with execucao_medida(Path(tmp), "observador") as registro:
+                    with etapa("conversao.notebook", lote=lote):
+                        pass
+                self.assertEqual(registro.etapas(), [])
+            arquivos = sorted((Path(tmp) / "log").glob("tempos_observador_*.jsonl"))
+            self.assertEqual(len(arquivos), 2)
+            for arquivo in arquivos:
+                linhas = arquivo.read_text(encoding="utf-8").splitlines()
+                self.assertEqual(json.loads(linhas[-1])["etapas"]["conversao.notebook"]["quantidade"], 1)
+        self.assertEqual(registro_etapas.etapas(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
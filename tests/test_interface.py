@@ -0,0 +1,122 @@
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from src.fila_jobs import CONCLUIDO, FilaJobs, Job
+from src.indice_vetorial import ARQUIVO_INDICE, PASTA_CACHE, EmbedderHash
+from src.interface import PASTA_JOBS, _resumir_notebooks, limpar_jobs
+
+
+class ClienteEco:
+    """Explica cada célula pedida e guarda os prompts recebidos."""
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **parametros):
+        await asyncio.sleep(0)
+        self.prompts.append(messages[-1]["content"])
+        indices = re.findall(r"\[célula (\d+)\]", messages[-1]["content"])
+        texto = "\n".join(f"[célula {i}] explica {i}" for i in indices)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=texto))])
+
+
+class TestLimpezaJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.fila = FilaJobs.do_projeto(self.base_dir, lambda job, progresso: "ok", workers=1)
+
+    def tearDown(self):
+        self.fila.fechar()
+        self.tmp.cleanup()
+
+    def pasta(self, job_id):
+        pasta = self.base_dir / PASTA_JOBS / job_id / "doc"
+        pasta.mkdir(parents=True)
+        (pasta / "DIT.docx").write_bytes(b"docx")
+        return pasta.parent
+
+    def test_apaga_so_jobs_finalizados_ha_mais_que_a_retencao(self):
+        concluido, pendente = self.fila.enviar({}), self.fila.enviar({})
+        self.fila._finalizar(concluido, CONCLUIDO, "Concluído")
+        pastas = {"concluido": self.pasta(concluido), "pendente": self.pasta(pendente), "orfa": self.pasta("orfa")}
+
+        self.assertEqual(limpar_jobs(self.base_dir, self.fila, retencao=3600), 0)
+
+        os.utime(pastas["orfa"], (0, 0))
+        time.sleep(0.05)
+        self.assertEqual(limpar_jobs(self.base_dir, self.fila, retencao=0.01), 2)
+        self.assertEqual({nome for nome, p in pastas.items() if p.exists()}, {"pendente"})
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("tiktoken"), "tiktoken não instalado")
+class TestResumos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def job(self, job_id, notebooks):
+        trabalho = self.base_dir / PASTA_JOBS / job_id
+        saidas = {}
+        for nome, texto in notebooks.items():
+            arquivo = trabalho / "notebooks" / f"{nome}.ipynb"
+            markdown = trabalho / "markdown" / f"{nome}.md"
+            for caminho in (arquivo, markdown):
+                caminho.parent.mkdir(parents=True, exist_ok=True)
+            celulas = [{"cell_type": "code", "metadata": {}, "source": [texto], "outputs": []}]
+            arquivo.write_text(json.dumps({"cells": celulas}), encoding="utf-8")
+            markdown.write_text(f"# {nome}\n{texto}", encoding="utf-8")
+            saidas[arquivo] = markdown
+        return Job(job_id, "executando", {}), saidas, trabalho / "markdown"
+
+    def resumir(self, job_id, notebooks, embedder):
+        job, saidas, markdown_dir = self.job(job_id, notebooks)
+        cliente = ClienteEco()
+        with mock.patch("src.llm.criar_cliente_async", return_value=cliente), \
+                mock.patch("src.indice_vetorial.embedder_padrao", return_value=embedder):
+            resumos = _resumir_notebooks(saidas, job, lambda *_: None, self.base_dir, markdown_dir, inicio=0.5)
+        return resumos, cliente
+
+    def test_indice_do_projeto_e_contexto_so_do_job(self):
+        embedder = EmbedderHash()
+        with mock.patch.object(embedder, "gerar", wraps=embedder.gerar) as gerar:
+            resumos, cliente = self.resumir("job1", {"vendas": "vendas por cliente", "estoque": "saldo"}, embedder)
+            self.assertEqual(set(resumos), {"vendas.md", "estoque.md"})
+            self.assertTrue((self.base_dir / PASTA_CACHE / ARQUIVO_INDICE).exists())
+            self.assertFalse((self.base_dir / PASTA_JOBS / "job1" / PASTA_CACHE).exists())
+            self.assertTrue(any("[estoque.md#0]" in p for p in cliente.prompts))
+
+            # Outro job com um dos mesmos notebooks: só o conteúdo novo é embedado, e o contexto não
+            # traz seções do job anterior
+            gerar.reset_mock()
+            _, cliente = self.resumir("job2", {"vendas": "vendas por cliente", "rh": "folha"}, embedder)
+        embedados = [texto for chamada in gerar.call_args_list for texto in chamada.args[0]]
+        # Cada texto vai uma vez como consulta; só o notebook novo é embedado também para o índice
+        self.assertEqual(embedados.count("# rh\nfolha"), 2)
+        self.assertEqual(embedados.count("# vendas\nvendas por cliente"), 1)
+        self.assertFalse(any("estoque" in p for p in cliente.prompts))
+
+
+    def test_falha_na_busca_segue_sem_contexto(self):
+        with mock.patch("src.indice_vetorial.contexto_relacionado", side_effect=OSError("sem modelo")), \
+                self.assertLogs("src.interface", "WARNING"):
+            resumos, cliente = self.resumir("job1", {"vendas": "vendas", "estoque": "saldo"}, EmbedderHash())
+        self.assertEqual(resumos["vendas.md"], "explica 0")
+        self.assertFalse(any("Contexto relacionado" in p for p in cliente.prompts))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import base64
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from src.leitor_notebook import LimitesSaida, converter_notebook_streaming, iterar_celulas
+from src.recursos import pico_rss
+
+
+def criar_notebook(caminho, celulas):
+    notebook = {
+        "cells": celulas,
+        "metadata": {"kernelspec": {"name": "python3"}},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+    caminho.write_text(json.dumps(notebook, indent=1), encoding="utf-8")
+
+
+class TestLeitorNotebook(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iterar_celulas_em_blocos_pequenos(self):
+        celulas = [{"cell_type": "markdown", "metadata": {}, "source": [f"# Seção {i}"]} for i in range(50)]
+        caminho = self.base_dir / "nb.ipynb"
+        criar_notebook(caminho, celulas)
+
+        lidas = list(iterar_celulas(caminho, tamanho_bloco=16))
+        self.assertEqual(lidas, celulas)
+
+    def test_converter_aplica_limites(self):
+        png = base64.b64encode(b"\x89PNG" + b"0" * 100).decode("ascii")
+        celulas = [
+            {"cell_type": "markdown", "metadata": {}, "source": ["# Título"]},
+            {
+                "cell_type": "code",
+                "metadata": {},
+                "execution_count": 1,
+                "source": ["print('x' * 500)"],
+                "outputs": [
+                    {"output_type": "stream", "name": "stdout", "text": ["x" * 500]},
+                    {"output_type": "display_data", "metadata": {}, "data": {"image/png": png}},
+                ],
+            },
+        ]
+        caminho = self.base_dir / "nb.ipynb"
+        criar_notebook(caminho, celulas)
+        markdown_dir = self.base_dir / "markdown"
+
+        resultado = converter_notebook_streaming(
+            caminho, markdown_dir, LimitesSaida(max_caracteres_texto=100), medir_memoria=True
+        )
+
+        self.assertTrue(resultado.sucesso, resultado.erro)
+        self.assertIsNotNone(resultado.memoria_pico)
+        self.assertFalse(tracemalloc.is_tracing())
+        # Sem pedir a medição, o tracemalloc não é ligado e o resultado traz o pico de RSS do processo
+        sem_medicao = converter_notebook_streaming(caminho, self.base_dir / "sem_medicao")
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(sem_medicao.memoria_pico, 0)
+        self.assertLessEqual(sem_medicao.memoria_pico, pico_rss())
+        texto = resultado.saida.read_text(encoding="utf-8")
+        self.assertIn("# Título", texto)
+        self.assertIn("400 caracteres omitidos", texto)
+        self.assertIn("![png](nb_files/img_", texto)
+        self.assertEqual(len((markdown_dir / "nb_files" / "output_0.txt").read_text(encoding="utf-8")), 500)
+
+    def test_json_invalido(self):
+        caminho = self.base_dir / "quebrado.ipynb"
+        caminho.write_text('{"cells": [{"cell_type": ', encoding="utf-8")
+
+        resultado = converter_notebook_streaming(caminho, self.base_dir / "markdown")
+        self.assertFalse(resultado.sucesso)
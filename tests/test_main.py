@@ -0,0 +1,121 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from corpus_sintetico import PerfilNotebook, gerar_corpus
+from src.main import (
+    SAIDA_OK,
+    SAIDA_SEM_NOTEBOOKS,
+    SAIDA_USO,
+    convert_notebooks_to_dit,
+    expandir_entradas,
+    ler_manifesto,
+    main,
+)
+from src.leitor_notebook import LimitesSaida
+from src.observador import Mudancas, processar_mudancas
+from src.recursos import GB, Hardware, planejar_recursos
+
+RAIZ = Path(__file__).resolve().parent.parent
+MODULOS_PESADOS = ("docx", "lxml", "nbconvert", "nbformat", "gradio", "openai", "numpy", "tiktoken")
+
+
+class TestImportacao(unittest.TestCase):
+    # O tempo de importação é medido (e comparado com o orçamento) em benchmarks/bench_pipeline.py
+    def test_importacao_nao_carrega_modulos_pesados(self):
+        codigo = "import json, sys\nimport src.main\nprint(json.dumps(sorted(sys.modules)))\n"
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        modulos = json.loads(saida.stdout)
+        carregados = [m for m in MODULOS_PESADOS if m in modulos]
+        self.assertEqual(carregados, [])
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        gerar_corpus(PerfilNotebook("nb", celulas=10, imagens=1, notebooks=3), self.base_dir / "nbs")
+        gerar_corpus(PerfilNotebook("extra", celulas=5), self.base_dir / "outros" / "sub")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_globs_e_manifesto(self):
+        manifesto = self.base_dir / "lista.txt"
+        manifesto.write_text("# notebooks\nnbs/nb_000.ipynb\n\noutros/**/*.ipynb\n", encoding="utf-8")
+        nomes = [p.name for p in ler_manifesto(manifesto)]
+        self.assertEqual(nomes, ["nb_000.ipynb", "extra_000.ipynb"])
+
+        (self.base_dir / "lista.json").write_text(json.dumps({"notebooks": ["nbs"]}), encoding="utf-8")
+        self.assertEqual(len(ler_manifesto(self.base_dir / "lista.json")), 3)
+
+        entradas = [self.base_dir / "nbs" / "nb_00[12].ipynb", self.base_dir / "nbs"]
+        nomes = [p.name for p in expandir_entradas(entradas)]
+        self.assertEqual(nomes, ["nb_001.ipynb", "nb_002.ipynb", "nb_000.ipynb"])
+
+    def converter(self, entradas, eventos=None):
+        # Teto de memória zero: todos os notebooks usam o leitor streaming (sem nbconvert)
+        hardware = Hardware(cpus=1, memoria_total=4 * GB, memoria_disponivel=3 * GB, disco_livre=10 * GB)
+        plano = planejar_recursos(hardware, memoria_por_notebook=0)
+        return convert_notebooks_to_dit(
+            entradas, self.base_dir / "doc", formatos=("docx", "html"), base_dir=self.base_dir, plano=plano,
+            ao_evento=eventos.append if eventos is not None else None,
+        )
+
+    def test_converte_e_emite_eventos(self):
+        eventos = []
+
+        def converter():
+            eventos.clear()
+            return self.converter([self.base_dir / "nbs" / "nb_00[01].ipynb"], eventos)
+
+        resultado = converter()
+        self.assertEqual(resultado.codigo, SAIDA_OK)
+        self.assertEqual(set(resultado.documentos), {"docx", "html"})
+        self.assertEqual([e["evento"] for e in eventos],
+                         ["inicio", "notebook", "notebook", "documento", "documento", "fim"])
+        json.dumps(eventos)
+
+        # Só as seções dos notebooks pedidos entram no documento
+        pagina = resultado.documentos["html"].read_text(encoding="utf-8")
+        self.assertIn("nb_001", pagina)
+        self.assertNotIn("nb_002", pagina)
+
+        self.assertEqual(converter().codigo, SAIDA_OK)
+        self.assertEqual(eventos[-1]["em_cache"], 2)
+
+    def test_entradas_disjuntas_nao_apagam_o_cache_uma_da_outra(self):
+        primeira = self.converter([self.base_dir / "nbs"])
+        segunda = self.converter([self.base_dir / "outros"])
+        self.assertEqual((primeira.codigo, segunda.codigo), (SAIDA_OK, SAIDA_OK))
+        self.assertTrue(all(r.saida.exists() for r in primeira.conversoes + segunda.conversoes))
+
+        ambas = self.converter([self.base_dir / "nbs", self.base_dir / "outros"])
+        self.assertEqual(len(ambas.conversoes), 4)
+        self.assertTrue(all(r.em_cache for r in ambas.conversoes))
+
+    def test_notebooks_do_projeto_usam_o_mesmo_markdown_do_observador(self):
+        gerar_corpus(PerfilNotebook("proj", celulas=3), self.base_dir / "notebooks" / "vendas")
+        resultado = self.converter([self.base_dir / "notebooks"])
+        self.assertEqual(resultado.codigo, SAIDA_OK)
+        self.assertEqual(resultado.conversoes[0].saida, self.base_dir / "markdown" / "vendas" / "proj_000.md")
+
+        processar_mudancas(self.base_dir, Mudancas(completa=True), gerar_documento=False, limites=LimitesSaida())
+        self.assertEqual(
+            [p.relative_to(self.base_dir / "markdown").as_posix() for p in (self.base_dir / "markdown").rglob("*.md")],
+            ["vendas/proj_000.md"],
+        )
+
+    def test_sem_notebooks_e_argumentos_invalidos(self):
+        resultado = convert_notebooks_to_dit(self.base_dir / "vazia", base_dir=self.base_dir)
+        self.assertEqual(resultado.codigo, SAIDA_SEM_NOTEBOOKS)
+        with self.assertRaises(SystemExit) as erro:
+            main([str(self.base_dir / "nbs"), "--formatos", "odt"])
+        self.assertEqual(erro.exception.code, SAIDA_USO)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import base64
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from corpus_sintetico import png_sintetico
+from src import modelo_documento
+from src.dit import PASTA_FRAGMENTOS, CacheFragmentos, exportar_dit
+from src.modelo_documento import (
+    PASTA_IMAGENS_MODELO,
+    PASTA_MODELO,
+    Codigo,
+    Imagem,
+    Lista,
+    Paragrafo,
+    Titulo,
+    construir_modelo,
+    desserializar,
+    parsear_markdown,
+    serializar,
+)
+
+
+class TestParse(unittest.TestCase):
+    def test_blocos(self):
+        blocos = parsear_markdown("# Carga\n\nLê os **dados** com `pd`.\n\n- um\n- dois\n\n```\nx = 1\n```\n", 1)
+        self.assertEqual(blocos, [
+            Titulo(2, "Carga"),
+            Paragrafo([("Lê os ", ""), ("dados", "b"), (" com ", ""), ("pd", "c"), (".", "")]),
+            Lista([[("um", "")], [("dois", "")]]),
+            Codigo("x = 1"),
+        ])
+
+
+class TestModelo(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.markdown = self.base_dir / "markdown"
+        (self.markdown / "carga_files").mkdir(parents=True)
+        (self.markdown / "carga_files" / "output_1_0.png").write_bytes(png_sintetico(20, random.Random(1)))
+        (self.markdown / "carga.md").write_text(
+            "# Leitura\n\nLê os *dados* <brutos>.\n\n![png](carga_files/output_1_0.png)\n", encoding="utf-8")
+        (self.markdown / "vendas.md").write_text("# Vendas\n\n1. total\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def construir(self):
+        return construir_modelo(self.base_dir, self.markdown, "DIT", "Introdução.", {"vendas.md": "Resumo."})
+
+    def test_serializacao_ida_e_volta(self):
+        modelo, _ = self.construir()
+        self.assertEqual(desserializar(serializar(modelo)), modelo)
+        imagens = [b for s in modelo.secoes for b in s.blocos if isinstance(b, Imagem)]
+        self.assertEqual([i.ref for i in imagens], list(modelo.imagens))
+
+    def test_reaproveita_secoes_inalteradas(self):
+        self.construir()
+        with mock.patch("src.modelo_documento.parsear_secao", wraps=modelo_documento.parsear_secao) as parsear:
+            (self.markdown / "vendas.md").write_text("# Vendas por mês\n", encoding="utf-8")
+            modelo, _ = self.construir()
+        self.assertEqual([c.args[1] for c in parsear.call_args_list], ["vendas.md"])
+        self.assertEqual([s.documento for s in modelo.secoes], ["carga.md", "vendas.md"])
+
+    def test_execucao_parcial_mantem_o_cache_dos_outros_documentos(self):
+        exportar_dit(self.base_dir, ("docx",), markdown_dir=self.markdown)
+        exportar_dit(self.base_dir, ("docx",), markdown_dir=self.markdown, documentos=["vendas.md"])
+        cache = CacheFragmentos(self.base_dir / PASTA_FRAGMENTOS)
+        self.assertEqual(set(cache.fragmentos), {"carga.md", "vendas.md"})
+
+        with mock.patch("src.modelo_documento.parsear_secao", wraps=modelo_documento.parsear_secao) as parsear:
+            modelo, armazem = construir_modelo(self.base_dir, self.markdown, "DIT", "Introdução.")
+        parsear.assert_not_called()
+        self.assertTrue(all(armazem.ler(ref) for ref in modelo.imagens))
+
+        # Só sai do cache o que não tem mais Markdown
+        (self.markdown / "carga.md").unlink()
+        exportar_dit(self.base_dir, ("docx",), markdown_dir=self.markdown, documentos=["vendas.md"])
+        self.assertEqual(set(CacheFragmentos(self.base_dir / PASTA_FRAGMENTOS).fragmentos), {"vendas.md"})
+        self.assertEqual(list((self.base_dir / PASTA_MODELO / PASTA_IMAGENS_MODELO).iterdir()), [])
+
+    def test_exporta_html_e_docx_do_mesmo_modelo(self):
+        with mock.patch("src.dit.construir_modelo", wraps=construir_modelo) as construir:
+            gerados = exportar_dit(self.base_dir, ("docx", "html"), markdown_dir=self.markdown)
+        self.assertEqual(construir.call_count, 1)
+        self.assertEqual(set(gerados), {"docx", "html"})
+
+        pagina = gerados["html"].read_text(encoding="utf-8")
+        self.assertIn('<a href="#s1">Introdução</a>', pagina)
+        self.assertIn("<em>dados</em> &lt;brutos&gt;", pagina)
+        self.assertIn("data:image/png;base64,", pagina)
+        self.assertIn("<ol><li>total</li></ol>", pagina)
+
+    def test_pdf_sem_libreoffice_nao_interrompe_os_outros_formatos(self):
+        with mock.patch("src.renderizadores.localizar_libreoffice", return_value=None):
+            gerados = exportar_dit(self.base_dir, ("html", "pdf"), markdown_dir=self.markdown)
+        self.assertEqual(set(gerados), {"html"})
+
+
+
+class TestModeloDosNotebooks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.notebooks = self.base_dir / "notebooks"
+        (self.notebooks / "vendas").mkdir(parents=True)
+        png = base64.b64encode(png_sintetico(20, random.Random(1))).decode("ascii")
+        self.escrever("vendas/carga.ipynb", [
+            {"cell_type": "markdown", "metadata": {}, "source": ["# Leitura\n", "Lê os *dados*."]},
+            {"cell_type": "code", "metadata": {}, "execution_count": 1, "source": ["print(1)"], "outputs": [
+                {"output_type": "stream", "name": "stdout", "text": ["1\n"]},
+                {"output_type": "display_data", "metadata": {}, "data": {"image/png": png}},
+            ]},
+        ])
+        self.escrever("estoque.ipynb", [{"cell_type": "markdown", "metadata": {}, "source": ["1. saldo"]}])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def escrever(self, nome, celulas):
+        conteudo = {"cells": celulas, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+        (self.notebooks / nome).write_text(json.dumps(conteudo), encoding="utf-8")
+
+    def test_secoes_saem_direto_das_celulas(self):
+        with mock.patch("src.modelo_documento.parsear_secao") as parsear:
+            gerados = exportar_dit(self.base_dir, ("docx", "html"), notebooks_dir=self.notebooks)
+        parsear.assert_not_called()
+        self.assertEqual(set(gerados), {"docx", "html"})
+        self.assertFalse((self.base_dir / "markdown").exists())
+
+        modelo, armazem = construir_modelo(
+            self.base_dir, self.base_dir / "markdown", "DIT", "Introdução.",
+            notebooks={"vendas/carga.md": self.notebooks / "vendas" / "carga.ipynb"},
+        )
+        secao = modelo.secoes[0]
+        self.assertEqual(secao.documento, "vendas/carga.md")
+        self.assertEqual(secao.blocos[:3], [
+            Titulo(1, "carga"), Titulo(2, "Leitura"), Paragrafo([("Lê os ", ""), ("dados", "i"), (".", "")]),
+        ])
+        self.assertEqual(secao.blocos[3:5], [Codigo("print(1)"), Codigo("1")])
+        imagem = secao.blocos[5]
+        self.assertIsInstance(imagem, Imagem)
+        self.assertEqual(modelo.imagens[imagem.ref], "image/png")
+        self.assertTrue(armazem.ler(imagem.ref).startswith(b"\x89PNG"))
+
+    def test_resumos_pelo_caminho_relativo(self):
+        # 'vendas/carga' e 'carga' têm o mesmo nome: cada um recebe só o próprio resumo
+        self.escrever("carga.ipynb", [{"cell_type": "markdown", "metadata": {}, "source": ["carga geral"]}])
+        modelo, _ = construir_modelo(
+            self.base_dir, self.base_dir / "markdown", "DIT", "Introdução.",
+            resumos={"vendas/carga.md": "Resumo das vendas."},
+            notebooks={d: self.notebooks / d.replace(".md", ".ipynb") for d in ("carga.md", "vendas/carga.md")},
+        )
+        secoes = {s.documento: s for s in modelo.secoes}
+        self.assertEqual(secoes["vendas/carga.md"].blocos[1], Paragrafo([("Resumo das vendas.", "")]))
+        self.assertNotIn(Paragrafo([("Resumo das vendas.", "")]), secoes["carga.md"].blocos)
+
+    def test_notebook_inalterado_vem_do_cache(self):
+        exportar_dit(self.base_dir, ("html",), notebooks_dir=self.notebooks)
+        with mock.patch("src.modelo_documento.secao_notebook", wraps=modelo_documento.secao_notebook) as montar:
+            self.escrever("estoque.ipynb", [{"cell_type": "markdown", "metadata": {}, "source": ["1. total geral"]}])
+            gerados = exportar_dit(self.base_dir, ("html",), notebooks_dir=self.notebooks)
+        self.assertEqual([c.args[1] for c in montar.call_args_list], ["estoque.md"])
+        self.assertIn("<ol><li>total geral</li></ol>", gerados["html"].read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
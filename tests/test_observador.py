@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from src.leitor_notebook import LimitesSaida
+from src.observador import (
+    Mudancas,
+    ObservadorNotebooks,
+    comparar_indices,
+    indexar_notebooks,
+    observar,
+    processar_mudancas,
+)
+
+
+class TestObservador(unittest.TestCase):
+    def test_indice_detecta_adicionados_alterados_e_removidos(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pasta = Path(tmp)
+            (pasta / "a.ipynb").write_text("{}", encoding="utf-8")
+            (pasta / "b.ipynb").write_text("{}", encoding="utf-8")
+            (pasta / ".ipynb_checkpoints").mkdir()
+            (pasta / ".ipynb_checkpoints" / "a-checkpoint.ipynb").write_text("{}", encoding="utf-8")
+            anterior = indexar_notebooks(pasta)
+            self.assertEqual(sorted(anterior), ["a.ipynb", "b.ipynb"])
+
+            (pasta / "a.ipynb").write_text('{"cells": []}', encoding="utf-8")
+            (pasta / "b.ipynb").unlink()
+            (pasta / "sub").mkdir()
+            (pasta / "sub" / "c.ipynb").write_text("{}", encoding="utf-8")
+
+            mudancas = comparar_indices(anterior, indexar_notebooks(pasta))
+            self.assertEqual(mudancas.adicionados, ["sub/c.ipynb"])
+            self.assertEqual(mudancas.alterados, ["a.ipynb"])
+            self.assertEqual(mudancas.removidos, ["b.ipynb"])
+
+    def test_debounce_agrupa_salvamentos_em_sequencia(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pasta = Path(tmp)
+            observador = ObservadorNotebooks(pasta, intervalo=0.02, espera=0.2)
+
+            def salvar_varias_vezes():
+                for i in range(5):
+                    (pasta / "a.ipynb").write_text("{}" + " " * i, encoding="utf-8")
+                    time.sleep(0.05)
+
+            escritor = threading.Thread(target=salvar_varias_vezes)
+            escritor.start()
+            mudancas = observador.aguardar_mudancas()
+            escritor.join()
+
+            self.assertEqual(mudancas.adicionados, ["a.ipynb"])
+            self.assertEqual(observador.indice["a.ipynb"][1], 6)
+            # Nada mudou desde a última varredura
+            self.assertEqual(indexar_notebooks(pasta), observador.indice)
+
+    def test_observar_processa_so_os_afetados(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            notebooks = base_dir / "notebooks"
+            notebooks.mkdir()
+            (notebooks / "a.ipynb").write_text("{}", encoding="utf-8")
+            (notebooks / "b.ipynb").write_text("{}", encoding="utf-8")
+            parar = threading.Event()
+            lotes = []
+
+            def processar(base_dir, mudancas, *args, **kwargs):
+                lotes.append(mudancas)
+                if len(lotes) == 1:
+                    caminho = notebooks / "b.ipynb"
+                    caminho.write_text('{"cells": []}', encoding="utf-8")
+                    os.utime(caminho, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+                else:
+                    parar.set()
+
+            thread = threading.Thread(
+                target=observar, args=(base_dir,), kwargs={"intervalo": 0.02, "espera": 0.05, "parar": parar,
+                                                           "processar": processar})
+            thread.start()
+            thread.join(timeout=10)
+
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(lotes[0].afetados, ["a.ipynb", "b.ipynb"])
+            self.assertEqual(lotes[1].afetados, ["b.ipynb"])
+            self.assertEqual([lote.completa for lote in lotes], [True, False])
+
+    def test_partida_remove_notebooks_apagados_com_o_observador_parado(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base_dir = Path(tmp)
+            notebooks = base_dir / "notebooks"
+            notebooks.mkdir()
+            for nome in ("a", "b"):
+                (notebooks / f"{nome}.ipynb").write_text('{"cells": []}', encoding="utf-8")
+            opcoes = {"limites": LimitesSaida(), "gerar_documento": False}
+            processar_mudancas(base_dir, Mudancas(adicionados=["a.ipynb", "b.ipynb"], completa=True), **opcoes)
+            self.assertTrue((base_dir / "markdown" / "b.md").exists())
+
+            # Observador parado: b.ipynb é apagado e a partida seguinte só enxerga a.ipynb
+            (notebooks / "b.ipynb").unlink()
+            processar_mudancas(base_dir, Mudancas(adicionados=["a.ipynb"], completa=True), **opcoes)
+            self.assertFalse((base_dir / "markdown" / "b.md").exists())
+            self.assertTrue((base_dir / "markdown" / "a.md").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
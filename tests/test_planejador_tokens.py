@@ -0,0 +1,107 @@
+import asyncio
+import re
+import unittest
+from types import SimpleNamespace
+
+from src.planejador_tokens import (
+    celulas_sem_resposta,
+    dividir_texto,
+    mapear_respostas,
+    planejar_requisicoes,
+    resumir_celulas,
+)
+
+
+def contar_palavras(texto):
+    return len(texto.split())
+
+
+def celula(tipo, texto):
+    return {"cell_type": tipo, "metadata": {}, "source": texto}
+
+
+class ClienteTruncado:
+    """Explica cada célula pedida, mas corta a primeira resposta depois da segunda célula."""
+
+    def __init__(self):
+        self.pedidas = []
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **parametros):
+        await asyncio.sleep(0)
+        indices = [int(i) for i in re.findall(r"\[célula (\d+)\]", messages[-1]["content"])]
+        self.pedidas.append(indices)
+        self.prompts.append(messages[-1]["content"])
+        if len(self.pedidas) == 1:
+            indices = indices[:2]
+        texto = "\n".join(f"[célula {i}] explica {i}" for i in indices)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=texto))])
+
+
+class TestPlanejadorTokens(unittest.TestCase):
+    def test_agrupa_celulas_pequenas(self):
+        celulas = [celula("code", f"x{i} = {i}") for i in range(30)]
+        plano = planejar_requisicoes(celulas, contar=contar_palavras, janela_contexto=400, tokens_resposta=50,
+                                     tokens_por_celula=1)
+
+        self.assertLess(len(plano.requisicoes), 5)
+        indices = [t.indice_celula for r in plano.requisicoes for t in r.trechos]
+        self.assertEqual(indices, list(range(30)))
+
+    def test_divide_celula_grande_entre_paragrafos(self):
+        paragrafos = [" ".join(f"p{i}w{j}" for j in range(20)) for i in range(10)]
+        pedacos = dividir_texto("\n\n".join(paragrafos), 50, contar_palavras)
+
+        self.assertTrue(all(contar_palavras(p) <= 50 for p in pedacos))
+        self.assertEqual("\n\n".join(pedacos), "\n\n".join(paragrafos))
+
+    def test_requisicoes_respeitam_janela(self):
+        celulas = [celula("markdown", " ".join(["palavra"] * 300)), celula("code", "y = 1")]
+        plano = planejar_requisicoes(celulas, contar=contar_palavras, janela_contexto=200, tokens_resposta=50)
+
+        self.assertTrue(all(r.tokens <= 200 - 50 for r in plano.requisicoes))
+        self.assertGreater(len(plano.requisicoes), 2)
+        self.assertEqual(plano.requisicoes[-1].trechos[-1].indice_celula, 1)
+
+    def test_mapear_respostas(self):
+        celulas = [celula("code", "a = 1"), celula("code", "b = 2"), celula("markdown", "# Fim")]
+        plano = planejar_requisicoes(celulas, contar=contar_palavras, janela_contexto=400, tokens_resposta=50,
+                                     tokens_por_celula=10)
+        self.assertEqual(len(plano.requisicoes), 1)
+
+        mapa = mapear_respostas(plano, ["[célula 0] define a\n[célula 1] define b\n[célula 2] título"])
+        self.assertEqual(mapa, {0: "define a", 1: "define b", 2: "título"})
+
+        sem_marcacao = mapear_respostas(plano, ["resumo geral"])
+        self.assertEqual(sem_marcacao, {0: "resumo geral", 1: "resumo geral", 2: "resumo geral"})
+
+    def test_limita_celulas_pela_resposta(self):
+        celulas = [celula("code", f"x{i} = {i}") for i in range(20)]
+        plano = planejar_requisicoes(celulas, contar=contar_palavras, janela_contexto=4000, tokens_resposta=400,
+                                     tokens_por_celula=100)
+        self.assertEqual([len(r.celulas) for r in plano.requisicoes], [4, 4, 4, 4, 4])
+
+    def test_resposta_truncada_pede_as_celulas_faltantes(self):
+        celulas = [celula("code", f"x{i} = {i}") for i in range(4)]
+        plano = planejar_requisicoes(celulas, contar=contar_palavras, janela_contexto=400, tokens_resposta=50,
+                                     tokens_por_celula=10)
+        mapa = mapear_respostas(plano, ["[célula 0] define x0\n[célula 1] define"])
+        self.assertEqual(celulas_sem_resposta(plano, mapa), [2, 3])
+
+        cliente = ClienteTruncado()
+        resumos = resumir_celulas(celulas, contar=contar_palavras, cliente=cliente)
+        self.assertEqual(cliente.pedidas, [[0, 1, 2, 3], [2, 3]])
+        self.assertEqual(resumos, {i: f"explica {i}" for i in range(4)})
+
+    def test_contexto_vai_em_todas_as_requisicoes(self):
+        celulas = [celula("code", f"x{i} = {i}") for i in range(4)]
+        contexto = "---\nContexto relacionado:\n[vendas.md#0]\nd = {'total': 1}"
+        cliente = ClienteTruncado()
+        resumir_celulas(celulas, contar=contar_palavras, cliente=cliente, contexto=contexto)
+        self.assertEqual(len(cliente.prompts), 2)
+        self.assertTrue(all(p.endswith(contexto) for p in cliente.prompts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import argparse
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.conversao import converte_lote
+from src.leitor_notebook import LimitesSaida
+from src.recursos import (
+    GB,
+    MB,
+    Hardware,
+    MonitorMemoria,
+    adicionar_argumentos_recursos,
+    medir_rss,
+    pico_rss,
+    planejar_recursos,
+    plano_dos_argumentos,
+)
+
+# Agente de CI com 4 GB de RAM e 4 CPUs
+AGENTE_4GB = Hardware(cpus=4, memoria_total=4 * GB, memoria_disponivel=3 * GB, disco_livre=50 * GB)
+
+
+class TestPlanejador(unittest.TestCase):
+    def test_plano_para_agente_de_4gb(self):
+        plano = planejar_recursos(AGENTE_4GB)
+        self.assertEqual(plano.limite_rss, 3 * GB)
+        self.assertEqual(plano.workers_conversao, 4)
+        self.assertEqual(plano.memoria_por_notebook, 3 * GB // 4 - 200 * MB)
+        self.assertEqual(plano.concorrencia_llm, 8)
+        self.assertEqual(plano.cache_llm_bytes, 1 * GB)
+
+    def test_pouca_memoria_reduz_workers_e_concorrencia(self):
+        hardware = Hardware(cpus=8, memoria_total=2 * GB, memoria_disponivel=900 * MB, disco_livre=100 * MB)
+        plano = planejar_recursos(hardware)
+        self.assertEqual(plano.limite_rss, 900 * MB)
+        self.assertEqual(plano.workers_conversao, 1)
+        self.assertEqual(plano.concorrencia_llm, 2)
+        self.assertEqual(plano.cache_llm_bytes, 16 * MB)
+
+    def test_argumentos_tem_prioridade(self):
+        parser = argparse.ArgumentParser()
+        adicionar_argumentos_recursos(parser)
+        args = parser.parse_args(["--workers", "2", "--memoria-maxima-mb", "1000", "--concorrencia-llm", "3"])
+        with mock.patch("src.recursos.sondar_hardware", return_value=AGENTE_4GB):
+            plano = plano_dos_argumentos(args)
+        self.assertEqual((plano.workers_conversao, plano.concorrencia_llm), (2, 3))
+        self.assertEqual(plano.limite_rss, 1000 * MB)
+        self.assertEqual(plano.memoria_por_notebook, 300 * MB)
+
+    def test_notebook_grande_usa_leitor_streaming(self):
+        plano = planejar_recursos(AGENTE_4GB, memoria_por_notebook=10 * 1024)
+        with tempfile.TemporaryDirectory() as tmp:
+            pequeno, grande = Path(tmp) / "pequeno.ipynb", Path(tmp) / "grande.ipynb"
+            pequeno.write_bytes(b"x" * 100)
+            grande.write_bytes(b"x" * 10 * 1024)
+            self.assertIsNone(plano.limites_para(pequeno))
+            self.assertIsInstance(plano.limites_para(grande), LimitesSaida)
+            self.assertIsInstance(plano.limites_para(pequeno, forcar=True), LimitesSaida)
+
+
+class TestMemoria(unittest.TestCase):
+    def test_mede_rss(self):
+        rss = medir_rss()
+        if rss is None:
+            self.skipTest("sem psutil e sem /proc")
+        self.assertGreater(rss, 0)
+
+    def test_pico_rss_acompanha_alocacao(self):
+        antes = pico_rss()
+        if antes is None:
+            self.skipTest("sem getrusage")
+        bloco = bytearray(antes + 64 * MB)
+        self.assertGreaterEqual(pico_rss(), antes + 32 * MB)
+        del bloco
+
+    def test_monitor_sinaliza_pressao(self):
+        with mock.patch("src.recursos.medir_rss", return_value=90 * MB):
+            monitor = MonitorMemoria(100 * MB)
+            self.assertTrue(monitor.sob_pressao)
+            self.assertFalse(monitor.excedido)
+
+    def test_lote_no_limite_de_memoria_usa_leitor_streaming(self):
+        plano = planejar_recursos(AGENTE_4GB, limite_rss=500 * MB)
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch("src.recursos.medir_rss", return_value=600 * MB), \
+                mock.patch("src.conversao.converter_notebook") as converter, \
+                mock.patch("src.conversao.registrar_resultado"):
+            arquivo = Path(tmp) / "a.ipynb"
+            arquivo.write_text("{}", encoding="utf-8")
+            converte_lote([arquivo], Path(tmp), logging.getLogger("test_recursos"), plano=plano)
+        self.assertIsInstance(converter.call_args.args[2], LimitesSaida)
+
+
+if __name__ == "__main__":
+    unittest.main()
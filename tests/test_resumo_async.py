@@ -0,0 +1,92 @@
+import asyncio
+import importlib.util
+import random
+import time
+import unittest
+from types import SimpleNamespace
+
+from servidor_falso import ServidorFalsoOpenAI
+from src.llm import criar_cliente_async
+from src.resumo_async import LimitadorTaxa, resumir_secoes
+
+
+class ErroAPI(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class ClienteFalso:
+    """Cliente com a mesma interface do AsyncOpenAI (chat.completions.create)."""
+
+    def __init__(self, erros=None):
+        self.erros = list(erros or [])
+        self.chamadas = 0
+        self.em_andamento = 0
+        self.maximo_em_andamento = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **parametros):
+        self.chamadas += 1
+        if self.erros:
+            raise ErroAPI(self.erros.pop(0))
+        self.em_andamento += 1
+        self.maximo_em_andamento = max(self.maximo_em_andamento, self.em_andamento)
+        await asyncio.sleep(random.random() / 100)
+        self.em_andamento -= 1
+        mensagem = SimpleNamespace(content=messages[-1]["content"].split("\n")[-1].upper())
+        return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)])
+
+
+class TestResumoAsync(unittest.TestCase):
+    def test_preserva_ordem_e_limita_concorrencia(self):
+        cliente = ClienteFalso()
+        secoes = [f"secao {i}" for i in range(20)]
+
+        resumos = resumir_secoes(secoes, cliente=cliente, concorrencia=3)
+
+        self.assertEqual(resumos, [s.upper() for s in secoes])
+        self.assertLessEqual(cliente.maximo_em_andamento, 3)
+
+    def test_repete_em_429_e_5xx(self):
+        cliente = ClienteFalso(erros=[429, 503])
+        resumos = resumir_secoes(["a"], cliente=cliente, espera_base=0.01)
+
+        self.assertEqual(resumos, ["A"])
+        self.assertEqual(cliente.chamadas, 3)
+
+    def test_nao_repete_erro_do_cliente(self):
+        cliente = ClienteFalso(erros=[400])
+        with self.assertRaises(ErroAPI):
+            resumir_secoes(["a"], cliente=cliente, espera_base=0.01)
+        self.assertEqual(cliente.chamadas, 1)
+
+    def test_falha_de_uma_secao_nao_interrompe_as_outras(self):
+        cliente = ClienteFalso(erros=[400])
+        falhas = {}
+        resumos = resumir_secoes(["a", "b", "c"], cliente=cliente, concorrencia=1, falhas=falhas)
+
+        self.assertEqual(resumos, ["", "B", "C"])
+        self.assertEqual(list(falhas), [0])
+        self.assertIsInstance(falhas[0], ErroAPI)
+
+    def test_limitador_de_tokens(self):
+        async def executar():
+            limitador = LimitadorTaxa(requisicoes_por_minuto=1000, tokens_por_minuto=600)
+            await limitador.aguardar(600)
+            inicio = time.monotonic()
+            await limitador.aguardar(5)
+            return time.monotonic() - inicio
+
+        self.assertGreaterEqual(asyncio.run(executar()), 0.4)
+
+    @unittest.skipUnless(importlib.util.find_spec("openai"), "openai não instalado")
+    def test_servidor_falso(self):
+        with ServidorFalsoOpenAI(erros=[429, 500]) as servidor:
+            cliente = criar_cliente_async(base_url=servidor.base_url, api_key="teste")
+            resumos = resumir_secoes(["x = 1", "y = 2"], cliente=cliente, espera_base=0.01)
+
+        self.assertEqual(len(resumos), 2)
+        self.assertTrue(resumos[0].endswith("x = 1"))
+        self.assertTrue(resumos[1].endswith("y = 2"))
+        self.assertEqual(len(servidor.requisicoes), 4)